@@ -1,204 +1,1365 @@
-# analyzer.py
-# -*- coding: utf-8 -*-
-
-import warnings
-warnings.filterwarnings("ignore") # Gereksiz uyarıları gizle
-
-import os
-import tempfile
-import subprocess
-
-import torch
-from langdetect import detect
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-
-# Hugging Face'den indirilecek Türkçe Duygu Analizi Modeli (BERT)
-SENT_MODEL_NAME = "savasy/bert-base-turkish-sentiment-cased"
-
-# Modeller bellekte (RAM) tutulacak değişkenler
-sent_tokenizer = None
-sent_model = None
-
-print(">> NLP modülleri hazır. Modeller ihtiyaç olduğunda yüklenecek.")
-
-
-# ---------------- SENTIMENT (DUYGU) MODELİ ---------------- #
-
-def load_sentiment_model():
-    """
-    Sentiment modelini sadece ihtiyaç olduğunda yükler (Lazy Loading).
-    Böylece program açılır açılmaz RAM'i doldurmaz.
-    """
-    global sent_tokenizer, sent_model
-    if sent_model is not None and sent_tokenizer is not None:
-        return # Zaten yüklüyse tekrar yükleme
-
-    print(">> Sentiment modeli yükleniyor... (İlk seferde biraz uzun sürebilir)")
-    try:
-        sent_tokenizer = AutoTokenizer.from_pretrained(SENT_MODEL_NAME)
-        sent_model = AutoModelForSequenceClassification.from_pretrained(SENT_MODEL_NAME)
-        sent_model.eval() # Modeli değerlendirme moduna al (Eğitim modu değil)
-        print(">> Sentiment modeli yüklendi.")
-    except Exception as e:
-        print(f"Sentiment modeli hatası: {e}")
-        sent_tokenizer = None
-        sent_model = None
-
-
-def warmup_models():
-    """
-    app.py tarafından çağrılır. Analiz başlamadan önce modeli belleğe alarak
-    kullanıcının bekleme süresini optimize eder.
-    """
-    load_sentiment_model()
-
-
-# ---------------- ÇEVİRİ (AYRI PROCESS - subprocess) ---------------- #
-
-def translate_with_hf_subprocess(text: str, src_lang: str) -> str:
-    """
-    Çeviri işlemi çok RAM tükettiği için ana programı yormamak adına
-    ayrı bir Python işlemi (process) olarak 'translator_hf.py' dosyasını çalıştırır.
-    """
-    # Çevrilecek metni geçici bir dosyaya (.txt) yaz
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8") as f_in:
-        f_in.write(text)
-        in_path = f_in.name
-
-    # Çeviri sonucunun yazılacağı boş bir geçici dosya oluştur
-    out_fd, out_path = tempfile.mkstemp(suffix=".txt")
-    os.close(out_fd)
-
-    try:
-        # Komut satırından: python translator_hf.py <girdi_dosyası> <çıktı_dosyası> <dil_kodu>
-        cmd = ["python", "translator_hf.py", in_path, out_path, src_lang]
-        print(">> analyzer: translator_hf.py çağrılıyor...", cmd)
-        
-        # İşlemi başlat ve bitmesini bekle
-        subprocess.run(cmd, check=True)
-
-        # Çevrilmiş metni dosyadan oku
-        with open(out_path, "r", encoding="utf-8") as f_out:
-            translated = f_out.read().strip()
-
-        return translated or text # Çeviri boşsa orijinali döndür
-    except Exception as e:
-        print(f"Çeviri alt süreç hatası: {e}")
-        return text
-    finally:
-        # İşlem bitince geçici dosyaları temizle (Disk kirliliğini önle)
-        try:
-            if os.path.exists(in_path): os.remove(in_path)
-        except Exception: pass
-        try:
-            if os.path.exists(out_path): os.remove(out_path)
-        except Exception: pass
-
-
-def translate_if_needed(text: str) -> str:
-    """
-    Yorumun dilini algılar. Eğer Türkçe değilse çeviri sürecini başlatır.
-    """
-    try:
-        lang = detect(text) # Dil algılama (Örn: 'en', 'fr', 'tr')
-    except Exception:
-        lang = "tr" # Hata olursa Türkçe varsay
-
-    if lang == "tr":
-        return text # Zaten Türkçeyse çevirme
-
-    # Yabancı dildeyse çeviri fonksiyonuna gönder
-    return translate_with_hf_subprocess(text, lang)
-
-
-# ---------------- SENTIMENT PUANI HESAPLAMA ---------------- #
-
-def get_sentiment_score(text: str) -> int:
-    """
-    Metni BERT modeline verir ve 0 ile 100 arasında bir 'Olumluluk Puanı' döndürür.
-    """
-    load_sentiment_model()
-    if sent_model is None or sent_tokenizer is None:
-        return 50  # Model yüklenemezse Nötr (50) puan ver
-
-    # Metni modelin anlayacağı sayısal vektörlere çevir (Tokenization)
-    inputs = sent_tokenizer(
-        text,
-        return_tensors="pt",
-        padding=True,
-        truncation=True,
-    )
-    
-    # Modeli çalıştır (Gradyan hesaplama yapma, sadece tahmin)
-    with torch.no_grad():
-        outputs = sent_model(**inputs)
-
-    # Çıktıyı olasılığa çevir (Softmax)
-    probs = torch.nn.functional.softmax(outputs.logits, dim=1)[0]
-    positive_score = float(probs[-1]) # Pozitif sınıfının olasılığı
-    return int(positive_score * 100)
-
-
-# ---------------- ANA ANALİZ FONKSİYONU ---------------- #
-
-def analyze_comments(comments, total_reviews: int = 0, average_stars: float = 0.0):
-    """
-    Tüm süreci yöneten beyin fonksiyonu:
-    1. Yorumları çevir
-    2. Duygu analizi yap
-    3. Puanları istatistiksel olarak dengele (Bayesian Smoothing)
-    """
-    if not comments:
-        return {"final_score": 50, "details": []}
-
-    processed = []
-    scores = []
-
-    for comment in comments:
-        # Çok kısa (3 kelimeden az) yorumları analiz etme
-        if len(comment.split()) < 3:
-            continue
-
-        # 1. Çeviri
-        bg_text = translate_if_needed(comment)
-        # 2. Puanlama
-        score = get_sentiment_score(bg_text)
-
-        processed.append(
-            {
-                "original": comment,
-                "translated": bg_text,
-                "score": score,
-            }
-        )
-        scores.append(score)
-
-    if not scores:
-        return {"final_score": 50, "details": processed}
-
-    # -- PUAN HESAPLAMA ALGORİTMASI --
-
-    # Adım 1: Yapay zekanın verdiği puanların ortalaması
-    avg_ai_score = sum(scores) / len(scores)
-
-    # Adım 2: Bayesian Düzeltme (Smoothing)
-    # Az sayıda yorum varsa puana hemen güvenme, onu genel ortalamaya (60) yaklaştır.
-    # Yorum sayısı arttıkça (m=10 eşiğini geçtikçe) yapay zeka puanına daha çok güven.
-    count = len(scores)
-    C = 60  # Varsayılan güvenli puan
-    m = 10  # Güven eşiği (yorum sayısı)
-    bayesian_score = (count / (count + m)) * avg_ai_score + (m / (count + m)) * C
-
-    # Adım 3: Sitedeki Yıldız Puanını Dahil Et
-    # Sonuç sadece yapay zekaya değil, sitedeki yıldızlara da bağlı olsun.
-    if average_stars > 0:
-        star_score = (average_stars / 5.0) * 100
-        # %70 Yapay Zeka, %30 Site Puanı ağırlığı
-        final_score = (bayesian_score * 0.7) + (star_score * 0.3)
-    else:
-        final_score = bayesian_score
-
-    return {
-        "final_score": int(final_score),
-        "details": processed,
-    }
\ No newline at end of file
+# analyzer.py
+# -*- coding: utf-8 -*-
+
+import warnings
+warnings.filterwarnings("ignore") # Gereksiz uyarıları gizle
+
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import threading
+import subprocess
+
+# Not: torch, transformers ve langdetect burada içe aktarılmaz; ilk kullanıldıkları
+# fonksiyonun içinde yüklenirler. Böylece 'import analyzer' hızlıdır ve pencere beklemeden açılır.
+import dedup
+import lang_detect
+import chunking
+import metrics
+import sampling
+import cancellation
+from metrics import current_rss_mb
+from model_registry import get_model_registry
+from backends import INFERENCE_BACKEND, load_sequence_classifier, model_size_mb, resolve_revision
+from cache import CACHE_PATH, cache_key, get_cache
+from translator_hf import read_frame, write_frame
+from translator_hf import MODEL_NAME as TRANSLATION_MODEL_NAME
+from translator_hf import MODEL_REVISION as TRANSLATION_MODEL_REVISION
+from translator_hf import MAX_INPUT_TOKENS as TRANSLATION_MAX_TOKENS
+
+# Hugging Face'den indirilecek Türkçe Duygu Analizi Modeli (BERT)
+SENT_MODEL_NAME = "savasy/bert-base-turkish-sentiment-cased"
+# Model sürümü: dal, etiket ya da commit SHA'sı. Önbellek anahtarına dal adı değil, yüklenen
+# commit'in SHA'sı girer (bkz. model_revision); model güncellenince eski puanlar kullanılmaz.
+SENT_MODEL_REVISION = os.environ.get("YORUM_SENT_REVISION", "main")
+
+# Duygu analizi modu:
+#   translate    : Türkçe olmayan yorumlar önce Türkçeye çevrilir, sonra Türkçe modelle puanlanır
+#   multilingual : Türkçe olmayan yorumlar çevrilmeden çok dilli modelle puanlanır (çeviri adımı yok)
+SENTIMENT_MODE = os.environ.get("YORUM_SENTIMENT_MODE", "translate")
+
+# Çok dilli model 1-5 yıldız tahmin eder; beklenen yıldız 0-100 aralığına taşınır ve
+# Türkçe modelin ölçeğine doğrusal kalibrasyonla (a * puan + b) çevrilir (bkz. fit_calibration).
+# Katsayılar YORUM_MULTI_CALIBRATION="a,b" ile verilmezse 'cli.py --fit-calibration' ile
+# hesaplanıp önbellek klasörüne kaydedilen dosyadan okunur (bkz. load_calibration).
+MULTI_SENT_MODEL_NAME = "nlptown/bert-base-multilingual-uncased-sentiment"
+MULTI_SENT_MODEL_REVISION = os.environ.get("YORUM_MULTI_REVISION", "main")
+MULTI_CALIBRATION_PATH = os.environ.get(
+    "YORUM_MULTI_CALIBRATION_PATH", os.path.join(os.path.dirname(CACHE_PATH), "multi_calibration.json")
+)
+IDENTITY_CALIBRATION = (1.0, 0.0)
+
+# Çıkarım arka ucu: torch (fp32), int8 (dinamik kuantizasyon) veya onnx (ONNX Runtime).
+# Arka uç puanları az da olsa değiştirebildiği için önbellek anahtarına eklenir.
+SENT_BACKEND = INFERENCE_BACKEND
+TRANSLATION_BACKEND = INFERENCE_BACKEND
+
+# Dil algılayıcının önbellekteki adı (algılama mantığı değişirse sürümü artırılmalı)
+LANGID_MODEL_NAME = "langid"
+LANGID_REVISION = "2"
+
+# Toplu puanlamada bir ileri geçişe (forward pass) girecek en fazla yorum sayısı
+# ve 'en uzun yorum x yorum sayısı' için token bütçesi
+SENT_BATCH_SIZE = 32
+SENT_MAX_BATCH_TOKENS = 8192
+# Modele tek seferde verilen en fazla token (özel tokenlar dahil). Daha uzun yorumlar
+# kesilmez; cümle sınırlarından bu bütçeye sığan parçalara bölünüp ayrı ayrı puanlanır.
+SENT_MAX_TOKENS = 512
+
+# Paralel puanlamada kullanılacak işçi süreci sayısı (0 veya 1: tek süreç).
+# Her işçiye düşen torch thread sayısı çekirdek sayısı / işçi sayısı olarak ayarlanır.
+SCORE_WORKERS = int(os.environ.get("YORUM_SCORE_WORKERS", "0"))
+
+# Yerel çıkarım servisinin adresi (bkz. inference_service.py), örn. http://127.0.0.1:8765
+# veya unix:///tmp/yorum.sock. Ayarlıysa puanlama ve çeviri servise gönderilir, modeller
+# bu süreçte yüklenmez. Servis aynı YORUM_BACKEND ile başlatılmalıdır (önbellek anahtarı).
+INFERENCE_URL = os.environ.get("YORUM_INFERENCE_URL", "")
+
+# Uyarlamalı örnekleme (analyze_comments(adaptive=True)): her turda puanlanan yorum sayısı,
+# durmadan önce en az kaç yorum puanlanacağı, nihai puanın %95 güven aralığının kabul
+# edilen yarı genişliği (puan) ve en fazla süre (saniye)
+ADAPTIVE_BATCH = 64
+ADAPTIVE_MIN_SAMPLES = 128
+ADAPTIVE_TOLERANCE = float(os.environ.get("YORUM_ADAPTIVE_TOLERANCE", "1.0"))
+ADAPTIVE_TIME_BUDGET = float(os.environ.get("YORUM_ADAPTIVE_TIME_BUDGET", "60"))
+
+# İptal edilebilen analizde (bkz. cancellation) yorumlar bu büyüklükte parçalar halinde
+# çevrilip puanlanır; iptal edilince tamamlanan parçalar kısmi sonucu oluşturur
+CANCEL_CHUNK = 256
+
+# Modeller bellekte (RAM) tutulacak değişkenler
+sent_tokenizer = None
+sent_model = None
+multi_tokenizer = None
+multi_model = None
+
+print(">> NLP modülleri hazır. Modeller ihtiyaç olduğunda yüklenecek.")
+
+
+# ---------------- SENTIMENT (DUYGU) MODELİ ---------------- #
+
+def load_sentiment_model():
+    """
+    Sentiment modelini sadece ihtiyaç olduğunda yükler (Lazy Loading).
+    Böylece program açılır açılmaz RAM'i doldurmaz. Model, model kaydı
+    (bkz. model_registry) üzerinden yüklenir; bellek bütçesi aşılınca ya da
+    uzun süre kullanılmayınca boşaltılabilir ve sonraki kullanımda yeniden yüklenir.
+    Yüklenemezse sent_model None kalır.
+    """
+    try:
+        get_model_registry().ensure("sentiment")
+    except Exception:
+        pass  # Hata mesajı yükleyicide yazıldı
+
+
+def load_multilingual_model():
+    """Çok dilli sentiment modelini ilk ihtiyaçta yükler (bkz. SENTIMENT_MODE, load_sentiment_model)."""
+    try:
+        get_model_registry().ensure("multilingual")
+    except Exception:
+        pass
+
+
+def _load_sentiment():
+    global sent_tokenizer, sent_model
+    if sent_model is not None and sent_tokenizer is not None:
+        return # Zaten yüklüyse tekrar yükleme
+
+    print(f">> Sentiment modeli yükleniyor ({SENT_BACKEND})... (İlk seferde biraz uzun sürebilir)")
+    try:
+        sent_tokenizer, sent_model = load_sequence_classifier(SENT_MODEL_NAME, SENT_MODEL_REVISION, SENT_BACKEND)
+        # Yükleme "main"i yeni bir commit'e taşımış olabilir
+        _revisions.pop((SENT_MODEL_NAME, SENT_MODEL_REVISION), None)
+        print(">> Sentiment modeli yüklendi.")
+    except Exception as e:
+        print(f"Sentiment modeli hatası: {e}")
+        sent_tokenizer = None
+        sent_model = None
+        raise
+
+
+def _unload_sentiment():
+    global sent_tokenizer, sent_model
+    sent_tokenizer = None
+    sent_model = None
+
+
+def _load_multilingual():
+    global multi_tokenizer, multi_model
+    if multi_model is not None and multi_tokenizer is not None:
+        return
+
+    print(f">> Çok dilli sentiment modeli yükleniyor ({SENT_BACKEND})...")
+    try:
+        multi_tokenizer, multi_model = load_sequence_classifier(
+            MULTI_SENT_MODEL_NAME, MULTI_SENT_MODEL_REVISION, SENT_BACKEND
+        )
+        _revisions.pop((MULTI_SENT_MODEL_NAME, MULTI_SENT_MODEL_REVISION), None)
+        if MULTI_SENT_CALIBRATION == IDENTITY_CALIBRATION:
+            print(
+                ">> UYARI: Çok dilli model kalibrasyonsuz (a=1, b=0); puanları Türkçe modelle aynı "
+                "ölçekte değil. Katsayılar için: python cli.py --fit-calibration turkce_yorumlar.txt"
+            )
+        print(">> Çok dilli sentiment modeli yüklendi.")
+    except Exception as e:
+        print(f"Çok dilli sentiment modeli hatası: {e}")
+        multi_tokenizer = None
+        multi_model = None
+        raise
+
+
+def _unload_multilingual():
+    global multi_tokenizer, multi_model
+    multi_tokenizer = None
+    multi_model = None
+
+
+def _sentiment_model(multilingual: bool):
+    """Puanlamada kullanılacak (tokenizer, model) çifti (yüklü değilse None'lar)."""
+    if multilingual:
+        return multi_tokenizer, multi_model
+    return sent_tokenizer, sent_model
+
+
+# (model adı, istenen sürüm) -> önbellek anahtarına giren commit SHA'sı
+_revisions = {}
+
+
+def model_revision(model_name: str, revision: str, registry_name: str) -> str | None:
+    """
+    Önbellek anahtarına giren model sürümü: 'revision'ın (örn. "main") şu an yerelde
+    yüklü olan commit SHA'sı. Model henüz indirilmediyse önce model kaydı üzerinden
+    yüklenir; çıkarım servisi kullanılıyorsa SHA servisten (/health) alınır.
+    Sürüm belirlenemezse None döner ve sonuçlar önbelleğe alınmaz (eski sonuç
+    dönme riski yerine yeniden hesaplama).
+    """
+    key = (model_name, revision)
+    if key in _revisions:
+        return _revisions[key]
+    commit = resolve_revision(model_name, revision)
+    if commit is None:
+        client = get_inference_client()
+        if client is not None:
+            try:
+                commit = client.health().get("revisions", {}).get(model_name)
+            except Exception as e:
+                print(f"Çıkarım servisi hatası (model sürümü): {e}")
+        else:
+            try:
+                get_model_registry().ensure(registry_name)
+            except Exception:
+                pass
+            commit = resolve_revision(model_name, revision)
+    if commit is None:
+        print(f">> {model_name}@{revision} için commit belirlenemedi; sonuçlar önbelleğe alınmayacak.")
+        return None
+    _revisions[key] = commit
+    return commit
+
+
+def warmup_models(progress=None, translator: bool = True):
+    """
+    app.py tarafından arka plan thread'inde çağrılır. Analiz başlamadan önce
+    modelleri belleğe alarak kullanıcının bekleme süresini optimize eder.
+    progress: Verilirse her adımda kısa bir durum mesajıyla çağrılır.
+    translator: True ise çeviri işçisi de başlatılıp modelini yüklemesi beklenir.
+    Çıkarım servisi kullanılıyorsa sadece servisin ayakta olduğu kontrol edilir.
+    """
+    client = get_inference_client()
+    if client is not None:
+        if progress is not None:
+            progress("Çıkarım servisine bağlanılıyor...")
+        try:
+            client.health()
+        except Exception as e:
+            print(f"Çıkarım servisine ulaşılamadı: {e}")
+        if progress is not None:
+            progress("Modeller hazır.")
+        return
+
+    if progress is not None:
+        progress("Duygu analizi modeli yükleniyor...")
+    load_sentiment_model()
+
+    # Çok dilli modda çeviri işçisi sadece gösterilen yorumlar için, gerektiğinde başlatılır
+    if SENTIMENT_MODE == "multilingual":
+        if progress is not None:
+            progress("Çok dilli duygu analizi modeli yükleniyor...")
+        load_multilingual_model()
+        translator = False
+
+    if translator:
+        if progress is not None:
+            progress("Çeviri modeli yükleniyor...")
+        try:
+            get_model_registry().ensure("translator")
+        except Exception as e:
+            # Çeviri işçisi açılamazsa analiz yine çalışır (yorumlar çevrilmeden puanlanır)
+            print(f"Çeviri işçisi ısıtılamadı: {e}")
+
+    if progress is not None:
+        progress("Modeller hazır.")
+
+
+# ---------------- UZAK ÇIKARIM SERVİSİ ---------------- #
+
+_inference_client = None
+_inference_client_lock = threading.Lock()
+
+
+def get_inference_client():
+    """INFERENCE_URL ayarlıysa paylaşılan servis istemcisi, değilse None."""
+    global _inference_client
+    if not INFERENCE_URL:
+        return None
+    with _inference_client_lock:
+        if _inference_client is None or _inference_client.url != INFERENCE_URL:
+            from inference_service import InferenceClient
+
+            _inference_client = InferenceClient(INFERENCE_URL)
+        return _inference_client
+
+
+# ---------------- ÇEVİRİ (AYRI PROCESS - kalıcı işçi) ---------------- #
+
+# Çeviri işçisinin çalıştıracağı betik (çalışma dizininden bağımsız olsun diye tam yol)
+TRANSLATOR_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translator_hf.py")
+
+
+class TranslatorWorker:
+    """
+    Çeviri modeli çok RAM tükettiği için ana programda değil, ayrı bir Python
+    işleminde ('translator_hf.py --serve') çalışır. Bu işlem bir kez başlatılır
+    ve açık tutulur; böylece M2M100 her yorum için yeniden yüklenmez.
+    İstekler stdin/stdout üzerinden çerçeveli JSON mesajlarıyla gönderilir.
+    İşlem çökerse bir sonraki istekte otomatik olarak yeniden başlatılır.
+    """
+
+    def __init__(self, script_path: str = TRANSLATOR_SCRIPT, max_restarts: int = 1, registry_name: str | None = None):
+        self.script_path = script_path
+        self.max_restarts = max_restarts
+        # Model kaydındaki adı: işlem durdurulunca kayıtta da boşaltılmış görünsün (bkz. model_registry)
+        self.registry_name = registry_name
+        self.proc = None
+        self.start_error = None  # Model hiç yüklenemediyse tekrar denemeyelim
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def _alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def _start(self):
+        if self.start_error is not None:
+            raise RuntimeError(self.start_error)
+
+        cmd = [sys.executable, self.script_path, "--serve", "--backend", TRANSLATION_BACKEND]
+        print(">> analyzer: çeviri işçisi başlatılıyor...", cmd)
+        # stderr ana sürecin konsoluna akar, stdout sadece protokol içindir
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        ready = read_frame(self.proc.stdout)
+        if ready is None:
+            self._kill()
+            raise BrokenPipeError("Çeviri işçisi başlarken kapandı")
+        if not ready.get("ok"):
+            self._kill()
+            self.start_error = ready.get("error", "Çeviri işçisi başlatılamadı")
+            raise RuntimeError(self.start_error)
+        print(">> analyzer: çeviri işçisi hazır.")
+
+    def _kill(self):
+        if self.proc is None:
+            return
+        try:
+            if self.proc.poll() is None:
+                self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        self.proc = None
+
+    def request(self, payload: dict) -> dict:
+        """İsteği işçiye gönderir ve cevabını döndürür. Bağlantı koparsa işçiyi yeniden başlatır."""
+        with self._lock:
+            attempts = 0
+            while True:
+                try:
+                    if not self._alive():
+                        self._start()
+                    self._next_id += 1
+                    write_frame(self.proc.stdin, dict(payload, id=self._next_id))
+                    response = read_frame(self.proc.stdout)
+                    if response is None:
+                        raise BrokenPipeError("Çeviri işçisi beklenmedik şekilde kapandı")
+                    return response
+                except OSError as e:
+                    # BrokenPipe / EOF: işlem çökmüş, temizle ve yeniden dene
+                    self._kill()
+                    # İşlemi iptal için abort() sonlandırdıysa yeniden başlatma
+                    cancellation.check()
+                    attempts += 1
+                    if attempts > self.max_restarts:
+                        raise
+                    print(f">> analyzer: çeviri işçisi yeniden başlatılıyor ({attempts}/{self.max_restarts}): {e}")
+
+    def translate(self, text: str, src_lang: str) -> str:
+        response = self.request({"op": "translate", "text": text, "src_lang": src_lang})
+        metrics.merge(response.get("stats"), "translator")
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "Bilinmeyen çeviri hatası"))
+        return response.get("translation", "")
+
+    def translate_batch(self, texts, src_langs) -> list:
+        response = self.request({"op": "translate_batch", "texts": list(texts), "src_langs": list(src_langs)})
+        # İşçinin kendi ölçümleri (batch'ler, token/saniye, bellek) etkin rapora eklenir
+        metrics.merge(response.get("stats"), "translator")
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "Bilinmeyen çeviri hatası"))
+        return response.get("translations", [])
+
+    def abort(self):
+        """
+        Süren isteği yarıda keser: işlem kilit beklenmeden hemen sonlandırılır ve
+        modelin tuttuğu bellek serbest kalır. Bir sonraki istek işçiyi yeniden başlatır.
+        """
+        proc = self.proc
+        if proc is not None and proc.poll() is None:
+            print(">> analyzer: çeviri işçisi iptal nedeniyle durduruluyor.")
+            try:
+                proc.kill()
+            except Exception:
+                pass
+            self._mark_unloaded("abort")
+
+    def close(self):
+        """İşçiye kapanma mesajı gönderir, cevap vermezse işlemi sonlandırır."""
+        with self._lock:
+            if self._alive():
+                try:
+                    write_frame(self.proc.stdin, {"op": "shutdown", "id": 0})
+                    self.proc.stdin.close()
+                    self.proc.wait(timeout=5)
+                except Exception:
+                    pass
+            self._kill()
+        self._mark_unloaded("closed")
+
+    def _mark_unloaded(self, reason: str):
+        if self.registry_name is not None:
+            get_model_registry().mark_unloaded(self.registry_name, reason)
+
+
+_translator_worker = None
+_translator_worker_lock = threading.Lock()
+
+
+def get_translator_worker() -> TranslatorWorker:
+    """Süreç boyunca tek bir çeviri işçisi kullanılır (ilk çağrıda oluşturulur)."""
+    global _translator_worker
+    with _translator_worker_lock:
+        if _translator_worker is None:
+            _translator_worker = TranslatorWorker(registry_name="translator")
+        return _translator_worker
+
+
+def shutdown_translator_worker():
+    """Çeviri işçisini kapatır (program kapanırken otomatik çağrılır)."""
+    global _translator_worker
+    with _translator_worker_lock:
+        if _translator_worker is not None:
+            _translator_worker.close()
+            _translator_worker = None
+
+
+atexit.register(shutdown_translator_worker)
+
+
+def _start_translator():
+    get_translator_worker().request({"op": "ping"})
+    _revisions.pop((TRANSLATION_MODEL_NAME, TRANSLATION_MODEL_REVISION), None)
+
+
+def _translator_rss_mb() -> float:
+    # Çeviri modeli ayrı süreçte yaşadığı için boyutu o sürecin belleğidir
+    worker = _translator_worker
+    proc = worker.proc if worker is not None else None
+    return current_rss_mb(proc.pid) if proc is not None else 0.0
+
+
+def _sentiment_size_mb() -> float:
+    return model_size_mb(sent_model)
+
+
+def _multilingual_size_mb() -> float:
+    return model_size_mb(multi_model)
+
+
+# Bellek yönetimi: modeller model kaydı üzerinden yüklenip boşaltılır (bkz. model_registry).
+# Boyutlar ağırlık baytlarından (çeviri işçisinde sürecin belleğinden) ölçülür.
+get_model_registry().register("sentiment", _load_sentiment, _unload_sentiment, size=_sentiment_size_mb)
+get_model_registry().register("multilingual", _load_multilingual, _unload_multilingual, size=_multilingual_size_mb)
+get_model_registry().register("translator", _start_translator, shutdown_translator_worker, size=_translator_rss_mb)
+
+
+def translate_with_hf_subprocess(text: str, src_lang: str) -> str:
+    """
+    Metni kalıcı çeviri işçisine gönderir ve Türkçe çevirisini döndürür.
+    Hata olursa orijinal metin döndürülür.
+    """
+    try:
+        client = get_inference_client()
+        if client is not None:
+            translated = client.translate([text], [src_lang])[0].strip()
+        else:
+            with get_model_registry().use("translator"):
+                translated = get_translator_worker().translate(text, src_lang).strip()
+        return translated or text # Çeviri boşsa orijinali döndür
+    except Exception as e:
+        print(f"Çeviri alt süreç hatası: {e}")
+        return text
+
+
+def translate_batch_with_hf(texts, src_langs) -> list:
+    """
+    Birden fazla metni tek istekte çeviri işçisine gönderir. İşçi metinleri
+    dillerine göre gruplayıp uzunluğa göre sıralanmış batch'ler halinde çevirir.
+    Çıkarım servisi ayarlıysa metinler işçi yerine servise gönderilir.
+    Hata olursa veya çeviri boş gelirse ilgili metnin orijinali döndürülür.
+    Analiz iptal edilirse (bkz. cancellation) işçi hemen durdurulur ve Cancelled fırlatılır.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    cancellation.check()
+    try:
+        client = get_inference_client()
+        if client is not None:
+            translated = client.translate(texts, src_langs)
+        else:
+            with get_model_registry().use("translator"):
+                worker = get_translator_worker()
+                with cancellation.on_cancel(worker.abort):
+                    translated = worker.translate_batch(texts, src_langs)
+    except cancellation.Cancelled:
+        raise
+    except Exception as e:
+        print(f"Toplu çeviri hatası: {e}")
+        return texts
+    return [(t or "").strip() or original for t, original in zip(translated, texts)]
+
+
+def detect_language(text: str) -> str:
+    """Yorumun dilini algılar (Örn: 'en', 'fr', 'tr'). Hata olursa Türkçe varsayar."""
+    return lang_detect.detect(text)[0]
+
+
+def detect_languages(texts) -> list:
+    """
+    Birden fazla yorumun dilini (dil, güven) çiftleri olarak algılar.
+    Daha önce algılananlar önbellekten gelir, kalanlar lang_detect.detect_batch ile
+    toplu olarak algılanır (önce ucuz kurallar, sadece belirsizler için n-gram).
+    """
+    texts = list(texts)
+    cache = get_cache()
+    if cache is None:
+        with metrics.stage("langid"):
+            return lang_detect.detect_batch(texts)
+
+    keys = [cache_key("lang", t, LANGID_MODEL_NAME, LANGID_REVISION) for t in texts]
+    results = [tuple(r) if r is not None else None for r in cache.get_many("lang", keys)]
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    metrics.count("lang_cache_hits", len(texts) - len(missing))
+    fresh = {}
+    with metrics.stage("langid"):
+        detected = lang_detect.detect_batch([texts[i] for i in missing])
+    for i, result in zip(missing, detected):
+        results[i] = result
+        fresh[keys[i]] = list(result)
+    cache.put_many("lang", fresh)
+    return results
+
+
+def translate_if_needed(text: str) -> str:
+    """
+    Yorumun dilini algılar. Eğer Türkçe değilse çeviri sürecini başlatır.
+    """
+    return translate_many([text])[0]
+
+
+def translate_many(texts) -> list:
+    """
+    translate_if_needed'in toplu hali: Türkçe olmayan yorumların daha önce
+    çevrilmemiş olanları tek seferde çeviri işçisine gönderilir, gerisi
+    önbellekten gelir. Sonuçlar girdi sırasıyla döndürülür.
+    """
+    return translate_with_languages(texts)[0]
+
+
+def translate_with_languages(texts):
+    """translate_many ile aynı; ek olarak algılanan dil kodlarını da döndürür: (çeviriler, diller)."""
+    texts = list(texts)
+    detected = detect_languages(texts)
+    langs = [lang for lang, _ in detected]
+    # Dili güvenle algılanamayan yorumlar çevrilmeden olduğu gibi puanlanır
+    foreign = [i for i, (lang, confidence) in enumerate(detected) if lang_detect.should_translate(lang, confidence)]
+
+    results = list(texts)
+    metrics.count("foreign", len(foreign))
+    if not foreign:
+        return results, langs
+
+    # Çeviri kaynak dile ve parçalama bütçesine de bağlı olduğu için ikisi de anahtara eklenir
+    cache = get_cache()
+    revision = TRANSLATION_MODEL_REVISION
+    if cache is not None:
+        # Sürüm belirlenemezse anahtarlar sadece bu çağrıdaki tekrarları birleştirmek için kullanılır
+        revision = model_revision(TRANSLATION_MODEL_NAME, revision, "translator")
+        if revision is None:
+            cache, revision = None, TRANSLATION_MODEL_REVISION
+    keys = {
+        i: cache_key(
+            "translation", texts[i], TRANSLATION_MODEL_NAME, revision, TRANSLATION_BACKEND, langs[i],
+            TRANSLATION_MAX_TOKENS,
+        )
+        for i in foreign
+    }
+    cached = cache.get_many("translation", [keys[i] for i in foreign]) if cache else [None] * len(foreign)
+
+    missing = []
+    for i, value in zip(foreign, cached):
+        if value is None:
+            missing.append(i)
+        else:
+            results[i] = value
+
+    metrics.count("translation_cache_hits", len(foreign) - len(missing))
+    if missing:
+        # Aynı anahtarlı (aynı metin ve dil) yorumlar sadece bir kez çevrilir
+        first = {}
+        for i in missing:
+            first.setdefault(keys[i], i)
+        unique = list(first.values())
+        metrics.count("translated", len(unique))
+        translated = translate_batch_with_hf([texts[i] for i in unique], [langs[i] for i in unique])
+        by_key = {}
+        fresh = {}
+        for i, t in zip(unique, translated):
+            by_key[keys[i]] = t
+            # Hata durumunda orijinal metin döner; onu önbelleğe yazmayalım
+            if t != texts[i]:
+                fresh[keys[i]] = t
+        for i in missing:
+            results[i] = by_key[keys[i]]
+        if cache is not None:
+            cache.put_many("translation", fresh)
+
+    return results, langs
+
+
+# ---------------- SENTIMENT PUANI HESAPLAMA ---------------- #
+
+def make_length_buckets(lengths, batch_size: int, max_batch_tokens: int) -> list:
+    """
+    Metin indekslerini token uzunluğuna göre sıralayıp benzer uzunluktakileri
+    aynı gruba (bucket) koyar. Bir grup en fazla 'batch_size' metin içerir ve
+    'en uzun metin x metin sayısı' değeri 'max_batch_tokens'ı geçmez.
+    Böylece padding için harcanan boş hesaplama en aza iner.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+    buckets = []
+    current = []
+    for i in order:
+        # Sıralı gittiğimiz için gruptaki en uzun metin her zaman son eklenendir
+        if current and (len(current) >= batch_size or lengths[i] * (len(current) + 1) > max_batch_tokens):
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def score_with_model(
+    tokenizer,
+    model,
+    texts,
+    batch_size: int = SENT_BATCH_SIZE,
+    max_batch_tokens: int = SENT_MAX_BATCH_TOKENS,
+) -> list:
+    """
+    Verilen tokenizer/model ile metinleri puanlar (önbelleğe bakmaz).
+    Tüm metinler tek seferde tokenize edilir, uzunluklarına göre gruplanır
+    ve her grup ayrı bir ileri geçişte (forward pass) puanlanır.
+    SENT_MAX_TOKENS'ı aşan yorumlar cümle sınırlarından parçalara bölünür; parçalar
+    kısa yorumlarla aynı gruplarda puanlanır ve yorumun puanı parçaların token
+    sayısıyla ağırlıklı ortalamasıdır. Böylece yorum başına maliyet sınırlı kalır.
+    """
+    import torch
+
+    texts = list(texts)
+    specials = tokenizer.num_special_tokens_to_add()
+    max_length = min(SENT_MAX_TOKENS, tokenizer.model_max_length)
+
+    def count_tokens(parts):
+        return [len(ids) for ids in tokenizer(list(parts), add_special_tokens=False)["input_ids"]]
+
+    # Metinleri modelin anlayacağı sayısal vektörlere çevir (Tokenization).
+    # Padding burada yapılmaz; her grup kendi içindeki en uzun metne göre doldurulur.
+    encoded = tokenizer(texts)
+    owners = list(range(len(texts)))
+    weights = None
+    content_lengths = [len(ids) - specials for ids in encoded["input_ids"]]
+    if any(n > max_length - specials for n in content_lengths):
+        chunks, owners, weights = chunking.expand(texts, content_lengths, max_length - specials, count_tokens)
+        metrics.count("chunked_reviews", sum(n > max_length - specials for n in content_lengths))
+        metrics.count("chunks", len(chunks))
+        # Tek başına bütçeyi aşan kelimeler yine de kesilir
+        encoded = tokenizer(chunks, truncation=True, max_length=max_length)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+
+    positives = [0.5] * len(lengths)
+    for bucket in make_length_buckets(lengths, batch_size, max_batch_tokens):
+        cancellation.check()
+        features = [{key: encoded[key][i] for key in encoded.keys()} for i in bucket]
+        inputs = tokenizer.pad(features, return_tensors="pt")
+
+        # Modeli çalıştır (Gradyan hesaplama yapma, sadece tahmin)
+        started = time.perf_counter()
+        with torch.no_grad():
+            outputs = model(**inputs)
+        metrics.record_model(
+            "sentiment",
+            items=len(bucket),
+            tokens=sum(lengths[i] for i in bucket),
+            seconds=time.perf_counter() - started,
+        )
+
+        # Çıktıyı olasılığa çevir (Softmax) ve sınıfların beklenen değerini 0-1 aralığına taşı:
+        # 2 sınıflı modelde pozitif sınıfın olasılığı, 5 sınıflı (1-5 yıldız) modelde (yıldız - 1) / 4
+        probs = torch.nn.functional.softmax(outputs.logits, dim=1)
+        positive = probs @ torch.linspace(0, 1, probs.shape[1], dtype=probs.dtype)
+        for i, positive_score in zip(bucket, positive.tolist()):
+            positives[i] = positive_score
+
+    if weights is not None:
+        positives = chunking.combine_weighted(positives, owners, weights, len(texts))
+    return [int(positive_score * 100) for positive_score in positives]
+
+
+def _init_score_worker(threads: int):
+    """Her işçi süreç kendi torch thread sayısını kullanır; işçiler çekirdekleri paylaşır."""
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def _score_shard(shard):
+    """
+    İşçi süreçte çalışır. Model fork sırasında ana süreçten miras alındığı için
+    (copy-on-write) ağırlıklar kopyalanmaz, aynı bellek sayfaları paylaşılır.
+    """
+    texts, batch_size, max_batch_tokens, multilingual = shard
+    # İşçi kendi ölçümünü toplar, ana süreç bunları raporuna ekler
+    report = metrics.PerfReport()
+    with metrics.use_report(report):
+        scores = score_with_model(*_sentiment_model(multilingual), texts, batch_size, max_batch_tokens)
+    return scores, report.models.get("sentiment", {})
+
+
+def score_parallel(
+    texts,
+    workers: int,
+    batch_size: int = SENT_BATCH_SIZE,
+    max_batch_tokens: int = SENT_MAX_BATCH_TOKENS,
+    multilingual: bool = False,
+) -> list:
+    """
+    Metinleri 'workers' adet süreç arasında bölüştürerek puanlar.
+    Model ana süreçte bir kez yüklenir, işçiler fork ile başlatılır ve modeli
+    kopyalamadan paylaşır. Metinler uzunluğa göre sıralanıp ardışık parçalara
+    (shard) bölünür, sonuçlar girdi sırasıyla birleştirilir.
+    fork desteklenmiyorsa (Windows), ONNX arka ucunda veya az metin varsa tek süreçte puanlanır.
+    """
+    import multiprocessing as mp
+
+    texts = list(texts)
+    if (
+        workers <= 1
+        or len(texts) < 2 * batch_size
+        or SENT_BACKEND == "onnx"  # ONNX Runtime oturumları fork sonrası güvenli değil
+        or "fork" not in mp.get_all_start_methods()
+    ):
+        return score_with_model(*_sentiment_model(multilingual), texts, batch_size, max_batch_tokens)
+
+    # Her işçiye birkaç parça düşsün ki yavaş bir parça tüm işi bekletmesin
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    shard_size = max(batch_size, -(-len(texts) // (workers * 4)))
+    shards = [order[k:k + shard_size] for k in range(0, len(order), shard_size)]
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    ctx = mp.get_context("fork")
+    with ctx.Pool(workers, initializer=_init_score_worker, initargs=(threads,)) as pool:
+        pending = pool.map_async(
+            _score_shard,
+            [([texts[i] for i in shard], batch_size, max_batch_tokens, multilingual) for shard in shards],
+        )
+        # İptal edilirse beklemeyi bırak; 'with' çıkışında işçi süreçler sonlandırılır
+        while not pending.ready():
+            cancellation.check()
+            pending.wait(0.1)
+        results = pending.get()
+
+    scores = [50] * len(texts)
+    for shard, (shard_scores, stats) in zip(shards, results):
+        metrics.merge_model("sentiment", stats)
+        for i, score in zip(shard, shard_scores):
+            scores[i] = score
+    return scores
+
+
+def get_sentiment_scores(
+    texts,
+    batch_size: int = SENT_BATCH_SIZE,
+    max_batch_tokens: int = SENT_MAX_BATCH_TOKENS,
+    workers: int = SCORE_WORKERS,
+    multilingual: bool = False,
+) -> list:
+    """
+    Birden fazla metni toplu olarak BERT modeline verir ve her biri için
+    0 ile 100 arasında bir 'Olumluluk Puanı' döndürür (girdi sırasıyla).
+    Önbellekte olmayan metinler score_with_model ile toplu olarak puanlanır
+    (workers > 1 ise score_parallel ile birden fazla süreçte). Çıkarım servisi
+    ayarlıysa servise gönderilir; servise ulaşılamazsa yerel model kullanılır.
+    multilingual: True ise metinler çevrilmemiş kabul edilir ve çok dilli modelle
+        puanlanır; puanlar MULTI_SENT_CALIBRATION ile Türkçe modelin ölçeğine çevrilir.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    if multilingual:
+        # Önbellekte kalibre edilmemiş puan durur; kalibrasyon değişince yeniden puanlamak gerekmez
+        raw = _get_sentiment_scores(texts, batch_size, max_batch_tokens, workers, True)
+        return [calibrate_multilingual(score) for score in raw]
+    return _get_sentiment_scores(texts, batch_size, max_batch_tokens, workers, False)
+
+
+def _get_sentiment_scores(texts, batch_size: int, max_batch_tokens: int, workers: int, multilingual: bool) -> list:
+    if multilingual:
+        model_name, revision, stat = MULTI_SENT_MODEL_NAME, MULTI_SENT_MODEL_REVISION, "multilingual_cache_hits"
+    else:
+        model_name, revision, stat = SENT_MODEL_NAME, SENT_MODEL_REVISION, "sentiment_cache_hits"
+
+    # Daha önce puanlanmış metinler önbellekten gelir, model sadece kalanlar için çalışır
+    cache = get_cache()
+    if cache is not None:
+        commit = model_revision(model_name, revision, "multilingual" if multilingual else "sentiment")
+        if commit is None:
+            cache = None
+        else:
+            revision = commit
+    # Parçalama bütçesi de puanı etkilediği için anahtara girer
+    keys = [cache_key("sentiment", t, model_name, revision, SENT_BACKEND, SENT_MAX_TOKENS) for t in texts]
+    scores = cache.get_many("sentiment", keys) if cache else [None] * len(texts)
+    missing = [i for i, score in enumerate(scores) if score is None]
+    metrics.count(stat, len(texts) - len(missing))
+    if not missing:
+        return scores
+
+    # Aynı anahtarlı (normalize edilmiş metni aynı) yorumlar sadece bir kez puanlanır
+    first = {}
+    for i in missing:
+        first.setdefault(keys[i], i)
+    unique = list(first.values())
+
+    cancellation.check()
+    computed = None
+    client = get_inference_client()
+    if client is not None:
+        try:
+            computed = client.score([texts[i] for i in unique], model="multilingual" if multilingual else "turkish")
+        except Exception as e:
+            print(f"Çıkarım servisi hatası, yerel model kullanılıyor: {e}")
+
+    if computed is None:
+        if multilingual:
+            load_multilingual_model()
+        else:
+            load_sentiment_model()
+        tokenizer, model = _sentiment_model(multilingual)
+        if model is None or tokenizer is None:
+            # Model yüklenemezse Nötr (50) puan ver (önbelleğe yazılmaz)
+            return [50 if score is None else score for score in scores]
+        # Puanlama sürerken model boşaltılmasın (boşaltıldıysa burada yeniden yüklenir)
+        with get_model_registry().use("multilingual" if multilingual else "sentiment"):
+            computed = score_parallel([texts[i] for i in unique], workers, batch_size, max_batch_tokens, multilingual)
+
+    fresh = {}
+    for i, score in zip(unique, computed):
+        fresh[keys[i]] = score
+    for i in missing:
+        scores[i] = fresh[keys[i]]
+
+    if cache is not None:
+        cache.put_many("sentiment", fresh)
+    return scores
+
+
+def parse_calibration(value):
+    """'a,b' metnini ya da [a, b] listesini (a, b) katsayılarına çevirir; tam iki sonlu sayı değilse None."""
+    try:
+        parts = value.split(",") if isinstance(value, str) else list(value)
+        pair = tuple(float(x) for x in parts)
+    except (TypeError, ValueError):
+        return None
+    if len(pair) != 2 or not all(math.isfinite(x) for x in pair):
+        return None
+    return pair
+
+
+def load_calibration() -> tuple:
+    """
+    Çok dilli modelin kalibrasyon katsayıları: önce YORUM_MULTI_CALIBRATION, sonra
+    MULTI_CALIBRATION_PATH (bkz. save_calibration). Geçersiz değerler import'u bozmaz;
+    uyarı yazılıp bir sonrakine, en sonda kalibrasyonsuz (1, 0) katsayılara geçilir.
+    """
+    value = os.environ.get("YORUM_MULTI_CALIBRATION", "").strip()
+    if value:
+        pair = parse_calibration(value)
+        if pair is not None:
+            return pair
+        print(f">> analyzer: UYARI: YORUM_MULTI_CALIBRATION geçersiz ({value!r}); 'a,b' biçiminde iki sayı olmalı.")
+
+    if os.path.exists(MULTI_CALIBRATION_PATH):
+        try:
+            with open(MULTI_CALIBRATION_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            pair = parse_calibration(data.get("calibration"))
+            model = data.get("model")
+        except (OSError, ValueError, AttributeError):
+            pair, model = None, None
+        if pair is not None and model == MULTI_SENT_MODEL_NAME:
+            return pair
+        print(f">> analyzer: UYARI: kalibrasyon dosyası kullanılamadı ({MULTI_CALIBRATION_PATH}).")
+    return IDENTITY_CALIBRATION
+
+
+def save_calibration(a: float, b: float, samples: int = 0) -> str:
+    """Hesaplanan katsayıları MULTI_CALIBRATION_PATH'e yazar (load_calibration okur); dosya yolunu döndürür."""
+    pair = parse_calibration([a, b])
+    if pair is None:
+        raise ValueError(f"Geçersiz kalibrasyon katsayıları: {a}, {b}")
+    os.makedirs(os.path.dirname(MULTI_CALIBRATION_PATH) or ".", exist_ok=True)
+    data = {"model": MULTI_SENT_MODEL_NAME, "calibration": list(pair), "samples": samples, "fitted_at": time.time()}
+    # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yazılır
+    tmp_path = MULTI_CALIBRATION_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MULTI_CALIBRATION_PATH)
+    return MULTI_CALIBRATION_PATH
+
+
+MULTI_SENT_CALIBRATION = load_calibration()
+
+
+def calibrate_multilingual(score: float) -> int:
+    """Çok dilli modelin 0-100 puanını Türkçe modelin ölçeğine taşır (a * puan + b, 0-100 arası)."""
+    a, b = MULTI_SENT_CALIBRATION
+    return int(round(min(100.0, max(0.0, a * score + b))))
+
+
+def fit_calibration(multilingual_scores, reference_scores):
+    """
+    MULTI_SENT_CALIBRATION için (a, b) katsayılarını en küçük kareler yöntemiyle bulur.
+    Aynı yorumların (örn. Türkçe yorumlar) çok dilli modelden kalibrasyonsuz puanları
+    (get_sentiment_scores(..., multilingual=True) ile MULTI_SENT_CALIBRATION=(1, 0) iken)
+    ve Türkçe modelden puanları verilir. Sonuç save_calibration ile kaydedilebilir
+    ya da YORUM_MULTI_CALIBRATION="a,b" olarak ayarlanabilir.
+    """
+    xs = [float(x) for x in multilingual_scores]
+    ys = [float(y) for y in reference_scores]
+    if len(xs) != len(ys) or len(xs) < 2:
+        raise ValueError("Kalibrasyon için aynı uzunlukta en az iki puan çifti gerekli")
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return 1.0, mean_y - mean_x
+    a = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+    return a, mean_y - a * mean_x
+
+
+def fit_multilingual_calibration(texts):
+    """
+    Türkçe yorumları hem Türkçe modelle hem de (kalibrasyonsuz) çok dilli modelle
+    puanlayıp MULTI_SENT_CALIBRATION için (a, b) katsayılarını bulur (bkz. fit_calibration).
+    """
+    texts = [t for t in texts if is_analyzable(t)]
+    load_sentiment_model()
+    load_multilingual_model()
+    if sent_model is None or multi_model is None:
+        raise RuntimeError("Kalibrasyon için iki sentiment modeli de yüklenebilmeli")
+    reference = get_sentiment_scores(texts)
+    raw = _get_sentiment_scores(texts, SENT_BATCH_SIZE, SENT_MAX_BATCH_TOKENS, SCORE_WORKERS, True)
+    return fit_calibration(raw, reference)
+
+
+def prepare_for_scoring(texts):
+    """
+    Yorumları puanlamaya hazırlar: (modele verilecek metinler, dil kodları, çok_dilli_mi).
+    translate modunda Türkçe olmayanlar çevrilir ve hepsi Türkçe modelle puanlanır;
+    multilingual modunda sadece dil algılanır, Türkçe olmayanlar çevrilmeden çok dilli
+    modelle puanlanmak üzere işaretlenir (bkz. score_prepared).
+    """
+    texts = list(texts)
+    if SENTIMENT_MODE != "multilingual":
+        translated, langs = translate_with_languages(texts)
+        return translated, langs, [False] * len(texts)
+
+    detected = detect_languages(texts)
+    foreign = [lang_detect.should_translate(lang, confidence) for lang, confidence in detected]
+    metrics.count("foreign", sum(foreign))
+    return texts, [lang for lang, _ in detected], foreign
+
+
+def score_prepared(texts, multilingual, batch_size: int = SENT_BATCH_SIZE, workers: int = SCORE_WORKERS) -> list:
+    """prepare_for_scoring çıktısını puanlar: her grup kendi modeline tek çağrıda gider (girdi sırasıyla)."""
+    texts = list(texts)
+    scores = [50] * len(texts)
+    for flag in (False, True):
+        group = [i for i, m in enumerate(multilingual) if m == flag]
+        if group:
+            group_scores = get_sentiment_scores(
+                [texts[i] for i in group], batch_size=batch_size, workers=workers, multilingual=flag
+            )
+            for i, score in zip(group, group_scores):
+                scores[i] = score
+    return scores
+
+
+def display_translations(details) -> list:
+    """
+    Çok dilli modda yorumlar çevrilmeden puanlanır; bu fonksiyon ekranda gösterilecek
+    birkaç yorumun Türkçe çevirilerini girdi sırasıyla döndürür (çevrilmesi gerekmeyenler
+    için None). Yorumları değiştirmez; böylece arka plan thread'inde çalıştırılıp sonuçlar
+    arayüz thread'inde uygulanabilir. translate modunda hepsi None'dır.
+    """
+    details = list(details)
+    result = [None] * len(details)
+    todo = [
+        i for i, d in enumerate(details)
+        if d.get("translated") == d.get("original") and d.get("lang") != "tr"
+    ]
+    if SENTIMENT_MODE == "multilingual" and todo:
+        with metrics.stage("translate"):
+            translated = translate_many([details[i]["original"] for i in todo])
+        for i, text in zip(todo, translated):
+            result[i] = text
+    return result
+
+
+def translate_for_display(details) -> list:
+    """display_translations ile aynı; çevirileri 'translated' alanına yazar (yerinde günceller) ve listeyi döndürür."""
+    details = list(details)
+    for detail, text in zip(details, display_translations(details)):
+        if text is not None:
+            detail["translated"] = text
+    return details
+
+
+def get_sentiment_score(text: str) -> int:
+    """
+    Metni BERT modeline verir ve 0 ile 100 arasında bir 'Olumluluk Puanı' döndürür.
+    """
+    return get_sentiment_scores([text])[0]
+
+
+# ---------------- ANA ANALİZ FONKSİYONU ---------------- #
+
+# Bayesian düzeltmede kullanılan sabitler
+PRIOR_SCORE = 60  # Varsayılan güvenli puan (C)
+PRIOR_WEIGHT = 10  # Güven eşiği, yorum sayısı (m)
+
+
+def is_analyzable(comment: str) -> bool:
+    """Çok kısa (3 kelimeden az) yorumlar analiz edilmez."""
+    return len(comment.split()) >= 3
+
+
+def compute_final_score(score_sum: float, count: int, average_stars: float = 0.0) -> float:
+    """
+    Yapay zeka puanlarının toplamı ve sayısından nihai puanı hesaplar.
+    Sadece toplam ve sayıya ihtiyaç duyduğu için puanlar geldikçe
+    (akış halinde) tekrar tekrar çağrılabilir.
+    """
+    if count <= 0:
+        return 50
+
+    # -- PUAN HESAPLAMA ALGORİTMASI --
+
+    # Adım 1: Yapay zekanın verdiği puanların ortalaması
+    avg_ai_score = score_sum / count
+
+    # Adım 2: Bayesian Düzeltme (Smoothing)
+    # Az sayıda yorum varsa puana hemen güvenme, onu genel ortalamaya (60) yaklaştır.
+    # Yorum sayısı arttıkça (m=10 eşiğini geçtikçe) yapay zeka puanına daha çok güven.
+    C = PRIOR_SCORE
+    m = PRIOR_WEIGHT
+    bayesian_score = (count / (count + m)) * avg_ai_score + (m / (count + m)) * C
+
+    # Adım 3: Sitedeki Yıldız Puanını Dahil Et
+    # Sonuç sadece yapay zekaya değil, sitedeki yıldızlara da bağlı olsun.
+    if average_stars > 0:
+        star_score = (average_stars / 5.0) * 100
+        # %70 Yapay Zeka, %30 Site Puanı ağırlığı
+        return (bayesian_score * 0.7) + (star_score * 0.3)
+    return bayesian_score
+
+
+def analyze_comments(
+    comments,
+    total_reviews: int = 0,
+    average_stars: float = 0.0,
+    batch_size: int = SENT_BATCH_SIZE,
+    workers: int = SCORE_WORKERS,
+    prior: dict | None = None,
+    deduplicate: bool = True,
+    weight_by_cluster: bool = True,
+    ratings=None,
+    adaptive: bool = False,
+    tolerance: float = ADAPTIVE_TOLERANCE,
+    time_budget: float | None = ADAPTIVE_TIME_BUDGET,
+    max_samples: int | None = None,
+    cancel=None,
+):
+    """
+    Tüm süreci yöneten beyin fonksiyonu:
+    1. Yorumları çevir
+    2. Duygu analizi yap (toplu, batch_size'lık gruplar halinde; workers > 1 ise paralel)
+    3. Puanları istatistiksel olarak dengele (Bayesian Smoothing)
+    Sonuçtaki 'perf' aşama sürelerini, sayaçları, model başına token/saniye ve
+    bellek kullanımını içerir (bkz. metrics.PerfReport). Çağıran taraf zaten bir
+    rapor etkinleştirdiyse (örn. kazıma süresi de ölçülüyorsa) o rapor kullanılır.
+    prior: Daha önce puanlanmış yorumların yeterli istatistikleri {"score_sum", "count"}.
+        Verilirse sadece 'comments' puanlanır ve nihai puan bu toplamlara eklenerek
+        hesaplanır (artımlı analiz, bkz. pipeline.analyze_incremental).
+        Sonuçtaki 'score_sum' ve 'count' her zaman önceki toplamlar dahil güncel değerlerdir.
+    deduplicate: Birebir ve yakın kopya yorumlar kümelenir (bkz. dedup.cluster_texts);
+        her kümeden sadece temsilci çevrilip puanlanır, puanı kümenin tüm üyelerine verilir.
+    weight_by_cluster: True ise her kopya ayrı yorum sayılır (puan, kopyalar hiç
+        ayıklanmamış gibi hesaplanır); False ise her küme nihai puana bir kez girer.
+    ratings: Yorumların yıldız puanları (comments ile aynı sırada, bilinmeyenler None).
+        Uyarlamalı modda örnekleme bu puanlara göre katmanlanır.
+    adaptive: True ise yorumların hepsi değil, rastgele partiler halinde bir örneklemi
+        puanlanır. final_score'un %95 güven aralığının yarı genişliği 'tolerance'
+        puanın altına inince, 'time_budget' saniye dolunca ya da 'max_samples'
+        yoruma ulaşılınca durulur. Sonuçta 'sample_size', 'population',
+        'confidence_interval' ve durma sebebi ('stopped') bulunur.
+    cancel: İptal belirteci (bkz. cancellation.CancelToken; verilmezse etkin olan kullanılır).
+        İptal edilirse ya da süre sınırı dolarsa o ana kadar puanlanan yorumlarla
+        hesaplanan sonuç döner: 'partial' True, 'sample_size' puanlanan yorum sayısı,
+        'stopped' iptal sebebidir ("cancelled" veya "deadline").
+    """
+    report = metrics.current_report() or metrics.PerfReport()
+    token = cancel or cancellation.current_token()
+    with metrics.use_report(report), cancellation.use_token(token), metrics.profiled("analyze_comments"):
+        if adaptive:
+            result = _analyze_adaptive(
+                comments, ratings, average_stars, batch_size, workers, prior or {}, deduplicate,
+                tolerance, time_budget, max_samples,
+            )
+        else:
+            result = _analyze_comments(
+                comments, average_stars, batch_size, workers, prior or {}, deduplicate, weight_by_cluster
+            )
+
+    result["perf"] = report.as_dict()
+    print(f">> analyzer: performans {metrics.summary_line(result['perf'])}")
+    return result
+
+
+def _cluster_kept(kept, deduplicate: bool) -> list:
+    """Kopya yorumlar: her yorum için kümesinin temsilcisinin indeksi (deduplicate kapalıysa kendisi)."""
+    if deduplicate:
+        with metrics.stage("dedup"):
+            clusters = dedup.cluster_texts(kept)
+    else:
+        clusters = list(range(len(kept)))
+    metrics.count("duplicates", len(kept) - len(set(clusters)))
+    return clusters
+
+
+def _score_texts(texts, batch_size: int, workers: int) -> list:
+    """Metinleri çevirip puanlar: [(çeviri, dil, puan)]."""
+    # 1. Çeviri (yabancı dildeki yorumlar tek seferde, toplu olarak çevrilir;
+    #    çok dilli modda çevrilmez, sadece dili algılanır)
+    with metrics.stage("translate"):
+        translated, langs, multilingual = prepare_for_scoring(texts)
+
+    # 2. Puanlama (her model için tek çağrıda, uzunluğa göre gruplanarak)
+    with metrics.stage("sentiment"):
+        sentiment = score_prepared(translated, multilingual, batch_size=batch_size, workers=workers)
+    return list(zip(translated, langs, sentiment))
+
+
+def _member_details(kept, clusters, scored: dict):
+    """
+    Temsilcinin çevirisi ve puanı kümenin tüm üyelerine verilir (scored: temsilci
+    indeksi -> (çeviri, dil, puan)). Temsilcisi puanlanmamış yorumlar (iptal) atlanır.
+    (detaylar, temsilci_mi) döndürür; temsilci_mi False ise yorum daha önceki bir
+    yorumun kopyasıdır ve puanı ondan gelir.
+    """
+    processed, is_representative = [], []
+    for i, comment in enumerate(kept):
+        if clusters[i] not in scored:
+            continue
+        bg_text, lang, score = scored[clusters[i]]
+        processed.append(
+            {
+                "original": comment,
+                "translated": bg_text,
+                "lang": lang,
+                "score": score,
+            }
+        )
+        is_representative.append(clusters[i] == i)
+    return processed, is_representative
+
+
+def _score_kept(kept, batch_size: int, workers: int, deduplicate: bool):
+    """
+    Analiz edilebilir yorumları kopyalarından ayıklayıp çevirir ve puanlar.
+    (detaylar, temsilci_mi) döndürür (bkz. _member_details).
+    """
+    clusters = _cluster_kept(kept, deduplicate)
+    representatives = sorted(set(clusters))
+    scored = dict(zip(representatives, _score_texts([kept[i] for i in representatives], batch_size, workers)))
+    return _member_details(kept, clusters, scored)
+
+
+def _cache_stats() -> dict:
+    # Önbellek isabet/ıskalama istatistikleri (süreç başından beri toplam)
+    cache = get_cache()
+    cache_stats = cache.stats() if cache is not None else {}
+    if cache_stats:
+        print(f">> analyzer: önbellek durumu {cache_stats}")
+    return cache_stats
+
+
+def _analyze_comments(
+    comments, average_stars: float, batch_size: int, workers: int, prior: dict, deduplicate: bool, weight_by_cluster: bool
+) -> dict:
+    prior_sum = prior.get("score_sum", 0)
+    prior_count = prior.get("count", 0)
+    if not comments:
+        final_score = compute_final_score(prior_sum, prior_count, average_stars) if prior_count > 0 else 50
+        return {
+            "final_score": int(final_score), "details": [], "score_sum": prior_sum, "count": prior_count,
+            "partial": False,
+        }
+
+    # Çok kısa (3 kelimeden az) yorumları analiz etme
+    kept = [c for c in comments if is_analyzable(c)]
+    metrics.count("comments", len(comments))
+    metrics.count("skipped_short", len(comments) - len(kept))
+
+    # Kopyalar parçalara bölmeden önce tüm yorumlar üzerinde bir kez kümelenir;
+    # böylece farklı parçalara düşen kopyalar da yakalanır
+    clusters = _cluster_kept(kept, deduplicate)
+    representatives = sorted(set(clusters))
+
+    # İptal edilebilir analizde temsilciler parça parça puanlanır; iptal edilirse
+    # tamamlanan parçalar (ve kopyaları) kısmi sonucu oluşturur
+    token = cancellation.current_token()
+    chunk = CANCEL_CHUNK if token is not None else max(1, len(representatives))
+    scored = {}
+    stopped = None
+    try:
+        for start in range(0, len(representatives), chunk):
+            part = representatives[start:start + chunk]
+            scored.update(zip(part, _score_texts([kept[i] for i in part], batch_size, workers)))
+    except cancellation.Cancelled as e:
+        stopped = e.reason
+    processed, is_representative = _member_details(kept, clusters, scored)
+    if stopped is not None:
+        print(f">> analyzer: analiz durduruldu ({stopped}), {len(processed)}/{len(kept)} yorum puanlandı.")
+    partial = len(processed) < len(kept)
+    scores = [
+        d["score"] for d, representative in zip(processed, is_representative)
+        if weight_by_cluster or representative
+    ]
+    cache_stats = _cache_stats()
+
+    # Önceki analizlerden gelen toplamlara yeni puanlar eklenir
+    score_sum = prior_sum + sum(scores)
+    count = prior_count + len(scores)
+    # 3. Nihai puan (Bayesian düzeltme + site yıldızları)
+    final_score = compute_final_score(score_sum, count, average_stars) if count > 0 else 50
+
+    result = {
+        "final_score": int(final_score),
+        "details": processed,
+        "cache_stats": cache_stats,
+        "score_sum": score_sum if count > 0 else 0,
+        "count": max(count, 0),
+        "partial": partial,
+    }
+    if partial:
+        result["sample_size"] = len(processed)
+        result["stopped"] = token.reason
+    return result
+
+
+def _analyze_adaptive(
+    comments, ratings, average_stars: float, batch_size: int, workers: int, prior: dict, deduplicate: bool,
+    tolerance: float, time_budget: float | None, max_samples: int | None,
+) -> dict:
+    """
+    Uyarlamalı örnekleme (bkz. analyze_comments): yorumlar yıldız puanına göre
+    katmanlanıp karıştırılır, her turda katmanlardan orantılı bir parti puanlanır.
+    Ortalama puan katmanlı tahminle, nihai puanın güven aralığı da bu tahminin
+    standart hatasından hesaplanır. Örneklenen ortalama tüm yorumlara genellenir.
+    """
+    started = time.perf_counter()
+    prior_sum = prior.get("score_sum", 0)
+    prior_count = prior.get("count", 0)
+    ratings = list(ratings) if ratings is not None else [None] * len(comments)
+
+    pairs = [(c, r) for c, r in zip(comments, ratings) if is_analyzable(c)]
+    kept = [c for c, _ in pairs]
+    metrics.count("comments", len(comments))
+    metrics.count("skipped_short", len(comments) - len(kept))
+
+    population = len(kept)
+    sampler = sampling.StratifiedSampler([sampling.stratum_of(r) for _, r in pairs])
+
+    def final_at(mean: float) -> float:
+        # Örneklem ortalaması tüm (analiz edilebilir) yorumlar için geçerli sayılır
+        return compute_final_score(prior_sum + mean * population, prior_count + population, average_stars)
+
+    processed = []
+    interval = (0.0, 100.0)
+    stopped = "exhausted"
+    while sampler.remaining:
+        n = ADAPTIVE_BATCH if max_samples is None else min(ADAPTIVE_BATCH, max_samples - sampler.sampled)
+        indices = sampler.draw(n)
+        try:
+            details, _ = _score_kept([kept[i] for i in indices], batch_size, workers, deduplicate)
+        except cancellation.Cancelled as e:
+            stopped = e.reason
+            break
+        for i, detail in zip(indices, details):
+            sampler.add(i, detail["score"])
+            processed.append(detail)
+
+        mean, se = sampler.estimate()
+        low = final_at(max(0.0, mean - sampling.Z_95 * se))
+        high = final_at(min(100.0, mean + sampling.Z_95 * se))
+        interval = (min(low, high), max(low, high))
+        print(
+            f">> analyzer: {sampler.sampled}/{population} yorum örneklendi, "
+            f"puan {final_at(mean):.1f} [{interval[0]:.1f}, {interval[1]:.1f}]"
+        )
+
+        if not sampler.remaining:
+            break
+        if sampler.sampled >= ADAPTIVE_MIN_SAMPLES and (interval[1] - interval[0]) / 2 <= tolerance:
+            stopped = "tolerance"
+            break
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            stopped = "time_budget"
+            break
+        if max_samples is not None and sampler.sampled >= max_samples:
+            stopped = "sample_budget"
+            break
+
+    metrics.count("sampled", sampler.sampled)
+    cache_stats = _cache_stats()
+
+    if population == 0 or sampler.sampled == 0:
+        # Analiz edilecek yorum yok ya da daha ilk parti puanlanmadan iptal edildi
+        final_score = compute_final_score(prior_sum, prior_count, average_stars) if prior_count > 0 else 50
+        score_sum, count = prior_sum, prior_count
+        if population == 0:
+            interval = (final_score, final_score)
+    else:
+        mean, _ = sampler.estimate()
+        final_score = final_at(mean)
+        score_sum, count = prior_sum + mean * population, prior_count + population
+
+    return {
+        "final_score": int(final_score),
+        "details": processed,
+        "cache_stats": cache_stats,
+        "score_sum": score_sum,
+        "count": count,
+        "sample_size": sampler.sampled,
+        "population": population,
+        "confidence_interval": [round(interval[0], 2), round(interval[1], 2)],
+        "stopped": stopped,
+        "partial": stopped in ("cancelled", "deadline"),
+    }
@@ -1,310 +1,631 @@
-# app.py
-# -*- coding: utf-8 -*-
-
-import sys
-import traceback
-
-# PyQt5: Masaüstü uygulaması arayüzü oluşturmak için kullanılan kütüphane
-from PyQt5.QtWidgets import (
-    QApplication,
-    QWidget,
-    QVBoxLayout,
-    QLabel,
-    QLineEdit,
-    QPushButton,
-    QStackedWidget,
-    QProgressBar,
-    QMessageBox,
-    QTextEdit,
-)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont
-
-# Hata Yönetimi: Eğer scraper veya analyzer dosyaları eksikse programın çökmesini engeller.
-try:
-    from scraper import get_reviews  # Web kazıma fonksiyonu
-    from analyzer import analyze_comments, warmup_models  # YZ analiz fonksiyonları
-except ImportError:
-    print("HATA: 'scraper.py' veya 'analyzer.py' dosyası eksik!")
-    sys.exit(1)
-
-
-# --- ARKA PLAN İŞÇİSİ (WORKER THREAD) ---
-# Arayüzün (UI) donmaması için ağır işlemler (Scraping ve AI Analizi)
-# ana döngüden ayrı bir "Thread" (iş parçacığı) içinde çalıştırılır.
-class WorkerThread(QThread):
-    finished = pyqtSignal(dict)  # İşlem başarıyla biterse veriyi (dictionary) ana ekrana yollar.
-    error = pyqtSignal(str)      # Hata olursa hata mesajını (string) yollar.
-
-    def __init__(self, url: str):
-        super().__init__()
-        self.url = url  # Analiz edilecek ürün linki
-
-    def run(self):
-        """Thread .start() komutuyla çağrıldığında çalışan ana fonksiyon"""
-        try:
-            # 1. ADIM: Yorumları Web'den Çek (Scraping)
-            # max_reviews=None diyerek limit koymadan çekebildiği kadarını almasını söylüyoruz.
-            data = get_reviews(self.url, max_reviews=None)
-            comments = data.get("comments", [])
-
-            # Eğer hiç yorum çekilemediyse hata sinyali gönder ve durdur.
-            if not comments:
-                self.error.emit("Yorum bulunamadı. Linki kontrol edin.")
-                return
-
-            # 2. ADIM: Yorumları Yapay Zeka ile Analiz Et
-            # (analyze_comments fonksiyonu hem çeviri hem de duygu analizi yapar)
-            result = analyze_comments(
-                comments,
-                total_reviews=data.get("total_reviews", 0),
-                average_stars=data.get("average_stars", 0.0),
-            )
-
-            # Siteden toplam yorum sayısı çekilemediyse, elimizdeki yorum sayısını toplam kabul et.
-            total_site_reviews = data.get("total_reviews", len(comments))
-
-            # 3. ADIM: Sonuçları Ana Ekrana Gönder
-            self.finished.emit(
-                {
-                    "score": result["final_score"],  # 0-100 arası yapay zeka puanı
-                    "reviews": result["details"],    # Yorumların tek tek analiz detayları
-                    "total_count": total_site_reviews, # Toplam yorum sayısı
-                    "site_stars": data.get("average_stars", 0.0), # Sitedeki yıldız puanı
-                }
-            )
-
-        except Exception as e:
-            # Beklenmedik bir hata olursa konsola yazdır ve arayüze bildir.
-            traceback.print_exc()
-            self.error.emit(str(e))
-
-
-# --- ANA PENCERE TASARIMI ---
-class ModernApp(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.init_ui()
-
-    def init_ui(self):
-        """Pencere özelliklerini ve stil ayarlarını yükler."""
-        self.setWindowTitle("AI Ürün Analizi")
-        self.setGeometry(200, 200, 600, 700) # x, y, genişlik, yükseklik
-
-        # CSS Benzeri Stil Tanımlamaları (Koyu Tema)
-        self.setStyleSheet(
-            """
-            QWidget { background-color: #181825; color: #cdd6f4; font-family: 'Segoe UI'; }
-            QLineEdit {
-                background-color: #313244; border: 2px solid #89b4fa;
-                border-radius: 10px; padding: 10px; color: white; font-size: 14px;
-            }
-            QPushButton {
-                background-color: #89b4fa; color: #1e1e2e; border-radius: 10px;
-                padding: 12px; font-weight: bold; font-size: 15px;
-            }
-            QPushButton:hover { background-color: #b4befe; }
-            QProgressBar {
-                border: 2px solid #fab387; border-radius: 8px; text-align: center;
-            }
-            QProgressBar::chunk { background-color: #fab387; }
-            QTextEdit {
-                background-color: #1e1e2e; border: 1px solid #45475a;
-                border-radius: 8px; padding: 10px; font-size: 13px; color: #a6adc8;
-            }
-        """
-        )
-
-        # QStackedWidget: Sayfalar arası geçiş yapmamızı sağlar (Home -> Loading -> Result)
-        self.stack = QStackedWidget()
-        self.layout = QVBoxLayout()
-
-        self.page_home = self.ui_home()       # 1. Sayfa: Giriş
-        self.page_loading = self.ui_loading() # 2. Sayfa: Yükleniyor
-        self.page_result = self.ui_result()   # 3. Sayfa: Sonuçlar
-
-        self.stack.addWidget(self.page_home)
-        self.stack.addWidget(self.page_loading)
-        self.stack.addWidget(self.page_result)
-
-        self.layout.addWidget(self.stack)
-        self.setLayout(self.layout)
-
-    # ---------- SAYFA 1: GİRİŞ EKRANI ----------
-    def ui_home(self):
-        page = QWidget()
-        layout = QVBoxLayout()
-        layout.setContentsMargins(40, 40, 40, 40)
-        layout.setSpacing(20)
-
-        lbl_title = QLabel("Ürün / Yorum Analizi")
-        lbl_title.setAlignment(Qt.AlignCenter)
-        lbl_title.setFont(QFont("Segoe UI", 18, QFont.Bold))
-
-        # Kullanıcıyı yönlendiren açıklama metni
-        lbl_desc = QLabel(
-            "Amazon ürün sayfası linkini gir,\n"
-            "yorumları yapay zeka ile analiz edelim."
-        )
-        lbl_desc.setAlignment(Qt.AlignCenter)
-        lbl_desc.setWordWrap(True)
-
-        self.input_url = QLineEdit()
-        self.input_url.setPlaceholderText("Amazon ürün linkini buraya yapıştır...")
-
-        btn_start = QPushButton("Analize Başla")
-        btn_start.clicked.connect(self.start_analysis) # Butona basınca start_analysis çalışır
-
-        layout.addWidget(lbl_title)
-        layout.addWidget(lbl_desc)
-        layout.addWidget(self.input_url)
-        layout.addWidget(btn_start)
-        layout.addStretch() # Elemanları yukarı itmek için boşluk
-
-        page.setLayout(layout)
-        return page
-
-    # ---------- SAYFA 2: YÜKLENİYOR EKRANI ----------
-    def ui_loading(self):
-        page = QWidget()
-        layout = QVBoxLayout()
-        layout.setContentsMargins(40, 40, 40, 40)
-        layout.setSpacing(10)
-
-        lbl_main = QLabel("Analiz Yapılıyor...")
-        lbl_main.setAlignment(Qt.AlignCenter)
-        lbl_main.setFont(QFont("Segoe UI", 18, QFont.Bold))
-
-        # Kullanıcıya işlemin uzun sürebileceğini bildiren metin
-        lbl_sub = QLabel("Yorum sayısına bağlı olarak bu işlem biraz zaman alabilir.\nLütfen bekleyin.")
-        lbl_sub.setAlignment(Qt.AlignCenter)
-        lbl_sub.setFont(QFont("Segoe UI", 10))
-        lbl_sub.setStyleSheet("color: #a6adc8;")
-
-        # İlerleme çubuğu (Range 0-0 olduğu için sonsuz döngü animasyonu yapar)
-        self.progress = QProgressBar()
-        self.progress.setRange(0, 0)
-
-        layout.addStretch()
-        layout.addWidget(lbl_main)
-        layout.addWidget(lbl_sub)
-        layout.addSpacing(20)
-        layout.addWidget(self.progress)
-        layout.addStretch()
-
-        page.setLayout(layout)
-        return page
-
-    # ---------- SAYFA 3: SONUÇ EKRANI ----------
-    def ui_result(self):
-        page = QWidget()
-        layout = QVBoxLayout()
-        layout.setContentsMargins(40, 40, 40, 40)
-        layout.setSpacing(20)
-
-        lbl_title = QLabel("Analiz Sonucu")
-        lbl_title.setAlignment(Qt.AlignCenter)
-        lbl_title.setFont(QFont("Segoe UI", 18, QFont.Bold))
-
-        # Büyük puan göstergesi (Örn: %85)
-        self.lbl_score = QLabel("%0")
-        self.lbl_score.setAlignment(Qt.AlignCenter)
-        self.lbl_score.setFont(QFont("Segoe UI", 32, QFont.Bold))
-
-        # Detay bilgileri (Yorum sayısı ve site puanı)
-        self.lbl_info = QLabel("Okunan Yorum: 0 | Site Puanı: 0.0")
-        self.lbl_info.setAlignment(Qt.AlignCenter)
-
-        # Analiz edilen yorumların detaylarını gösterecek metin alanı (Salt okunur)
-        self.txt_reviews = QTextEdit()
-        self.txt_reviews.setReadOnly(True)
-
-        btn_back = QPushButton("Yeni Link Analiz Et")
-        btn_back.clicked.connect(self.go_home) # Ana sayfaya dönüş
-
-        layout.addWidget(lbl_title)
-        layout.addWidget(self.lbl_score)
-        layout.addWidget(self.lbl_info)
-        layout.addWidget(self.txt_reviews)
-        layout.addWidget(btn_back)
-
-        page.setLayout(layout)
-        return page
-
-    # ---------- FONKSİYONLAR ----------
-    def go_home(self):
-        """Ana sayfaya döner ve girdiyi temizler."""
-        self.stack.setCurrentIndex(0)
-
-    def start_analysis(self):
-        """Analiz işlemini başlatır."""
-        url = self.input_url.text().strip()
-        if not url:
-            QMessageBox.warning(self, "Uyarı", "Lütfen bir ürün linki girin.")
-            return
-
-        self.stack.setCurrentIndex(1) # Yükleniyor sayfasına geç
-
-        try:
-            # Modelleri önceden yüklemeyi dene (hızlandırma amaçlı)
-            warmup_models()
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"Modeller yüklenirken hata oluştu:\n{e}")
-            self.stack.setCurrentIndex(0)
-            return
-
-        # Thread'i oluştur ve başlat
-        self.worker = WorkerThread(url)
-        self.worker.finished.connect(self.display_result) # Başarılı olursa display_result çalışsın
-        self.worker.error.connect(self.display_error)     # Hata olursa display_error çalışsın
-        self.worker.start()
-
-    def display_result(self, data: dict):
-        """Thread'den gelen sonuçları ekrana basar."""
-        score = data.get("score", 0)
-        reviews = data.get("reviews", [])
-
-        # Puana göre renk belirleme (Yeşil, Sarı, Kırmızı)
-        if score >= 75:
-            color = "#a6e3a1"
-        elif score >= 50:
-            color = "#f9e2af"
-        else:
-            color = "#f38ba8"
-
-        self.lbl_score.setText(f"%{score}")
-        self.lbl_score.setStyleSheet(
-            f"color: {color}; font-size: 72px; font-weight: bold;"
-        )
-
-        self.lbl_info.setText(
-            f"Okunan Yorum: {data.get('total_count', 0)} | "
-            f"Site Puanı: {data.get('site_stars', 0.0)}"
-        )
-
-        # Yorumları puanlarına göre sıralayıp (En iyi ve En kötü) göster
-        text = ""
-        text += "--- 👍 NEDEN SEVİLDİ? ---\n"
-        # En yüksek puanlı 3 yorum
-        for r in sorted(reviews, key=lambda x: x["score"], reverse=True)[:3]:
-            text += f"[{r['score']}] {r['translated']}\n\n"
-
-        text += "\n--- 👎 NEDEN ELEŞTİRİLDİ? ---\n"
-        # En düşük puanlı 3 yorum
-        for r in sorted(reviews, key=lambda x: x["score"])[:3]:
-            text += f"[{r['score']}] {r['translated']}\n\n"
-
-        self.txt_reviews.setText(text)
-        self.stack.setCurrentIndex(2) # Sonuç sayfasına geç
-
-    def display_error(self, msg: str):
-        """Hata mesajını kullanıcıya gösterir."""
-        self.stack.setCurrentIndex(0) # Ana sayfaya dön
-        QMessageBox.critical(self, "Hata", msg)
-
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = ModernApp()
-    window.show()
+# app.py
+# -*- coding: utf-8 -*-
+
+import sys
+import traceback
+
+# PyQt5: Masaüstü uygulaması arayüzü oluşturmak için kullanılan kütüphane
+from PyQt5.QtWidgets import (
+    QApplication,
+    QWidget,
+    QVBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QStackedWidget,
+    QProgressBar,
+    QMessageBox,
+    QTextEdit,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+    QHBoxLayout,
+    QComboBox,
+)
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from review_table import (
+    ReviewTableModel,
+    ReviewFilterProxy,
+    SCORE_COLUMN,
+    LANG_COLUMN,
+    SCORE_RANGES,
+    score_color,
+)
+
+# Akış sırasında gelen yorumlar tabloya bu aralıklarla (ms) toplu eklenir
+TABLE_FLUSH_MS = 200
+
+# Hata Yönetimi: Eğer scraper veya analyzer dosyaları eksikse programın çökmesini engeller.
+try:
+    from pipeline import analyze_stream  # Kazıma + çeviri + puanlama akışı
+    from analyzer import warmup_models  # YZ modellerini önceden yükleme
+    from analyzer import SENTIMENT_MODE, display_translations  # Çok dilli modda sadece gösterilen yorumlar çevrilir
+    from browser_pool import shutdown_browser_pool  # Sıcak tutulan Chromium'u kapatmak için
+    from cancellation import CancelToken, DEFAULT_DEADLINE  # Süren analizi durdurmak için
+except ImportError:
+    print("HATA: 'scraper.py', 'analyzer.py' veya 'pipeline.py' dosyası eksik!")
+    sys.exit(1)
+
+
+def perf_summary(perf: dict | None) -> str:
+    """Performans raporunun kısa metni (sonuç bilgisinin ipucunda gösterilir)."""
+    if not perf:
+        return ""
+    lines = [f"Toplam süre: {perf.get('wall_s', 0):.1f} sn"]
+    for name, stage in sorted(perf.get("stages", {}).items(), key=lambda kv: -kv[1]["seconds"]):
+        lines.append(f"{name}: {stage['seconds']:.2f} sn")
+    return "\n".join(lines)
+
+
+# --- ARKA PLAN İŞÇİSİ (WORKER THREAD) ---
+# Arayüzün (UI) donmaması için ağır işlemler (Scraping ve AI Analizi)
+# ana döngüden ayrı bir "Thread" (iş parçacığı) içinde çalıştırılır.
+class WorkerThread(QThread):
+    finished = pyqtSignal(dict)  # İşlem başarıyla biterse veriyi (dictionary) ana ekrana yollar.
+    error = pyqtSignal(str)      # Hata olursa hata mesajını (string) yollar.
+    review_scored = pyqtSignal(dict)  # Her yorum puanlandığında o yorumun detayını yollar.
+    running_score = pyqtSignal(int)   # O ana kadarki yorumlarla hesaplanan anlık puan.
+    progress = pyqtSignal(int, int)   # (puanlanan yorum, kuyruğa giren yorum) sayıları.
+    cancelled = pyqtSignal(str)       # Hiç yorum puanlanmadan durdurulursa sebebini yollar.
+
+    def __init__(self, url: str, deadline: float | None = DEFAULT_DEADLINE):
+        super().__init__()
+        self.url = url  # Analiz edilecek ürün linki
+        # İptal belirteci: cancel() ile ya da süre sınırı (saniye) dolunca tetiklenir
+        self.token = CancelToken(deadline)
+
+    def cancel(self):
+        """Analizi durdurur; o ana kadar puanlanan yorumlarla kısmi sonuç gönderilir."""
+        self.token.cancel()
+
+    def run(self):
+        """Thread .start() komutuyla çağrıldığında çalışan ana fonksiyon"""
+        try:
+            # Kazıma, çeviri ve puanlama aşamaları aynı anda çalışır;
+            # her yorum puanlandıkça sonucu ekrana sinyal olarak gönderilir.
+            # max_reviews=None diyerek limit koymadan çekebildiği kadarını almasını söylüyoruz.
+            result = analyze_stream(
+                self.url,
+                on_review=self._on_review,
+                on_progress=self.progress.emit,
+                max_reviews=None,
+                cancel=self.token,
+            )
+
+            # Durdurulduysa ve hiç yorum puanlanmadıysa gösterilecek sonuç yok
+            if result["partial"] and not result["details"]:
+                self.cancelled.emit(result["stopped"])
+                return
+
+            # Eğer hiç yorum çekilemediyse hata sinyali gönder ve durdur.
+            if not result["scraped"]:
+                self.error.emit("Yorum bulunamadı. Linki kontrol edin.")
+                return
+
+            # Siteden toplam yorum sayısı çekilemediyse, elimizdeki yorum sayısını toplam kabul et.
+            total_site_reviews = result["total_reviews"] or result["scraped"]
+
+            # Sonuçları Ana Ekrana Gönder
+            self.finished.emit(
+                {
+                    "score": result["final_score"],  # 0-100 arası yapay zeka puanı
+                    "reviews": result["details"],    # Yorumların tek tek analiz detayları
+                    "total_count": total_site_reviews, # Toplam yorum sayısı
+                    "site_stars": result["average_stars"], # Sitedeki yıldız puanı
+                    "partial": result["partial"],  # Durdurulduysa puan sadece işlenen yorumlardan
+                    "perf": result["perf"],        # Performans raporu (aşama süreleri, sayaçlar, modeller)
+                }
+            )
+
+        except Exception as e:
+            # Beklenmedik bir hata olursa konsola yazdır ve arayüze bildir.
+            traceback.print_exc()
+            self.error.emit(str(e))
+        finally:
+            self.token.close()
+
+    def _on_review(self, detail: dict, running: int):
+        self.review_scored.emit(detail)
+        self.running_score.emit(running)
+
+
+# --- MODEL ISITMA İŞÇİSİ ---
+# Modeller pencere açılır açılmaz arka planda yüklenir; arayüz bu sırada donmaz.
+class WarmupThread(QThread):
+    status = pyqtSignal(str)       # Yükleme adımı mesajı (örn: "Çeviri modeli yükleniyor...")
+    ready = pyqtSignal(bool, str)  # (başarılı mı, hata mesajı)
+
+    def run(self):
+        try:
+            warmup_models(progress=self.status.emit)
+            self.ready.emit(True, "")
+        except Exception as e:
+            traceback.print_exc()
+            self.ready.emit(False, str(e))
+
+
+# --- GÖSTERİLEN YORUMLARI ÇEVİRME İŞÇİSİ ---
+# Çok dilli modda yorumlar çevrilmeden puanlanır; sadece sonuç sayfasında öne
+# çıkarılan birkaç yorum arka planda Türkçeye çevrilir.
+# Tablo aynı yorum sözlüklerini arayüz thread'inde okuduğu için thread onlara yazmaz:
+# metinlerin kopyasını çevirir, (yorum, çeviri) çiftlerini sinyalle geri gönderir.
+class DisplayTranslateThread(QThread):
+    done = pyqtSignal(list)
+
+    def __init__(self, details: list):
+        super().__init__()
+        self.details = details
+        # Kopya arayüz thread'inde (burada) alınır; thread sadece kopyayı okur
+        self.snapshot = [dict(d) for d in details]
+
+    def run(self):
+        translations = []
+        try:
+            translations = display_translations(self.snapshot)
+        except Exception:
+            traceback.print_exc()
+        self.done.emit([(d, t) for d, t in zip(self.details, translations) if t is not None])
+
+
+# --- ANA PENCERE TASARIMI ---
+class ModernApp(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.worker = None
+        self.retired_workers = []  # Durdurulan ama henüz bitmemiş önceki analizler
+        self.models_ready = False  # Arka plandaki model yüklemesi bitti mi?
+        self.pending_url = None    # Yükleme sürerken başlatılan analiz burada sırada bekler
+        self.pending_rows = []     # Puanlanmış ama henüz tabloya eklenmemiş yorumlar
+        self.init_ui()
+        # Pencere önce çizilsin, model yüklemesi hemen ardından arka planda başlasın
+        QTimer.singleShot(0, self.start_warmup)
+
+    def init_ui(self):
+        """Pencere özelliklerini ve stil ayarlarını yükler."""
+        self.setWindowTitle("AI Ürün Analizi")
+        self.setGeometry(200, 200, 600, 700) # x, y, genişlik, yükseklik
+
+        # CSS Benzeri Stil Tanımlamaları (Koyu Tema)
+        self.setStyleSheet(
+            """
+            QWidget { background-color: #181825; color: #cdd6f4; font-family: 'Segoe UI'; }
+            QLineEdit {
+                background-color: #313244; border: 2px solid #89b4fa;
+                border-radius: 10px; padding: 10px; color: white; font-size: 14px;
+            }
+            QPushButton {
+                background-color: #89b4fa; color: #1e1e2e; border-radius: 10px;
+                padding: 12px; font-weight: bold; font-size: 15px;
+            }
+            QPushButton:hover { background-color: #b4befe; }
+            QProgressBar {
+                border: 2px solid #fab387; border-radius: 8px; text-align: center;
+            }
+            QProgressBar::chunk { background-color: #fab387; }
+            QTextEdit {
+                background-color: #1e1e2e; border: 1px solid #45475a;
+                border-radius: 8px; padding: 10px; font-size: 13px; color: #a6adc8;
+            }
+            QTableView {
+                background-color: #1e1e2e; border: 1px solid #45475a;
+                border-radius: 8px; font-size: 12px; gridline-color: #313244;
+                alternate-background-color: #232334;
+            }
+            QHeaderView::section {
+                background-color: #313244; color: #cdd6f4; padding: 4px; border: none;
+            }
+            QComboBox {
+                background-color: #313244; border: 1px solid #45475a;
+                border-radius: 6px; padding: 6px;
+            }
+        """
+        )
+
+        # QStackedWidget: Sayfalar arası geçiş yapmamızı sağlar (Home -> Loading -> Result)
+        self.stack = QStackedWidget()
+        self.layout = QVBoxLayout()
+
+        self.page_home = self.ui_home()       # 1. Sayfa: Giriş
+        self.page_loading = self.ui_loading() # 2. Sayfa: Yükleniyor
+        self.page_result = self.ui_result()   # 3. Sayfa: Sonuçlar
+
+        self.stack.addWidget(self.page_home)
+        self.stack.addWidget(self.page_loading)
+        self.stack.addWidget(self.page_result)
+
+        self.layout.addWidget(self.stack)
+        self.setLayout(self.layout)
+
+    # ---------- SAYFA 1: GİRİŞ EKRANI ----------
+    def ui_home(self):
+        page = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(20)
+
+        lbl_title = QLabel("Ürün / Yorum Analizi")
+        lbl_title.setAlignment(Qt.AlignCenter)
+        lbl_title.setFont(QFont("Segoe UI", 18, QFont.Bold))
+
+        # Kullanıcıyı yönlendiren açıklama metni
+        lbl_desc = QLabel(
+            "Amazon ürün sayfası linkini gir,\n"
+            "yorumları yapay zeka ile analiz edelim."
+        )
+        lbl_desc.setAlignment(Qt.AlignCenter)
+        lbl_desc.setWordWrap(True)
+
+        self.input_url = QLineEdit()
+        self.input_url.setPlaceholderText("Amazon ürün linkini buraya yapıştır...")
+
+        btn_start = QPushButton("Analize Başla")
+        btn_start.clicked.connect(self.start_analysis) # Butona basınca start_analysis çalışır
+
+        # Arka plandaki model yüklemesinin durumu
+        self.lbl_status = QLabel("Modeller arka planda yükleniyor...")
+        self.lbl_status.setAlignment(Qt.AlignCenter)
+        self.lbl_status.setStyleSheet("color: #6c7086;")
+
+        layout.addWidget(lbl_title)
+        layout.addWidget(lbl_desc)
+        layout.addWidget(self.input_url)
+        layout.addWidget(btn_start)
+        layout.addWidget(self.lbl_status)
+        layout.addStretch() # Elemanları yukarı itmek için boşluk
+
+        page.setLayout(layout)
+        return page
+
+    # ---------- SAYFA 2: YÜKLENİYOR EKRANI ----------
+    def ui_loading(self):
+        page = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(10)
+
+        lbl_main = QLabel("Analiz Yapılıyor...")
+        lbl_main.setAlignment(Qt.AlignCenter)
+        lbl_main.setFont(QFont("Segoe UI", 18, QFont.Bold))
+
+        # Kullanıcıya işlemin uzun sürebileceğini bildiren metin
+        lbl_sub = QLabel("Yorum sayısına bağlı olarak bu işlem biraz zaman alabilir.\nLütfen bekleyin.")
+        lbl_sub.setAlignment(Qt.AlignCenter)
+        lbl_sub.setFont(QFont("Segoe UI", 10))
+        lbl_sub.setStyleSheet("color: #a6adc8;")
+
+        # İlerleme çubuğu: ilk yorum gelene kadar Range 0-0 (sonsuz döngü animasyonu),
+        # sonra puanlanan / kuyruğa giren yorum sayısını gösterir.
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+
+        # Yorumlar puanlandıkça güncellenen anlık puan
+        self.lbl_live = QLabel("")
+        self.lbl_live.setAlignment(Qt.AlignCenter)
+        self.lbl_live.setFont(QFont("Segoe UI", 11))
+
+        # Analizi durdurur; o ana kadar puanlanan yorumlarla sonuç gösterilir
+        self.btn_cancel = QPushButton("Durdur")
+        self.btn_cancel.clicked.connect(self.cancel_analysis)
+
+        layout.addStretch()
+        layout.addWidget(lbl_main)
+        layout.addWidget(lbl_sub)
+        layout.addSpacing(20)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.lbl_live)
+        layout.addSpacing(20)
+        layout.addWidget(self.btn_cancel)
+        layout.addStretch()
+
+        page.setLayout(layout)
+        return page
+
+    # ---------- SAYFA 3: SONUÇ EKRANI ----------
+    def ui_result(self):
+        page = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(40, 40, 40, 40)
+        layout.setSpacing(20)
+
+        lbl_title = QLabel("Analiz Sonucu")
+        lbl_title.setAlignment(Qt.AlignCenter)
+        lbl_title.setFont(QFont("Segoe UI", 18, QFont.Bold))
+
+        # Büyük puan göstergesi (Örn: %85)
+        self.lbl_score = QLabel("%0")
+        self.lbl_score.setAlignment(Qt.AlignCenter)
+        self.lbl_score.setFont(QFont("Segoe UI", 32, QFont.Bold))
+
+        # Detay bilgileri (Yorum sayısı ve site puanı)
+        self.lbl_info = QLabel("Okunan Yorum: 0 | Site Puanı: 0.0")
+        self.lbl_info.setAlignment(Qt.AlignCenter)
+
+        # En iyi ve en kötü yorumların özeti (Salt okunur)
+        self.txt_reviews = QTextEdit()
+        self.txt_reviews.setReadOnly(True)
+        self.txt_reviews.setMaximumHeight(160)
+
+        # Tüm yorumların tablosu: yorumlar analiz sürerken modele eklenir,
+        # görünüm sadece ekrandaki satırları çizer (sabit satır yüksekliği)
+        self.review_model = ReviewTableModel(self)
+        self.review_proxy = ReviewFilterProxy(self)
+        self.review_proxy.setSourceModel(self.review_model)
+
+        self.table_reviews = QTableView()
+        self.table_reviews.setModel(self.review_proxy)
+        self.table_reviews.setSortingEnabled(True)
+        self.table_reviews.setWordWrap(False)
+        self.table_reviews.setAlternatingRowColors(True)
+        self.table_reviews.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table_reviews.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table_reviews.verticalHeader().setVisible(False)
+        self.table_reviews.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_reviews.verticalHeader().setDefaultSectionSize(24)
+        header = self.table_reviews.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Interactive)
+        header.setStretchLastSection(True)
+        header.resizeSection(SCORE_COLUMN, 60)
+        header.resizeSection(LANG_COLUMN, 50)
+        header.resizeSection(LANG_COLUMN + 1, 220)
+
+        # Filtreler: metin araması, dil ve puan aralığı
+        self.input_filter = QLineEdit()
+        self.input_filter.setPlaceholderText("Yorumlarda ara...")
+        # Her tuşta değil, yazma bitince filtrele
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(lambda: self.review_proxy.set_text(self.input_filter.text()))
+        self.input_filter.textChanged.connect(lambda _: self.filter_timer.start())
+
+        self.combo_lang = QComboBox()
+        self.combo_lang.currentIndexChanged.connect(
+            lambda _: self.review_proxy.set_language(self.combo_lang.currentData())
+        )
+        self.combo_score = QComboBox()
+        for label, low, high in SCORE_RANGES:
+            self.combo_score.addItem(label, (low, high))
+        self.combo_score.currentIndexChanged.connect(
+            lambda _: self.review_proxy.set_score_range(*self.combo_score.currentData())
+        )
+
+        filters = QHBoxLayout()
+        filters.addWidget(self.input_filter, 1)
+        filters.addWidget(self.combo_lang)
+        filters.addWidget(self.combo_score)
+
+        # Akış sırasında gelen yorumları toplu ekleyen zamanlayıcı
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(TABLE_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush_reviews)
+
+        btn_back = QPushButton("Yeni Link Analiz Et")
+        btn_back.clicked.connect(self.go_home) # Ana sayfaya dönüş
+
+        layout.addWidget(lbl_title)
+        layout.addWidget(self.lbl_score)
+        layout.addWidget(self.lbl_info)
+        layout.addWidget(self.txt_reviews)
+        layout.addLayout(filters)
+        layout.addWidget(self.table_reviews, 1)
+        layout.addWidget(btn_back)
+
+        page.setLayout(layout)
+        return page
+
+    # ---------- FONKSİYONLAR ----------
+    def go_home(self):
+        """Ana sayfaya döner ve girdiyi temizler."""
+        self.pending_url = None
+        self.stack.setCurrentIndex(0)
+
+    def start_analysis(self):
+        """Analiz işlemini başlatır."""
+        url = self.input_url.text().strip()
+        if not url:
+            QMessageBox.warning(self, "Uyarı", "Lütfen bir ürün linki girin.")
+            return
+
+        self.stack.setCurrentIndex(1) # Yükleniyor sayfasına geç
+        self.progress.setRange(0, 0)
+        self.lbl_live.setText("")
+        self.btn_cancel.setEnabled(True)
+        self.btn_cancel.setText("Durdur")
+
+        # Modeller hâlâ yükleniyorsa analiz sıraya alınır, yükleme bitince kendiliğinden başlar
+        if not self.models_ready:
+            self.pending_url = url
+            self.lbl_live.setText("Modeller yükleniyor, analiz sırada bekliyor...")
+            return
+
+        self.launch_worker(url)
+
+    def start_warmup(self):
+        """Modelleri arka plan thread'inde yüklemeye başlar."""
+        self.warmup = WarmupThread()
+        self.warmup.status.connect(self.on_warmup_status)
+        self.warmup.ready.connect(self.on_warmup_ready)
+        self.warmup.start()
+
+    def on_warmup_status(self, msg: str):
+        self.lbl_status.setText(msg)
+        if self.pending_url:
+            self.lbl_live.setText(msg)
+
+    def on_warmup_ready(self, ok: bool, msg: str):
+        """Model yüklemesi bitti: sırada bekleyen analiz varsa başlat."""
+        self.models_ready = True
+        if not ok:
+            # Modeller yüklenemese de analiz çalışır (puanlar nötr kalabilir), kullanıcıyı uyar
+            self.lbl_status.setText("Modeller yüklenemedi.")
+            QMessageBox.warning(self, "Uyarı", f"Modeller yüklenirken hata oluştu:\n{msg}")
+
+        if self.pending_url:
+            url, self.pending_url = self.pending_url, None
+            self.lbl_live.setText("")
+            self.launch_worker(url)
+
+    def launch_worker(self, url: str):
+        """Analiz thread'ini oluşturur ve başlatır."""
+        self.retire_worker()
+        self.reset_reviews()
+        self.worker = WorkerThread(url)
+        self.worker.finished.connect(self.display_result) # Başarılı olursa display_result çalışsın
+        self.worker.error.connect(self.display_error)     # Hata olursa display_error çalışsın
+        self.worker.progress.connect(self.update_progress)
+        self.worker.running_score.connect(self.update_running_score)
+        self.worker.review_scored.connect(self.pending_rows.append)
+        self.worker.cancelled.connect(self.on_cancelled)
+        self.flush_timer.start()
+        self.worker.start()
+
+    def retire_worker(self):
+        """
+        Hâlâ çalışan önceki analizi durdurur ve sinyallerini ayırır; böylece
+        eski sonuçlar yeni analizin ekranına karışmaz. Thread bitene kadar
+        referansı tutulur (çalışan bir QThread silinmemeli).
+        """
+        self.retired_workers = [w for w in self.retired_workers if w.isRunning()]
+        worker, self.worker = self.worker, None
+        if worker is None or not worker.isRunning():
+            return
+        worker.cancel()
+        for signal in (
+            worker.finished, worker.error, worker.progress,
+            worker.running_score, worker.review_scored, worker.cancelled,
+        ):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
+        self.retired_workers.append(worker)
+
+    def cancel_analysis(self):
+        """Durdur butonu: süren analizi ya da sırada bekleyen analizi iptal eder."""
+        if self.pending_url:
+            self.pending_url = None
+            self.go_home()
+            return
+        if self.worker is not None and self.worker.isRunning():
+            self.btn_cancel.setEnabled(False)
+            self.btn_cancel.setText("Durduruluyor...")
+            self.worker.cancel()
+
+    def on_cancelled(self, reason: str):
+        """Analiz hiç yorum puanlanmadan durduruldu."""
+        self.flush_timer.stop()
+        self.stack.setCurrentIndex(0)
+        if reason == "deadline":
+            QMessageBox.warning(self, "Uyarı", "Süre sınırı doldu, hiç yorum analiz edilemedi.")
+
+    def closeEvent(self, event):
+        """Pencere kapanırken süren analizi durdurur; çeviri işçisi ve tarayıcı sayfaları kapanır."""
+        self.retire_worker()
+        for worker in self.retired_workers:
+            worker.wait(5000)
+        super().closeEvent(event)
+
+    def reset_reviews(self):
+        """Önceki analizin tablosunu ve filtrelerini temizler."""
+        self.flush_timer.stop()
+        self.pending_rows.clear()
+        self.review_model.clear()
+        # Akış sırasında sıralama kapalı: her eklemede yeniden sıralanmasın
+        self.review_proxy.sort(-1)
+        self.input_filter.clear()
+        self.combo_score.setCurrentIndex(0)
+        self.combo_lang.clear()
+        self.combo_lang.addItem("Tüm diller", None)
+
+    def flush_reviews(self):
+        """Biriken yorumları tabloya tek seferde ekler."""
+        if self.pending_rows:
+            rows = self.pending_rows[:]
+            self.pending_rows.clear()
+            self.review_model.append_rows(rows)
+
+    def update_progress(self, done: int, total: int):
+        """Puanlanan yorum sayısına göre ilerleme çubuğunu günceller."""
+        if total <= 0:
+            return
+        self.progress.setRange(0, total)
+        self.progress.setValue(done)
+        self.progress.setFormat(f"{done} / {total} yorum")
+
+    def update_running_score(self, score: int):
+        """Yorumlar geldikçe hesaplanan anlık puanı gösterir."""
+        self.lbl_live.setText(f"Anlık puan: %{score}")
+
+    def display_result(self, data: dict):
+        """Thread'den gelen sonuçları ekrana basar."""
+        score = data.get("score", 0)
+        reviews = data.get("reviews", [])
+
+        # Puana göre renk belirleme (Yeşil, Sarı, Kırmızı)
+        color = score_color(score)
+
+        self.lbl_score.setText(f"%{score}")
+        self.lbl_score.setStyleSheet(
+            f"color: {color}; font-size: 72px; font-weight: bold;"
+        )
+
+        info = f"Okunan Yorum: {data.get('total_count', 0)} | Site Puanı: {data.get('site_stars', 0.0)}"
+        if data.get("partial"):
+            # Analiz durduruldu: puan sadece işlenen yorumlardan hesaplandı
+            info += f"\nKısmi sonuç: {len(reviews)} yorum analiz edildi"
+        self.lbl_info.setText(info)
+        self.lbl_info.setToolTip(perf_summary(data.get("perf")))
+
+        # Akıştan gelen yorumların kalanı tabloya eklenir; akış dışında
+        # üretilen bir sonuçsa (sayılar tutmuyorsa) tablo baştan doldurulur
+        self.flush_timer.stop()
+        self.flush_reviews()
+        if self.review_model.rowCount() != len(reviews):
+            self.review_model.set_rows(reviews)
+
+        for lang in sorted(self.review_model.languages):
+            self.combo_lang.addItem(lang, lang)
+        self.table_reviews.sortByColumn(SCORE_COLUMN, Qt.DescendingOrder)
+
+        self.show_highlights()
+        self.stack.setCurrentIndex(2) # Sonuç sayfasına geç
+
+        # Çok dilli modda öne çıkan yorumlar çevrilmemiştir; arka planda çevrilip yenilenir
+        if SENTIMENT_MODE == "multilingual":
+            translator = DisplayTranslateThread(self.review_model.best() + self.review_model.worst())
+            translator.done.connect(self.on_display_translated)
+            # Bitene kadar referansı tutulur (çalışan bir QThread silinmemeli)
+            self.retired_workers.append(translator)
+            translator.start()
+
+    def show_highlights(self):
+        """En iyi ve en kötü yorumlar (model eklerken takip ettiği için sıralama gerekmez)."""
+        lines = ["--- 👍 NEDEN SEVİLDİ? ---"]
+        lines += [f"[{r['score']}] {r['translated']}\n" for r in self.review_model.best()]
+        lines += ["", "--- 👎 NEDEN ELEŞTİRİLDİ? ---"]
+        lines += [f"[{r['score']}] {r['translated']}\n" for r in self.review_model.worst()]
+        self.txt_reviews.setText("\n".join(lines))
+
+    def on_display_translated(self, translations: list):
+        # Sinyal arayüz thread'inde işlenir; yorumlar tablo onları okumuyorken güncellenir
+        for detail, text in translations:
+            detail["translated"] = text
+        self.show_highlights()
+        self.review_model.refresh()
+
+    def display_error(self, msg: str):
+        """Hata mesajını kullanıcıya gösterir."""
+        self.flush_timer.stop()
+        self.stack.setCurrentIndex(0) # Ana sayfaya dön
+        QMessageBox.critical(self, "Hata", msg)
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    # Uygulama kapanırken havuzdaki tarayıcıyı düzgünce kapat
+    app.aboutToQuit.connect(shutdown_browser_pool)
+    window = ModernApp()
+    window.show()
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,248 @@
+# backends.py
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import json
+import difflib
+
+# Çıkarım (inference) arka ucu:
+#   torch : Orijinal fp32 PyTorch modeli
+#   int8  : PyTorch dinamik int8 kuantizasyonu (Linear katmanları int8)
+#   onnx  : ONNX'e aktarılmış grafik, ONNX Runtime ile CPU'da çalışır (optimum gerekir)
+BACKENDS = ("torch", "int8", "onnx")
+INFERENCE_BACKEND = os.environ.get("YORUM_BACKEND", "torch")
+
+# Dönüştürülmüş modellerin (int8 / ONNX) saklandığı klasör
+ARTIFACT_DIR = os.environ.get(
+    "YORUM_ARTIFACT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai-yorum-analiz", "models"),
+)
+
+
+def hf_cache_dir() -> str:
+    """Hugging Face model önbelleğinin (hub) klasörü."""
+    try:
+        from huggingface_hub.constants import HF_HUB_CACHE
+
+        return HF_HUB_CACHE
+    except ImportError:
+        home = os.environ.get("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface"))
+        return os.environ.get("HF_HUB_CACHE", os.path.join(home, "hub"))
+
+
+def resolve_revision(model_name: str, revision: str) -> str | None:
+    """
+    "main" gibi değişebilen bir dal/etiket adını, yerel Hugging Face önbelleğinde
+    o ada karşılık gelen commit SHA'sına çevirir (ağa çıkmaz). revision zaten bir
+    commit SHA'sıysa aynen döner; model hiç indirilmediyse None.
+    """
+    if re.fullmatch(r"[0-9a-f]{40}", revision or ""):
+        return revision
+    ref = os.path.join(hf_cache_dir(), "models--" + model_name.replace("/", "--"), "refs", revision)
+    try:
+        with open(ref, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _check_backend(backend: str):
+    if backend not in BACKENDS:
+        raise ValueError(f"Bilinmeyen çıkarım arka ucu: {backend} (seçenekler: {', '.join(BACKENDS)})")
+
+
+def artifact_path(model_name: str, revision: str, backend: str) -> str:
+    """Bir modelin dönüştürülmüş halinin diskteki yeri."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "--", f"{model_name}@{revision}")
+    return os.path.join(ARTIFACT_DIR, backend, safe)
+
+
+def _load_int8(model_cls, model_name: str, revision: str):
+    """
+    Modeli dinamik int8 kuantize eder. Kuantize edilmiş model diske kaydedilir;
+    sonraki açılışlarda fp32 model hiç yüklenmeden doğrudan oradan okunur.
+    """
+    import torch
+
+    path = os.path.join(artifact_path(model_name, revision, "int8"), "model.pt")
+    if os.path.exists(path):
+        try:
+            model = torch.load(path, weights_only=False)
+            model.eval()
+            return model
+        except Exception as e:
+            print(f">> backends: int8 önbelleği okunamadı, yeniden oluşturuluyor: {e}")
+
+    model = model_cls.from_pretrained(model_name, revision=revision)
+    model.eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save(model, path)
+    return model
+
+
+def _load_onnx(ort_cls, model_name: str, revision: str):
+    """
+    Modeli ONNX'e aktarıp ONNX Runtime ile yükler. Aktarılan grafik diske
+    kaydedilir; sonraki açılışlarda doğrudan oradan okunur.
+    """
+    path = artifact_path(model_name, revision, "onnx")
+    if os.path.isdir(path) and any(f.endswith(".onnx") for f in os.listdir(path)):
+        return ort_cls.from_pretrained(path)
+
+    model = ort_cls.from_pretrained(model_name, revision=revision, export=True)
+    model.save_pretrained(path)
+    return model
+
+
+def _tensor_bytes(values, seen: set) -> int:
+    # state_dict değerleri tensör ya da (int8 paketli ağırlıklarda) tensör demetleri olabilir
+    total = 0
+    for value in values:
+        if isinstance(value, (tuple, list)):
+            total += _tensor_bytes(value, seen)
+        elif hasattr(value, "numel") and hasattr(value, "element_size"):
+            try:
+                key = value.data_ptr()
+            except Exception:
+                key = id(value)
+            if key in seen:
+                continue  # Paylaşılan (tied) ağırlıklar bir kez sayılır
+            seen.add(key)
+            total += value.numel() * value.element_size()
+    return total
+
+
+def model_size_mb(model) -> float:
+    """
+    Yüklü modelin ağırlıklarının boyutu (MB): PyTorch modellerinde (int8 dahil) state_dict
+    tensörleri, ONNX Runtime modellerinde yüklenen .onnx dosyaları. Ölçülemezse 0.
+    Model kaydı (bkz. model_registry) bellek bütçesini bu boyutla hesaplar.
+    """
+    if model is None:
+        return 0.0
+    total = 0
+    state_dict = getattr(model, "state_dict", None)
+    if callable(state_dict):
+        try:
+            total = _tensor_bytes(state_dict().values(), set())
+        except Exception as e:
+            print(f">> backends: model boyutu ölçülemedi: {e}")
+    else:
+        directory = getattr(model, "model_save_dir", None)
+        if directory and os.path.isdir(directory):
+            total = sum(
+                os.path.getsize(os.path.join(directory, name))
+                for name in os.listdir(directory) if ".onnx" in name
+            )
+    return total / (1024 * 1024)
+
+
+def load_sequence_classifier(model_name: str, revision: str, backend: str = INFERENCE_BACKEND):
+    """Sentiment (sınıflandırma) modelini seçilen arka uçla yükler: (tokenizer, model)."""
+    _check_backend(backend)
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision)
+    # Model, tokenizer ile aynı commit'ten yüklenir; int8/ONNX dosyaları da bu commit'e göre saklanır
+    revision = resolve_revision(model_name, revision) or revision
+    if backend == "int8":
+        model = _load_int8(AutoModelForSequenceClassification, model_name, revision)
+    elif backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        model = _load_onnx(ORTModelForSequenceClassification, model_name, revision)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, revision=revision)
+        model.eval() # Modeli değerlendirme moduna al (Eğitim modu değil)
+    return tokenizer, model
+
+
+def load_seq2seq(model_name: str, revision: str, backend: str = INFERENCE_BACKEND):
+    """M2M100 çeviri modelini seçilen arka uçla yükler: (tokenizer, model)."""
+    _check_backend(backend)
+    from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
+
+    tokenizer = M2M100Tokenizer.from_pretrained(model_name, revision=revision)
+    revision = resolve_revision(model_name, revision) or revision
+    if backend == "int8":
+        model = _load_int8(M2M100ForConditionalGeneration, model_name, revision)
+    elif backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        model = _load_onnx(ORTModelForSeq2SeqLM, model_name, revision)
+    else:
+        model = M2M100ForConditionalGeneration.from_pretrained(model_name, revision=revision)
+        model.eval()
+    return tokenizer, model
+
+
+# ---------------- SAPMA (DRIFT) KONTROLÜ ---------------- #
+
+def check_drift(texts, backend: str, translation_texts=None, src_lang: str = "en") -> dict:
+    """
+    Seçilen arka ucun sonuçlarını fp32 PyTorch sonuçlarıyla karşılaştırır.
+    - Sentiment: puan farklarının ortalaması/en büyüğü ve 5 puandan fazla sapan oran.
+    - Çeviri (translation_texts verilirse): birebir aynı çıkan oran ve ortalama metin benzerliği.
+    Modeller bu süreçte yüklenir; sadece tanı amaçlıdır.
+    """
+    from analyzer import SENT_MODEL_NAME, SENT_MODEL_REVISION, score_with_model
+    from translator_hf import MODEL_NAME, MODEL_REVISION, translate_batch
+
+    texts = list(texts)
+    report = {"backend": backend, "sentiment": {}, "translation": {}}
+
+    base = score_with_model(*load_sequence_classifier(SENT_MODEL_NAME, SENT_MODEL_REVISION, "torch"), texts)
+    cand = score_with_model(*load_sequence_classifier(SENT_MODEL_NAME, SENT_MODEL_REVISION, backend), texts)
+    diffs = [abs(a - b) for a, b in zip(base, cand)]
+    if diffs:
+        report["sentiment"] = {
+            "count": len(diffs),
+            "mean_abs_diff": round(sum(diffs) / len(diffs), 3),
+            "max_abs_diff": max(diffs),
+            "over_5_points": round(sum(1 for d in diffs if d > 5) / len(diffs), 3),
+        }
+
+    translation_texts = list(translation_texts or [])
+    if translation_texts:
+        langs = [src_lang] * len(translation_texts)
+        base_tr = translate_batch(*load_seq2seq(MODEL_NAME, MODEL_REVISION, "torch"), translation_texts, langs)
+        cand_tr = translate_batch(*load_seq2seq(MODEL_NAME, MODEL_REVISION, backend), translation_texts, langs)
+        ratios = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(base_tr, cand_tr)]
+        report["translation"] = {
+            "count": len(ratios),
+            "exact_match": round(sum(1 for a, b in zip(base_tr, cand_tr) if a == b) / len(ratios), 3),
+            "mean_similarity": round(sum(ratios) / len(ratios), 3),
+            "min_similarity": round(min(ratios), 3),
+        }
+
+    return report
+
+
+def main():
+    # Kullanım: python backends.py <int8|onnx> <turkce_yorumlar.txt> [yabanci_yorumlar.txt] [kaynak_dil]
+    # Dosyalarda her satır bir yorumdur. Sonuç JSON olarak yazdırılır.
+    if len(sys.argv) < 3 or sys.argv[1] not in BACKENDS:
+        print(
+            "Kullanım: python backends.py <int8|onnx> <turkce_yorumlar.txt> [yabanci_yorumlar.txt] [kaynak_dil]",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    def read_lines(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+
+    texts = read_lines(sys.argv[2])
+    translation_texts = read_lines(sys.argv[3]) if len(sys.argv) > 3 else []
+    src_lang = sys.argv[4] if len(sys.argv) > 4 else "en"
+
+    report = check_drift(texts, sys.argv[1], translation_texts, src_lang)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+# bench.py
+# -*- coding: utf-8 -*-
+
+# Çevrimdışı performans ölçümü: her aşamanın (sayı ayrıştırma, kazıma, dil algılama,
+# çeviri, puanlama ve tüm analyze_comments) hızını ölçer ve sonucu JSON olarak yazar.
+# İnternet gerekmez: Amazon benzeri sayfalar yerelde üretilip yerel bir HTTP sunucusundan
+# (veya dosyadan) okunur, yorumlar sentetik olarak üretilir, modeller yerine istenirse
+# rastgele ağırlıklı küçük BERT ve birebir (kimlik) çeviri yapan sahte bir işçi kullanılır.
+# Kullanım örnekleri:
+#   python bench.py -o sonuc.json
+#   python bench.py --reviews 2000 --models real --baseline eski.json
+#   python bench.py --stages parse,scrape_http,langid
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+# Varsayılan olarak çalıştırılan aşamalar (scrape_browser Chromium gerektirdiği için isteğe bağlı)
+DEFAULT_STAGES = ("parse", "scrape_files", "scrape_http", "langid", "translate", "sentiment", "analyze")
+ALL_STAGES = DEFAULT_STAGES + ("scrape_browser",)
+
+# Sentetik ürünün kimliği ve sayfa başına yorum sayısı (Amazon'da 10)
+BENCH_ASIN = "B0BENCH001"
+REVIEWS_PER_PAGE = 10
+
+# Temel ölçüme göre bu orandan fazla yavaşlama gerileme (regression) sayılır
+DEFAULT_TOLERANCE = 0.10
+
+# Sentetik yorumlar için dillere göre cümle parçaları
+CORPUS_SENTENCES = {
+    "tr": [
+        "Ürün çok güzel, kargo da hızlı geldi.",
+        "Fiyatına göre gayet kaliteli bir ürün.",
+        "Paketleme kötüydü ama ürün sağlam çıktı.",
+        "Bir haftada bozuldu, hiç tavsiye etmiyorum.",
+        "Beklediğimden daha iyi, herkese tavsiye ederim.",
+        "Rengi fotoğraftakinden biraz farklı geldi.",
+        "Şarjı uzun gidiyor, kullanımı da çok kolay.",
+    ],
+    "en": [
+        "This product is great and the quality is very good.",
+        "It stopped working after two weeks, very disappointed.",
+        "Works as described and the battery lasts for days.",
+        "The packaging was damaged but the item was fine.",
+        "I would recommend it to anyone looking for a cheap option.",
+        "Not worth the price, the material feels cheap.",
+    ],
+    "de": [
+        "Das Produkt ist sehr gut verarbeitet und kam schnell an.",
+        "Leider nach einer Woche kaputt gegangen.",
+        "Preis und Leistung stimmen, ich bin zufrieden.",
+        "Die Farbe entspricht nicht ganz dem Bild.",
+    ],
+    "fr": [
+        "Le produit est de très bonne qualité, je recommande.",
+        "Livraison rapide mais l'emballage était abîmé.",
+        "Il a cessé de fonctionner au bout d'un mois.",
+        "Rapport qualité prix correct pour un usage quotidien.",
+    ],
+    "es": [
+        "El producto llegó rápido y funciona perfectamente.",
+        "La calidad es peor de lo que esperaba.",
+        "Muy buena compra, lo volvería a comprar.",
+    ],
+    "ru": [
+        "Отличный товар, доставка была быстрой.",
+        "Качество ужасное, сломался через неделю.",
+        "Цена соответствует качеству, рекомендую.",
+    ],
+}
+# Dillerin sentetik derlemdeki payları (Türkçe çoğunlukta, gerçek ürünlere benzer şekilde)
+CORPUS_WEIGHTS = {"tr": 0.55, "en": 0.20, "de": 0.08, "fr": 0.07, "es": 0.05, "ru": 0.05}
+
+# Sayı ayrıştırma aşamasında kullanılan örnek metinler
+PARSE_SAMPLES = [
+    "1.234 değerlendirme", "2,5k ratings", "12,345 global ratings", "987 yorum",
+    "4,7 üzerinden 5 yıldız", "3.9 out of 5 stars", "", "10K+ reviews",
+]
+
+
+# ---------------- SENTETİK VERİ ---------------- #
+
+def make_corpus(size: int, seed: int = 0, langs=None) -> list:
+    """
+    'size' adet sentetik yorum üretir (aynı tohumla her seferinde aynı derlem).
+    Yorumlar 1-6 cümle uzunluğundadır; ara sıra analiz dışı kalacak kısa yorumlar da eklenir.
+    """
+    rng = random.Random(seed)
+    weights = {lang: w for lang, w in CORPUS_WEIGHTS.items() if not langs or lang in langs}
+    choices, probs = list(weights), list(weights.values())
+
+    corpus = []
+    for _ in range(size):
+        if rng.random() < 0.05:
+            corpus.append(rng.choice(["Süper!", "Çok iyi", "Meh", "ok"]))
+            continue
+        lang = rng.choices(choices, probs)[0]
+        sentences = CORPUS_SENTENCES[lang]
+        corpus.append(" ".join(rng.choice(sentences) for _ in range(rng.randint(1, 6))))
+    return corpus
+
+
+def _review_html(review_id: str, text: str, stars: int) -> str:
+    return (
+        f'<div data-hook="review" id="{review_id}">'
+        f'<i data-hook="review-star-rating"><span class="a-icon-alt">{stars},0 üzerinden 5 yıldız</span></i>'
+        f'<span data-hook="review-body"><span>{text}</span></span>'
+        f"</div>"
+    )
+
+
+def make_product_pages(corpus, seed: int = 0) -> list:
+    """
+    Derlemden Amazon düzenine benzeyen sayfalar üretir: ilk sayfa ürün sayfası
+    (yıldız ortalaması, yorum sayısı ve ilk yorumlar), kalanlar yorum listesi sayfaları.
+    """
+    rng = random.Random(seed)
+    reviews = [
+        _review_html(f"R{seed:02d}{i:08d}", text, rng.randint(1, 5))
+        for i, text in enumerate(corpus)
+    ]
+    chunks = [reviews[k:k + REVIEWS_PER_PAGE] for k in range(0, len(reviews), REVIEWS_PER_PAGE)] or [[]]
+
+    pages = []
+    for number, chunk in enumerate(chunks):
+        header = ""
+        if number == 0:
+            count = f"{len(corpus):,}".replace(",", ".")
+            header = (
+                '<span class="a-icon-alt">4,3 üzerinden 5 yıldız</span>'
+                f'<span id="acrCustomerReviewText">{count} değerlendirme</span>'
+            )
+        pages.append(f"<html><body><div id='dp'>{header}{''.join(chunk)}</div></body></html>")
+    return pages
+
+
+def write_snapshot_dir(pages, directory: str) -> str:
+    """Sayfaları html_scraper'ın okuyabileceği sırayla (page_000.html, ...) klasöre yazar."""
+    os.makedirs(directory, exist_ok=True)
+    for number, page in enumerate(pages):
+        with open(os.path.join(directory, f"page_{number:03d}.html"), "w", encoding="utf-8") as f:
+            f.write(page)
+    return directory
+
+
+class FixtureServer:
+    """
+    Üretilen sayfaları yerelde sunan küçük HTTP sunucusu. Ürün sayfası ve
+    '/product-reviews/<ASIN>/?pageNumber=N' adresleri Amazon'daki gibi yanıtlanır.
+    failing: her istekte 500 dönen yorum sayfası numaraları (hata senaryoları için).
+    """
+
+    def __init__(self, pages, failing=()):
+        self.pages = pages
+        self.failing = set(failing)
+        self.requests = {}
+        empty = "<html><body></body></html>"
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                parts = urlsplit(handler.path)
+                status = 200
+                if parts.path.startswith("/product-reviews/"):
+                    number = int(parse_qs(parts.query).get("pageNumber", ["1"])[0])
+                    server.requests[number] = server.requests.get(number, 0) + 1
+                    body = pages[number] if number < len(pages) else empty
+                    if number in server.failing:
+                        status, body = 500, "sunucu hatası"
+                else:
+                    body = pages[0]
+                data = body.encode("utf-8")
+                handler.send_response(status)
+                handler.send_header("Content-Type", "text/html; charset=utf-8")
+                handler.send_header("Content-Length", str(len(data)))
+                handler.end_headers()
+                handler.wfile.write(data)
+
+            def log_message(handler, *args):
+                pass  # Her istek için konsola yazma
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="bench-http", daemon=True)
+
+    @property
+    def product_url(self) -> str:
+        # Adreste "amazon" geçmeli, yoksa kazıyıcı siteyi desteklemez
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/amazon/dp/{BENCH_ASIN}/"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ---------------- SAHTE (STAND-IN) MODELLER ---------------- #
+
+def serve_identity_translator():
+    """
+    translator_hf.py --serve ile aynı protokolü konuşan sahte çeviri işçisi:
+    metinleri olduğu gibi geri döndürür. Model yüklemeden süreçler arası iletişimin
+    ve toplu istek yolunun maliyetini ölçmeye yarar.
+    """
+    from translator_hf import read_frame, write_frame
+
+    requests_in = sys.stdin.buffer
+    responses_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    write_frame(responses_out, {"ok": True, "ready": True})
+    while True:
+        request = read_frame(requests_in)
+        if request is None:
+            break
+        op = request.get("op")
+        if op == "shutdown":
+            write_frame(responses_out, {"id": request.get("id"), "ok": True})
+            break
+        if op == "translate":
+            response = {"ok": True, "translation": request.get("text", "")}
+        elif op == "translate_batch":
+            response = {"ok": True, "translations": list(request.get("texts", []))}
+        else:
+            response = {"ok": True}
+        response["id"] = request.get("id")
+        write_frame(responses_out, response)
+
+
+def make_tiny_sentiment_model(corpus, directory: str, seed: int = 0):
+    """
+    İndirme gerektirmeyen, rastgele ağırlıklı küçük bir BERT sınıflandırıcı ve
+    derlemdeki kelimelerden oluşturulan bir tokenizer döndürür (tokenizer, model).
+    Puanlar anlamsızdır; sadece tokenize/padding/ileri geçiş maliyeti ölçülür.
+    """
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    words = sorted({w for text in corpus for w in text.split()})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words
+    os.makedirs(directory, exist_ok=True)
+    vocab_file = os.path.join(directory, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab) + "\n")
+
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128,
+        max_position_embeddings=512,
+        num_labels=2,
+    )
+    tokenizer = BertTokenizerFast(vocab_file=vocab_file, do_lower_case=False)
+    model = BertForSequenceClassification(config)
+    model.eval()
+    return tokenizer, model
+
+
+def install_models(analyzer, mode: str, corpus, workdir: str, seed: int = 0):
+    """
+    analyzer modülüne ölçümde kullanılacak modelleri yerleştirir.
+    mode == "stub": küçük rastgele BERT + kimlik çeviri işçisi (indirme yok).
+    mode == "real": gerçek modeller (ilk seferde indirilir).
+    """
+    if mode == "stub":
+        analyzer.sent_tokenizer, analyzer.sent_model = make_tiny_sentiment_model(
+            corpus, os.path.join(workdir, "tiny-bert"), seed
+        )
+        analyzer.shutdown_translator_worker()
+        analyzer._translator_worker = analyzer.TranslatorWorker(script_path=os.path.abspath(__file__))
+    # Model yükleme süresi ölçümlere karışmasın diye her şey önceden ısıtılır
+    analyzer.warmup_models()
+
+
+# ---------------- ÖLÇÜM ---------------- #
+
+def percentile(values, q: float) -> float:
+    """Sıralı değerlerde en yakın sıra (nearest-rank) yöntemiyle yüzdelik."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies_s, items: int, runs: int) -> dict:
+    """
+    Gecikmelerden (saniye) p50/p95 ve saniyedeki öğe sayısını hesaplar.
+    items: Tüm koşularda işlenen toplam öğe sayısı.
+    """
+    total = sum(latencies_s)
+    return {
+        "runs": runs,
+        "samples": len(latencies_s),
+        "items": items,
+        "p50_ms": round(percentile(latencies_s, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies_s, 95) * 1000, 3),
+        "mean_ms": round(total / len(latencies_s) * 1000, 3) if latencies_s else 0.0,
+        "throughput_per_s": round(items / total, 2) if total > 0 else 0.0,
+    }
+
+
+def time_calls(fn, inputs, repeat: int) -> dict:
+    """Her girdi için fn'i ayrı ayrı çağırır; gecikmeler çağrı başınadır."""
+    latencies = []
+    for _ in range(repeat):
+        for value in inputs:
+            started = time.perf_counter()
+            fn(value)
+            latencies.append(time.perf_counter() - started)
+    return summarize(latencies, len(inputs) * repeat, repeat)
+
+
+def time_runs(fn, items: int, repeat: int, warmup: int = 1) -> dict:
+    """fn'i (tüm iş yükü) 'repeat' kez çağırır; gecikmeler koşu başınadır."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, items * repeat, repeat)
+
+
+class Bench:
+    """Aşama ölçümlerini tek bir yerde toplar; sahte veriler ve modeller bir kez hazırlanır."""
+
+    def __init__(self, args, workdir: str):
+        self.args = args
+        self.workdir = workdir
+        self.corpus = make_corpus(args.reviews, args.seed)
+        self.pages = make_product_pages(self.corpus, args.seed)
+        self._analyzer = None
+
+    @property
+    def analyzer(self):
+        if self._analyzer is None:
+            import cache
+            import analyzer
+
+            # Ölçümler her koşuda gerçekten hesaplasın diye önbellek kapatılır
+            if not self.args.cache:
+                cache.CACHE_ENABLED = False
+            install_models(analyzer, self.args.models, self.corpus, self.workdir, self.args.seed)
+            self._analyzer = analyzer
+        return self._analyzer
+
+    @property
+    def kept(self) -> list:
+        return [c for c in self.corpus if len(c.split()) >= 3]
+
+    # Her aşama bir sözlük döndürür (bkz. summarize)
+
+    def stage_parse(self) -> dict:
+        from scraper import parse_number, parse_stars
+
+        def parse(text):
+            parse_number(text)
+            parse_stars(text)
+
+        return time_calls(parse, PARSE_SAMPLES * 50, self.args.repeat)
+
+    def _scrape(self, source: str, backend: str, lean: bool = True) -> dict:
+        from scraper import get_reviews
+
+        def run():
+            data = get_reviews(source, max_pages=len(self.pages), backend=backend, lean=lean)
+            if len(data["comments"]) == 0:
+                raise RuntimeError("Sahte sayfalardan hiç yorum çıkarılamadı")
+
+        return time_runs(run, len(self.corpus), self.args.repeat)
+
+    def stage_scrape_files(self) -> dict:
+        directory = write_snapshot_dir(self.pages, os.path.join(self.workdir, "snapshot"))
+        return self._scrape(directory, "http")
+
+    def stage_scrape_http(self) -> dict:
+        with FixtureServer(self.pages) as server:
+            return self._scrape(server.product_url, "http")
+
+    def stage_scrape_browser(self) -> dict:
+        # Yalın mod birinci taraf olmayan alan adlarını engellediği için yerel sunucuda kapalı
+        with FixtureServer(self.pages) as server:
+            return self._scrape(server.product_url, "browser", lean=False)
+
+    def stage_langid(self) -> dict:
+        import lang_detect
+
+        texts = self.kept
+        result = time_calls(lang_detect.detect, texts[:200], self.args.repeat)
+        result["batch"] = time_runs(lambda: lang_detect.detect_batch(texts), len(texts), self.args.repeat)
+        return result
+
+    def stage_translate(self) -> dict:
+        analyzer = self.analyzer
+        return time_runs(lambda: analyzer.translate_many(self.kept), len(self.kept), self.args.repeat)
+
+    def stage_sentiment(self) -> dict:
+        analyzer = self.analyzer
+        return time_runs(lambda: analyzer.get_sentiment_scores(self.kept), len(self.kept), self.args.repeat)
+
+    def stage_analyze(self) -> dict:
+        analyzer = self.analyzer
+        return time_runs(
+            lambda: analyzer.analyze_comments(self.corpus, len(self.corpus), 4.3),
+            len(self.corpus),
+            self.args.repeat,
+        )
+
+    def run(self, stages) -> dict:
+        results = {}
+        for name in stages:
+            print(f">> bench: {name} ölçülüyor...", file=sys.stderr)
+            try:
+                results[name] = getattr(self, f"stage_{name}")()
+            except Exception as e:
+                # Bir aşamanın bağımlılığı eksikse (örn. lxml, torch) diğerleri yine ölçülür
+                traceback.print_exc()
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+        return results
+
+
+# ---------------- TEMEL ÖLÇÜMLE KARŞILAŞTIRMA ---------------- #
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> dict:
+    """
+    Her aşamanın p50 gecikmesini ve iş hacmini temel ölçümle karşılaştırır.
+    p50 'tolerance' oranından fazla artan ya da iş hacmi o oranda düşen aşamalar gerileme sayılır.
+    """
+    report = {}
+    for name, current in results.get("stages", {}).items():
+        base = baseline.get("stages", {}).get(name)
+        if not base or "error" in current or "error" in base:
+            continue
+        p50_change = (current["p50_ms"] - base["p50_ms"]) / base["p50_ms"] if base["p50_ms"] else 0.0
+        tput_change = (
+            (current["throughput_per_s"] - base["throughput_per_s"]) / base["throughput_per_s"]
+            if base["throughput_per_s"] else 0.0
+        )
+        report[name] = {
+            "p50_ms": [base["p50_ms"], current["p50_ms"]],
+            "throughput_per_s": [base["throughput_per_s"], current["throughput_per_s"]],
+            "p50_change": round(p50_change, 3),
+            "throughput_change": round(tput_change, 3),
+            "regression": p50_change > tolerance or tput_change < -tolerance,
+        }
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Analiz hattının aşamalarını çevrimdışı ölçer (JSON çıktı).")
+    parser.add_argument("-o", "--output", help="Sonuçların yazılacağı JSON dosyası (verilmezse stdout)")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE,
+        help="Gerileme sayılacak yavaşlama oranı (varsayılan: 0.10 = %%10)",
+    )
+    parser.add_argument(
+        "--stages", default=",".join(DEFAULT_STAGES),
+        help=f"Virgülle ayrılmış aşamalar (seçenekler: {', '.join(ALL_STAGES)})",
+    )
+    parser.add_argument("--reviews", type=int, default=500, help="Sentetik yorum sayısı (varsayılan: 500)")
+    parser.add_argument("--repeat", type=int, default=5, help="Her aşamanın kaç kez ölçüleceği (varsayılan: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Sentetik veri ve model tohumu")
+    parser.add_argument(
+        "--models", choices=("stub", "real"), default="stub",
+        help="stub: küçük rastgele BERT + kimlik çeviri (indirme yok), real: gerçek modeller",
+    )
+    parser.add_argument("--cache", action="store_true", help="Sonuç önbelleğini kapatma (sıcak önbellek ölçümü)")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # TranslatorWorker bu dosyayı '--serve' ile başlatırsa sahte çeviri işçisi olarak çalış
+    if "--serve" in argv:
+        serve_identity_translator()
+        return 0
+
+    args = build_parser().parse_args(argv)
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in ALL_STAGES]
+    if unknown:
+        print(f"Bilinmeyen aşama: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    # Modüllerin bilgi mesajları JSON çıktısına karışmasın diye stderr'e gider
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        with tempfile.TemporaryDirectory(prefix="yorum-bench-") as workdir:
+            bench = Bench(args, workdir)
+            results = {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "environment": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                },
+                "config": {
+                    "reviews": args.reviews,
+                    "repeat": args.repeat,
+                    "seed": args.seed,
+                    "models": args.models,
+                    "cache": args.cache,
+                },
+                "stages": bench.run(stages),
+            }
+            if bench._analyzer is not None:
+                bench._analyzer.shutdown_translator_worker()
+    finally:
+        sys.stdout = real_stdout
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            results["comparison"] = compare(results, json.load(f), args.tolerance)
+        regressions = [name for name, c in results["comparison"].items() if c["regression"]]
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if regressions:
+        print(f">> bench: gerileme tespit edildi: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
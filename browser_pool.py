@@ -0,0 +1,301 @@
+# browser_pool.py
+# -*- coding: utf-8 -*-
+
+import os
+import atexit
+import asyncio
+import threading
+import concurrent.futures
+from contextlib import asynccontextmanager
+
+import cancellation
+
+# Aynı anda ödünç verilebilecek en fazla tarayıcı bağlamı (context) sayısı
+MAX_CONTEXTS = 4
+# Bir bağlam bu kadar kullanımdan sonra kapatılıp yenisi açılır
+MAX_CONTEXT_USES = 20
+# Tarayıcı bu kadar kullanımdan sonra ya da bellek sınırını aşınca yeniden başlatılır
+MAX_BROWSER_USES = 200
+BROWSER_MEMORY_LIMIT_MB = 1500
+
+
+def _process_table():
+    """/proc üzerinden {pid: (ppid, rss_kb, komut satırı)} (psutil yoksa kullanılır; Linux dışında boş)."""
+    table = {}
+    if not os.path.isdir("/proc"):
+        return table
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        ppid, rss_kb = 0, 0
+        try:
+            with open(f"/proc/{entry}/status", "r") as f:
+                for line in f:
+                    if line.startswith("PPid:"):
+                        ppid = int(line.split()[1])
+                    elif line.startswith("VmRSS:"):
+                        rss_kb = int(line.split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+        except OSError:
+            continue
+        table[int(entry)] = (ppid, rss_kb, cmdline)
+    return table
+
+
+def _browser_rss_mb(pid: int) -> float:
+    """
+    Verilen sürecin başlattığı Playwright sürücüsü ve onun alt süreçlerinin
+    (Chromium) toplam RSS'i (MB). Aynı sürecin diğer çocukları (çeviri işçisi,
+    puanlama işçileri) sayılmaz; sürücü komut satırındaki "playwright" ile tanınır.
+    """
+    try:
+        import psutil
+
+        total = 0
+        for child in psutil.Process(pid).children():
+            try:
+                if "playwright" not in " ".join(child.cmdline()):
+                    continue
+                for proc in [child] + child.children(recursive=True):
+                    total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    except ImportError:
+        pass
+
+    # psutil yoksa Linux'ta /proc üzerinden hesapla (başka sistemlerde 0 döner)
+    table = _process_table()
+    roots = {p for p, (ppid, _, cmdline) in table.items() if ppid == pid and "playwright" in cmdline}
+    total_kb = 0
+    for proc, (_, rss_kb, _) in table.items():
+        p = proc
+        while p:
+            if p in roots:
+                total_kb += rss_kb
+                break
+            p = table[p][0] if p in table else 0
+    return total_kb / 1024
+
+
+async def _next_item(agen, running: list, token):
+    """agen'in bir sonraki elemanı; çalışan görev iptal edilebilsin diye 'running'e yazılır."""
+    running.append(asyncio.current_task())
+    if token is not None and token.cancelled:
+        raise asyncio.CancelledError()
+    return await agen.__anext__()
+
+
+class BrowserPool:
+    """
+    Chromium'u analizler arasında açık (sıcak) tutan havuz.
+    Tarayıcı kendi thread'inde dönen bir asyncio olay döngüsünde yaşar; böylece
+    farklı thread'lerden gelen kazıma işleri aynı tarayıcıyı güvenle paylaşır.
+    Her iş izole bir bağlam (context) ödünç alır; bağlamlar belirli sayıda
+    kullanımdan sonra, tarayıcı ise kullanım veya bellek sınırı aşılınca yenilenir.
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = MAX_CONTEXTS,
+        max_context_uses: int = MAX_CONTEXT_USES,
+        max_browser_uses: int = MAX_BROWSER_USES,
+        memory_limit_mb: float = BROWSER_MEMORY_LIMIT_MB,
+        headless: bool = True,
+    ):
+        self.max_contexts = max_contexts
+        self.max_context_uses = max_context_uses
+        self.max_browser_uses = max_browser_uses
+        self.memory_limit_mb = memory_limit_mb
+        self.headless = headless
+
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        # Aşağıdakilere sadece havuzun olay döngüsünden erişilir
+        self._playwright = None
+        self._browser = None
+        self._browser_uses = 0
+        self._idle = []  # Boşta bekleyen (context, kullanım sayısı) çiftleri
+        self._active = 0
+        self._slots = asyncio.Semaphore(max_contexts)
+
+    # ---------- Olay döngüsü thread'i ----------
+
+    @property
+    def loop(self):
+        """Havuzun olay döngüsü (gerekirse thread'i başlatır)."""
+        with self._thread_lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro):
+        """Bir coroutine'i havuzun döngüsünde çalıştırır ve sonucunu bekler."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def iterate(self, agen):
+        """
+        Havuzun döngüsünde çalışan bir async generator'ı, çağıran thread için
+        normal bir generator'a çevirir. Erken bırakılırsa async generator kapatılır.
+        Etkin iptal belirteci (bkz. cancellation) iptal edilirse beklenen adım
+        yarıda kesilir: yüklenen sayfalar ve ödünç alınan bağlam hemen kapatılır.
+        """
+        token = cancellation.current_token()
+        try:
+            while token is None or not token.cancelled:
+                running = []
+                future = asyncio.run_coroutine_threadsafe(_next_item(agen, running, token), self.loop)
+
+                def abort():
+                    # Görev henüz başlamadıysa başladığında belirteci kendisi kontrol eder
+                    self.loop.call_soon_threadsafe(lambda: running and running[0].cancel())
+
+                try:
+                    with cancellation.on_cancel(abort):
+                        item = future.result()
+                except StopAsyncIteration:
+                    break
+                except concurrent.futures.CancelledError:
+                    break
+                yield item
+        finally:
+            self.run(agen.aclose())
+
+    # ---------- Tarayıcı ve bağlamlar ----------
+
+    async def _ensure_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return
+        if self._playwright is None:
+            # Playwright sadece tarayıcı gerçekten gerektiğinde içe aktarılır
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        print(">> browser_pool: Chromium başlatılıyor...")
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._browser_uses = 0
+        self._idle = []
+
+    async def _close_browser(self):
+        for ctx, _ in self._idle:
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+        self._idle = []
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+
+    async def _maybe_recycle_browser(self):
+        """Kullanımda bağlam yokken tarayıcı sınırları aştıysa yeniden başlatır."""
+        if self._browser is None or self._active > 0:
+            return
+        reason = None
+        if self._browser_uses >= self.max_browser_uses:
+            reason = f"{self._browser_uses} kullanım"
+        elif self.memory_limit_mb:
+            rss = _browser_rss_mb(os.getpid())
+            if rss > self.memory_limit_mb:
+                reason = f"{rss:.0f} MB bellek"
+        if reason:
+            print(f">> browser_pool: tarayıcı yenileniyor ({reason}).")
+            await self._close_browser()
+
+    @asynccontextmanager
+    async def context(self):
+        """
+        İzole bir tarayıcı bağlamı ödünç verir. Kullanım bitince açık sayfalar ve
+        çerezler temizlenip bağlam havuza geri konur (ya da sınırı dolduysa kapatılır).
+        """
+        async with self._slots:
+            await self._maybe_recycle_browser()
+            await self._ensure_browser()
+
+            if self._idle:
+                ctx, uses = self._idle.pop()
+            else:
+                ctx, uses = await self._browser.new_context(), 0
+
+            self._active += 1
+            broken = False
+            try:
+                yield ctx
+            except BaseException:
+                broken = True
+                raise
+            finally:
+                self._active -= 1
+                uses += 1
+                self._browser_uses += 1
+                try:
+                    if broken or uses >= self.max_context_uses or not self._browser.is_connected():
+                        await ctx.close()
+                    else:
+                        for page in list(ctx.pages):
+                            await page.close()
+                        await ctx.clear_cookies()
+                        self._idle.append((ctx, uses))
+                except Exception:
+                    pass
+
+    # ---------- Kapatma ----------
+
+    async def _shutdown(self):
+        await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def close(self):
+        """Tarayıcıyı, Playwright'ı ve olay döngüsü thread'ini kapatır."""
+        with self._thread_lock:
+            if self._thread is None:
+                return
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=15)
+        except Exception as e:
+            print(f"Tarayıcı havuzu kapatma hatası: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+        print(">> browser_pool: kapatıldı.")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Süreç boyunca paylaşılan tarayıcı havuzu (ilk çağrıda oluşturulur)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Tarayıcı havuzunu kapatır (program kapanırken otomatik çağrılır)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_browser_pool)
@@ -0,0 +1,189 @@
+# cache.py
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+
+# Önbellek dosyasının yeri ve en fazla kaç kayıt tutulacağı (ortam değişkenleriyle değiştirilebilir)
+CACHE_PATH = os.environ.get(
+    "YORUM_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai-yorum-analiz", "cache.sqlite3"),
+)
+CACHE_MAX_ENTRIES = int(os.environ.get("YORUM_CACHE_MAX_ENTRIES", "200000"))
+# Sınır aşılınca kayıt sayısı sınırın bu oranı kadar altına indirilir; böylece dolu
+# önbellekte her yazmada yeniden sayım ve silme yapılmaz
+CACHE_EVICT_HEADROOM = 0.05
+
+# YORUM_CACHE=0 ise önbellek tamamen devre dışı kalır
+CACHE_ENABLED = os.environ.get("YORUM_CACHE", "1") != "0"
+
+# SQLite'ın tek sorguda kabul ettiği parametre sayısı sınırlı, anahtarları bu boyutta parçalara böleriz
+_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """Aynı yorumun farklı yazımları aynı anahtarı üretsin diye metni sadeleştirir."""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(kind: str, text: str, model: str, revision: str = "", *extra) -> str:
+    """
+    İçerik adresli anahtar: normalize edilmiş metin + işlem türü + model adı ve
+    sürümünün SHA-256 özeti. Model değişirse eski sonuçlar otomatik olarak geçersiz olur.
+    """
+    parts = [kind, model, revision, *map(str, extra), normalize_text(text)]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Dil algılama, çeviri ve sentiment sonuçlarını diskte (SQLite, WAL modu) saklar.
+    Okuma ve yazmalar toplu yapılır; kayıt sayısı 'max_entries'ı aşınca en uzun
+    süredir kullanılmayan kayıtlar silinir (LRU). İsabet/ıskalama sayıları tutulur.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._count = None  # Kayıt sayısının üst sınırı (bkz. _evict); None ise henüz sayılmadı
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+
+    def get_many(self, kind: str, keys) -> list:
+        """Anahtarların değerlerini girdi sırasıyla döndürür; bulunamayanlar None olur."""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), _CHUNK):
+                chunk = keys[start:start + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE key IN ({marks})", chunk
+                ).fetchall()
+                found.update((k, json.loads(v)) for k, v in rows)
+
+            # İsabet eden kayıtların son kullanım zamanını güncelle (LRU için)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE entries SET last_access = ? WHERE key = ?",
+                    [(now, k) for k in found],
+                )
+
+            self.hits[kind] = self.hits.get(kind, 0) + sum(1 for k in keys if k in found)
+            self.misses[kind] = self.misses.get(kind, 0) + sum(1 for k in keys if k not in found)
+
+        return [found.get(k) for k in keys]
+
+    def put_many(self, kind: str, items: dict):
+        """{anahtar: değer} kayıtlarını tek işlemde yazar, gerekirse eski kayıtları siler."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, kind, value, last_access) VALUES (?, ?, ?, ?)",
+                    [(k, kind, json.dumps(v, ensure_ascii=False), now) for k, v in items.items()],
+                )
+                self._evict(len(items))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._count = None  # Geri alınan silme sayacı bozmasın; bir sonraki yazmada sayılır
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, added: int):
+        """
+        Kayıt sayısı sınırı aşıldıysa en eski kullanılan kayıtları siler. COUNT(*) her
+        yazmada çalışmaz: eklenen kayıtlarla artan bir üst sınır tutulur (INSERT OR REPLACE
+        var olan anahtarın üzerine yazabilir), gerçek sayı sadece bu sınır aşılınca sorgulanır.
+        Başka süreçlerin eklediği kayıtlar da o sayımda görülür.
+        """
+        if self._count is not None:
+            self._count += added
+            if self._count <= self.max_entries:
+                return
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            target = self.max_entries - int(self.max_entries * CACHE_EVICT_HEADROOM)
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY last_access LIMIT ?)",
+                (count - target,),
+            )
+            count = target
+        self._count = count
+
+    def stats(self) -> dict:
+        """Türlere göre isabet/ıskalama sayıları ve toplam kayıt sayısı."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            kinds = sorted(set(self.hits) | set(self.misses))
+            result = {"entries": count, "kinds": {}}
+            for kind in kinds:
+                hits = self.hits.get(kind, 0)
+                misses = self.misses.get(kind, 0)
+                total = hits + misses
+                result["kinds"][kind] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": round(hits / total, 3) if total else 0.0,
+                }
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._count = 0
+            self.hits.clear()
+            self.misses.clear()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_failed = False
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Süreç boyunca paylaşılan önbellek nesnesini döndürür.
+    Önbellek kapalıysa veya açılamadıysa None döner (analiz önbelleksiz devam eder).
+    """
+    global _cache, _cache_failed
+    if not CACHE_ENABLED or _cache_failed:
+        return None
+    with _cache_lock:
+        if _cache is None and not _cache_failed:
+            try:
+                _cache = ResultCache()
+            except Exception as e:
+                print(f"Önbellek açılamadı, önbelleksiz devam ediliyor: {e}")
+                _cache_failed = True
+        return _cache
@@ -0,0 +1,133 @@
+# cancellation.py
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Analiz başına varsayılan süre sınırı (saniye); YORUM_DEADLINE ayarlı değilse sınır yok
+DEFAULT_DEADLINE = float(os.environ.get("YORUM_DEADLINE", "0")) or None
+
+# O an etkin olan iptal belirteci. metrics._current gibi thread'ler arasında
+# kendiliğinden taşınmaz; yeni thread'lerde use_token ile yeniden etkinleştirilmelidir.
+_current = contextvars.ContextVar("cancel_token", default=None)
+
+
+class Cancelled(Exception):
+    """Analiz iptal edildi ya da süre sınırı doldu (reason: "cancelled" veya "deadline")."""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancelToken:
+    """
+    Süren bir analizi durdurmak için paylaşılan belirteç.
+    cancel() herhangi bir thread'den çağrılabilir; kazıma, çeviri ve puanlama
+    aşamaları belirteci kendi adımları arasında kontrol eder ve o ana kadar
+    işlenenlerle (kısmi sonuç) döner. deadline (saniye) verilirse süre
+    dolduğunda belirteç kendiliğinden "deadline" sebebiyle iptal edilir.
+    Uzun süren bir adımı (örn. çeviri işçisinin büyük bir isteği) hemen kesmek
+    için on_cancel ile geri çağırma kaydedilebilir.
+    """
+
+    def __init__(self, deadline: float | None = None):
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._timer = None
+        if deadline is not None:
+            self._timer = threading.Timer(deadline, self.cancel, args=("deadline",))
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        """Belirteci iptal eder ve kayıtlı geri çağırmaları çalıştırır (sadece ilk çağrıda)."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        if self._timer is not None:
+            self._timer.cancel()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f">> cancellation: iptal geri çağırma hatası: {e}")
+
+    def check(self):
+        """İptal edildiyse Cancelled fırlatır."""
+        if self._event.is_set():
+            raise Cancelled(self.reason)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._event.wait(timeout)
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """Blok süresince iptalde 'callback' çağrılır; zaten iptal edildiyse hemen çağrılır."""
+        with self._lock:
+            registered = not self._event.is_set()
+            if registered:
+                self._callbacks.append(callback)
+        if not registered:
+            callback()
+        try:
+            yield
+        finally:
+            if registered:
+                with self._lock:
+                    self._callbacks.remove(callback)
+
+    def close(self):
+        """Süre sınırı zamanlayıcısını durdurur (analiz bittiğinde çağrılır)."""
+        if self._timer is not None:
+            self._timer.cancel()
+
+
+# ---------------- ETKİN BELİRTECİ KULLANAN YARDIMCILAR ---------------- #
+# Etkin belirteç yoksa hiçbir şey yapmazlar; iptal desteği olmayan çağrılar aynen çalışır.
+
+def current_token():
+    """O an etkin olan belirteç (yoksa None)."""
+    return _current.get()
+
+
+@contextmanager
+def use_token(token: CancelToken | None):
+    """Bu blok (ve bu thread) boyunca iptal kontrolleri 'token'a bakar."""
+    handle = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(handle)
+
+
+def cancelled() -> bool:
+    token = _current.get()
+    return token is not None and token.cancelled
+
+
+def check():
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+@contextmanager
+def on_cancel(callback):
+    token = _current.get()
+    if token is None:
+        yield
+        return
+    with token.on_cancel(callback):
+        yield
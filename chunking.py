@@ -0,0 +1,112 @@
+# chunking.py
+# -*- coding: utf-8 -*-
+
+import re
+
+# Cümle sonu: . ! ? … ardından boşluk; boşluk kullanılmayan dillerde (Çince, Japonca)
+# tam genişlikli 。！？ sonrası; ya da satır sonu
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？｡])\s*|\s*\n+\s*")
+
+
+def split_sentences(text: str) -> list:
+    """Metni cümlelere böler (boş parçalar atılır)."""
+    return [s.strip() for s in SENTENCE_END.split(text or "") if s and s.strip()]
+
+
+def _pack(pieces, lengths, max_tokens: int) -> list:
+    """Ardışık parçaları toplam uzunluk max_tokens'ı geçmeyecek şekilde gruplar: [(metin, token sayısı)]."""
+    chunks = []
+    current = []
+    current_tokens = 0
+    for piece, n in zip(pieces, lengths):
+        if current and current_tokens + n > max_tokens:
+            chunks.append((" ".join(current), current_tokens))
+            current = []
+            current_tokens = 0
+        current.append(piece)
+        current_tokens += n
+    if current:
+        chunks.append((" ".join(current), current_tokens))
+    return chunks
+
+
+def _split_hard(text: str, n: int, max_tokens: int, count_tokens) -> list:
+    """
+    Kelime sınırı olmayan (örn. boşluksuz Çince) ya da tek kelimesi bütçeyi aşan
+    bir parçayı karakter konumundan, token sayısıyla orantılı pencerelere böler;
+    hâlâ bütçeyi aşan pencereler yeniden bölünür: [(parça, token sayısı)].
+    """
+    if n <= max_tokens or len(text) < 2:
+        return [(text, n)]
+    parts = min(len(text), -(-n // max_tokens))
+    size = -(-len(text) // parts)
+    windows = [text[k:k + size] for k in range(0, len(text), size)]
+    result = []
+    for window, m in zip(windows, count_tokens(windows)):
+        result.extend(_split_hard(window, m, max_tokens, count_tokens))
+    return result
+
+
+def chunk_text(text: str, max_tokens: int, count_tokens) -> list:
+    """
+    Uzun bir metni cümle sınırlarından, her biri en fazla max_tokens token olan
+    parçalara böler: [(parça, token sayısı)]. Tek başına bütçeyi aşan cümleler
+    kelime sınırlarından, bütçeyi aşan tek kelimeler (boşluksuz diller dahil)
+    token penceresine göre bölünür; hiçbir parça model tarafında kesilmez.
+    count_tokens(metinler) -> token sayıları; özel tokenlar (CLS/SEP vb.) sayılmamalıdır.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    pieces = []
+    lengths = []
+    for sentence, n in zip(sentences, count_tokens(sentences)):
+        if n <= max_tokens:
+            pieces.append(sentence)
+            lengths.append(n)
+            continue
+        words = sentence.split()
+        for part, part_tokens in _pack(words, count_tokens(words), max_tokens):
+            for piece, piece_tokens in _split_hard(part, part_tokens, max_tokens, count_tokens):
+                pieces.append(piece)
+                lengths.append(piece_tokens)
+    return _pack(pieces, lengths, max_tokens)
+
+
+def expand(texts, lengths, max_tokens: int, count_tokens):
+    """
+    Bütçeyi (max_tokens) aşan metinleri parçalara ayırıp kısa metinlerle aynı
+    listeye koyar; böylece parçalar kısa yorumlarla aynı batch'lerde işlenir.
+    lengths: metinlerin (özel tokenlar hariç) token sayıları.
+    Döndürür: (parçalar, sahipler, ağırlıklar) - sahipler[k] parçanın ait olduğu
+    metnin indeksi, ağırlıklar[k] parçanın token sayısıdır (bkz. combine_weighted).
+    """
+    chunks, owners, weights = [], [], []
+    for i, (text, n) in enumerate(zip(texts, lengths)):
+        parts = chunk_text(text, max_tokens, count_tokens) if n > max_tokens else []
+        if not parts:
+            parts = [(text, n)]
+        for part, part_tokens in parts:
+            chunks.append(part)
+            owners.append(i)
+            weights.append(max(1, part_tokens))
+    return chunks, owners, weights
+
+
+def combine_weighted(values, owners, weights, count: int) -> list:
+    """Parça sonuçlarını sahip metin başına uzunluk ağırlıklı ortalamayla birleştirir (count adet)."""
+    totals = [0.0] * count
+    sums = [0.0] * count
+    for value, owner, weight in zip(values, owners, weights):
+        totals[owner] += weight * value
+        sums[owner] += weight
+    return [totals[i] / sums[i] if sums[i] else 0.0 for i in range(count)]
+
+
+def combine_joined(values, owners, count: int) -> list:
+    """Parça sonuçlarını (örn. çevirileri) sahip metin başına sırayla birleştirir."""
+    parts = [[] for _ in range(count)]
+    for value, owner in zip(values, owners):
+        if value:
+            parts[owner].append(value.strip())
+    return [" ".join(p) for p in parts]
@@ -0,0 +1,269 @@
+# cli.py
+# -*- coding: utf-8 -*-
+
+# Arayüzsüz (headless) toplu analiz: PyQt5 hiç içe aktarılmaz, sunucularda çalışır.
+# Kullanım örnekleri:
+#   python cli.py -i linkler.txt -o sonuclar.jsonl -j 4 --checkpoint ilerleme.txt
+#   cat linkler.txt | python cli.py > sonuclar.jsonl
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def read_urls(stream) -> list:
+    """Her satırda bir link; boş satırlar ve '#' ile başlayanlar atlanır. Tekrarlar tek sayılır."""
+    urls = []
+    seen = set()
+    for line in stream:
+        url = line.strip()
+        if url and not url.startswith("#") and url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+
+def load_checkpoint(path: str | None) -> set:
+    """Daha önce başarıyla tamamlanmış linkleri okur."""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def analyze_url(
+    url: str,
+    max_reviews: int | None,
+    backend: str,
+    incremental: bool = False,
+    adaptive: bool = False,
+    tolerance: float | None = None,
+    time_budget: float | None = None,
+    deadline: float | None = None,
+) -> dict:
+    """
+    Tek bir ürünü kazır, analiz eder ve aşama sürelerini ölçer.
+    adaptive=True ise yorumların hepsi yerine yıldızlara göre katmanlı bir örneklem
+    puanlanır (bkz. analyzer.analyze_comments); tolerance/time_budget verilmezse
+    analyzer'daki varsayılanlar kullanılır.
+    deadline verilirse ürün başına en fazla bu kadar saniye harcanır; süre dolunca
+    o ana kadar puanlanan yorumlarla kısmi sonuç yazılır ('partial', 'sample_size').
+    """
+    if incremental:
+        return analyze_url_incremental(url, max_reviews, backend, deadline)
+
+    import metrics
+    from cancellation import CancelToken
+    from scraper import get_reviews
+    import analyzer
+    from analyzer import analyze_comments
+
+    token = CancelToken(deadline) if deadline else None
+    # Kazıma da aynı performans raporuna yazılsın diye rapor burada etkinleştirilir
+    with metrics.use_report(metrics.PerfReport()):
+        started = time.perf_counter()
+        data = get_reviews(url, max_reviews=max_reviews, backend=backend, cancel=token)
+        scraped = time.perf_counter()
+
+        result = analyze_comments(
+            data["comments"],
+            total_reviews=data.get("total_reviews", 0),
+            average_stars=data.get("average_stars", 0.0),
+            ratings=[r.get("rating") for r in data["reviews"]],
+            adaptive=adaptive,
+            tolerance=analyzer.ADAPTIVE_TOLERANCE if tolerance is None else tolerance,
+            time_budget=analyzer.ADAPTIVE_TIME_BUDGET if time_budget is None else time_budget,
+            cancel=token,
+        )
+        finished = time.perf_counter()
+    if token is not None:
+        token.close()
+
+    record = {
+        "url": url,
+        "final_score": result["final_score"],
+        "total_reviews": data.get("total_reviews") or len(data["comments"]),
+        "average_stars": data.get("average_stars", 0.0),
+        "scraped_reviews": len(data["comments"]),
+        "details": result["details"],
+        "timings": {
+            "scrape_s": round(scraped - started, 3),
+            "analyze_s": round(finished - scraped, 3),
+            "total_s": round(finished - started, 3),
+        },
+        "perf": result["perf"],
+        "partial": result["partial"] or data["cancelled"],
+    }
+    if record["partial"]:
+        record["sample_size"] = len(result["details"])
+    if adaptive:
+        record["sample_size"] = result["sample_size"]
+        record["confidence_interval"] = result["confidence_interval"]
+        record["stopped"] = result["stopped"]
+    return record
+
+
+def analyze_url_incremental(url: str, max_reviews: int | None, backend: str, deadline: float | None = None) -> dict:
+    """analyze_url'in artımlı hali: sadece önceki analizden beri gelen yorumlar işlenir."""
+    import metrics
+    from cancellation import CancelToken
+    from pipeline import analyze_incremental
+
+    token = CancelToken(deadline) if deadline else None
+    with metrics.use_report(metrics.PerfReport()):
+        started = time.perf_counter()
+        result = analyze_incremental(url, max_reviews=max_reviews, backend=backend, cancel=token)
+        finished = time.perf_counter()
+    if token is not None:
+        token.close()
+
+    scrape_s = result["perf"]["stages"].get("scrape", {}).get("seconds", 0.0)
+    record = {
+        "url": url,
+        "final_score": result["final_score"],
+        "total_reviews": result["total_reviews"] or result["count"],
+        "average_stars": result["average_stars"],
+        "scraped_reviews": result["scraped"],
+        "new_reviews": result["new_reviews"],
+        "known_reviews": result["known_reviews"],
+        "partial": result["partial"],
+        "details": result["details"],
+        "timings": {
+            "scrape_s": round(scrape_s, 3),
+            "analyze_s": round(finished - started - scrape_s, 3),
+            "total_s": round(finished - started, 3),
+        },
+        "perf": result["perf"],
+    }
+    if result["partial"]:
+        record["sample_size"] = result["sample_size"]
+    return record
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Amazon ürün linklerini arayüz olmadan toplu analiz eder (her ürün için bir JSON satırı)."
+    )
+    parser.add_argument("-i", "--input", help="Linklerin olduğu dosya (verilmezse stdin okunur)")
+    parser.add_argument("-o", "--output", help="Sonuçların yazılacağı JSONL dosyası (verilmezse stdout; dosyaya eklenir)")
+    parser.add_argument("-j", "--jobs", type=int, default=2, help="Aynı anda analiz edilecek ürün sayısı (varsayılan: 2)")
+    parser.add_argument("--checkpoint", help="Tamamlanan linklerin kaydedildiği dosya; yeniden çalıştırınca bunlar atlanır")
+    parser.add_argument("--max-reviews", type=int, default=None, help="Ürün başına en fazla yorum sayısı")
+    parser.add_argument(
+        "--backend", choices=("browser", "http"), default="browser",
+        help="Kazıma yöntemi: Chromium ile (browser) ya da tarayıcısız (http)",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Daha önce analiz edilen ürünlerde sadece yeni/düzenlenmiş yorumları işle (günlük takip için)",
+    )
+    parser.add_argument(
+        "--adaptive", action="store_true",
+        help="Tüm yorumlar yerine, puan yeterince kesinleşene kadar yıldızlara göre katmanlı bir örneklemi analiz et",
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=None,
+        help="--adaptive: nihai puanın %%95 güven aralığının kabul edilen yarı genişliği (varsayılan: 1.0 puan)",
+    )
+    parser.add_argument(
+        "--time-budget", type=float, default=None,
+        help="--adaptive: ürün başına en fazla analiz süresi, saniye (varsayılan: 60)",
+    )
+    parser.add_argument(
+        "--deadline", type=float, default=None,
+        help="Ürün başına en fazla süre (saniye); dolunca o ana kadarki yorumlarla kısmi sonuç yazılır",
+    )
+    parser.add_argument(
+        "--fit-calibration", metavar="DOSYA",
+        help="Her satırı bir Türkçe yorum olan dosyadan çok dilli modelin kalibrasyon "
+             "katsayılarını hesaplayıp önbellek klasörüne kaydeder (analiz yapılmaz)",
+    )
+    return parser
+
+
+def fit_calibration_file(path: str) -> int:
+    import analyzer
+
+    with open(path, "r", encoding="utf-8") as f:
+        texts = [line.strip() for line in f if line.strip()]
+    a, b = analyzer.fit_multilingual_calibration(texts)
+    path = analyzer.save_calibration(a, b, len(texts))
+    print(f">> cli: {len(texts)} yorumla kalibrasyon hesaplandı, {path} dosyasına kaydedildi.", file=sys.stderr)
+    print(f'YORUM_MULTI_CALIBRATION="{a:.4f},{b:.4f}"')
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.adaptive and args.incremental:
+        # Artımlı analiz her yeni yorumun puanını saklar; örneklemeyle birlikte kullanılamaz
+        parser.error("--adaptive ve --incremental birlikte kullanılamaz")
+    if args.fit_calibration:
+        return fit_calibration_file(args.fit_calibration)
+
+    if args.input:
+        with open(args.input, "r", encoding="utf-8") as f:
+            urls = read_urls(f)
+    else:
+        urls = read_urls(sys.stdin)
+
+    done = load_checkpoint(args.checkpoint)
+    todo = [u for u in urls if u not in done]
+    print(f">> cli: {len(urls)} link, {len(urls) - len(todo)} tanesi daha önce tamamlanmış.", file=sys.stderr)
+    if not todo:
+        return 0
+
+    out = open(args.output, "a", encoding="utf-8") if args.output else sys.stdout
+    # Modüllerin bilgi mesajları (print) JSON satırlarına karışmasın diye stderr'e gider
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    checkpoint = open(args.checkpoint, "a", encoding="utf-8") if args.checkpoint else None
+    write_lock = threading.Lock()
+
+    def emit(record: dict, completed: bool):
+        # Sonuç satırı yazılıp diske aktarıldıktan sonra link tamamlandı olarak işaretlenir;
+        # çökme olursa en kötü ihtimalle son ürün tekrar analiz edilir.
+        with write_lock:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if completed and checkpoint is not None:
+                checkpoint.write(record["url"] + "\n")
+                checkpoint.flush()
+                os.fsync(checkpoint.fileno())
+
+    failures = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+            futures = {
+                executor.submit(
+                    analyze_url, url, args.max_reviews, args.backend, args.incremental,
+                    args.adaptive, args.tolerance, args.time_budget, args.deadline,
+                ): url
+                for url in todo
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    emit(future.result(), completed=True)
+                except Exception as e:
+                    failures += 1
+                    traceback.print_exc()
+                    emit({"url": url, "error": str(e)}, completed=False)
+    finally:
+        sys.stdout = real_stdout
+        if out is not real_stdout:
+            out.close()
+        if checkpoint is not None:
+            checkpoint.close()
+
+    print(f">> cli: bitti. {len(todo) - failures} başarılı, {failures} hatalı.", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# dedup.py
+# -*- coding: utf-8 -*-
+
+import os
+import zlib
+import random
+
+from cache import normalize_text
+
+# Yakın kopya sayılmak için gereken en düşük benzerlik (karakter 5-gram kümelerinin Jaccard benzerliği)
+DEDUP_THRESHOLD = float(os.environ.get("YORUM_DEDUP_THRESHOLD", "0.85"))
+# YORUM_DEDUP=0 ise sadece birebir aynı (normalize edilmiş) yorumlar birleştirilir
+NEAR_DEDUP_ENABLED = os.environ.get("YORUM_DEDUP", "1") != "0"
+
+# MinHash imzasının uzunluğu ve metinlerin bölündüğü karakter parçalarının (shingle) boyu
+NUM_PERM = 64
+SHINGLE_SIZE = 5
+# Eşik benzerliğindeki bir çiftin LSH ile aday olma olasılığı en az bu kadar olmalı (bkz. lsh_params)
+LSH_MIN_RECALL = 0.9
+# Bir LSH kovasında bu kadardan fazla metin varsa tüm çiftler yerine sadece ilk metinle karşılaştırılır
+MAX_BUCKET_PAIRS = 20
+
+# Karma fonksiyonları için Mersenne asal sayısı (2^31 - 1): a * h + b 64 bite sığar
+_PRIME = (1 << 31) - 1
+_SEED = 1
+
+
+def dedup_key(text: str) -> str:
+    """Birebir kopyaları bulmak için anahtar: boşluklar sadeleştirilmiş, küçük harfli metin."""
+    return normalize_text(text).casefold()
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> set:
+    """Metnin k karakterlik örtüşen parçalarının (32 bit özet) kümesi."""
+    t = dedup_key(text)
+    if len(t) <= k:
+        return {zlib.crc32(t.encode("utf-8"))}
+    return {zlib.crc32(t[i:i + k].encode("utf-8")) for i in range(len(t) - k + 1)}
+
+
+def _permutations(num_perm: int):
+    rng = random.Random(_SEED)
+    return [rng.randrange(1, _PRIME) for _ in range(num_perm)], [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+
+
+def minhash_signatures(texts, num_perm: int = NUM_PERM) -> list:
+    """
+    Her metin için MinHash imzası: num_perm farklı karma fonksiyonu altında
+    parçaların en küçük değeri. İki imzanın aynı olan konumlarının oranı,
+    metinlerin Jaccard benzerliğinin tahminidir.
+    numpy varsa vektörel hesaplanır, yoksa saf Python ile.
+    """
+    a, b = _permutations(num_perm)
+    try:
+        import numpy as np
+
+        a_arr = np.array(a, dtype=np.uint64)
+        b_arr = np.array(b, dtype=np.uint64)
+        signatures = []
+        for text in texts:
+            hashes = np.fromiter(shingles(text), dtype=np.uint64)
+            values = (hashes[:, None] * a_arr[None, :] + b_arr[None, :]) % _PRIME
+            signatures.append(tuple(values.min(axis=0).tolist()))
+        return signatures
+    except ImportError:
+        pass
+
+    signatures = []
+    for text in texts:
+        hashes = shingles(text)
+        signatures.append(tuple(min((ai * h + bi) % _PRIME for h in hashes) for ai, bi in zip(a, b)))
+    return signatures
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM, min_recall: float = LSH_MIN_RECALL):
+    """
+    İmzanın kaç banda (bands) ve her bandın kaç satıra (rows) bölüneceğini seçer.
+    Benzerliği s olan iki metnin en az bir bandı tutup aday olma olasılığı
+    1 - (1 - s^rows)^bands'dir. Eşikteki çiftlerin en az 'min_recall' olasılıkla aday
+    olduğu en büyük rows seçilir (daha büyük rows = daha az gereksiz aday); adaylar
+    zaten gerçek benzerlikle kontrol edildiği için hassasiyet yerine bulma oranı önceliklidir.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= min_recall:
+            best = (bands, rows)
+    return best
+
+
+def _similar(a: set, b: set, threshold: float) -> bool:
+    # Parça kümelerinin gerçek Jaccard benzerliği eşiğe ulaşıyor mu
+    return len(a & b) >= threshold * len(a | b)
+
+
+def _find(parent: list, i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent: list, i: int, j: int):
+    # Küme temsilcisi her zaman en küçük indeks (ilk görülen yorum) olur
+    ri, rj = _find(parent, i), _find(parent, j)
+    if ri != rj:
+        parent[max(ri, rj)] = min(ri, rj)
+
+
+def cluster_texts(
+    texts,
+    threshold: float = DEDUP_THRESHOLD,
+    near: bool = NEAR_DEDUP_ENABLED,
+    num_perm: int = NUM_PERM,
+) -> list:
+    """
+    Kopya yorumları kümeler. Her metin için kümesinin temsilcisinin indeksini
+    döndürür (temsilci kümede ilk görülen metindir; kopyası olmayan metin kendi temsilcisidir).
+    1. Birebir kopyalar: normalize edilmiş metni aynı olanlar.
+    2. Yakın kopyalar (near=True): MinHash + LSH ile aday çiftler bulunur, adayların
+       gerçek Jaccard benzerliği 'threshold' ve üstünde olanlar aynı kümeye konur.
+    """
+    texts = list(texts)
+    parent = list(range(len(texts)))
+
+    first = {}
+    for i, text in enumerate(texts):
+        key = dedup_key(text)
+        if key in first:
+            _union(parent, first[key], i)
+        else:
+            first[key] = i
+
+    # Yakın kopya araması sadece birbirinden farklı metinler arasında yapılır
+    unique = sorted(first.values())
+    if near and len(unique) > 1:
+        signatures = minhash_signatures([texts[i] for i in unique], num_perm)
+        bands, rows = lsh_params(threshold, num_perm)
+        checked = set()
+        sets = {}  # Aday çiftlerdeki metinlerin parça kümeleri (gerçek Jaccard için)
+        for band in range(bands):
+            buckets = {}
+            for pos, signature in enumerate(signatures):
+                buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(pos)
+            for members in buckets.values():
+                # Kalabalık kovada (ortak kalıp metin) sadece ilk üyeyle karşılaştır
+                anchors = len(members) if len(members) <= MAX_BUCKET_PAIRS else 1
+                for x in range(1, len(members)):
+                    for y in range(min(x, anchors)):
+                        p, q = members[y], members[x]
+                        if (p, q) in checked:
+                            continue
+                        checked.add((p, q))
+                        # İmza tahmini eşik civarında gürültülü; adaylar gerçek Jaccard ile doğrulanır
+                        for pos in (p, q):
+                            if pos not in sets:
+                                sets[pos] = shingles(texts[unique[pos]])
+                        if _similar(sets[p], sets[q], threshold):
+                            _union(parent, unique[p], unique[q])
+
+    return [_find(parent, i) for i in range(len(texts))]
+
+
+class DedupIndex:
+    """
+    Akış halinde gelen yorumlar için artımlı kopya araması (bkz. cluster_texts):
+    add() her metne sırayla bir numara verir ve metnin kopyası olduğu önceki
+    temsilcinin numarasını (kopya değilse kendi numarasını) döndürür.
+    Sadece temsilciler indekslenir; LSH kovaları ve parça kümeleri bellekte tutulur.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, near: bool = NEAR_DEDUP_ENABLED, num_perm: int = NUM_PERM):
+        self.threshold = threshold
+        self.near = near
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.size = 0
+        self._exact = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._sets = {}
+
+    def add(self, text: str) -> int:
+        number = self.size
+        self.size += 1
+        key = dedup_key(text)
+        if key in self._exact:
+            return self._exact[key]
+        if self.near:
+            own = shingles(text)
+            signature = minhash_signatures([text], self.num_perm)[0]
+            keys = [signature[band * self.rows:(band + 1) * self.rows] for band in range(self.bands)]
+            candidates = set()
+            for buckets, band_key in zip(self._buckets, keys):
+                # Kalabalık kovada (ortak kalıp metin) sadece ilk üyelerle karşılaştır
+                candidates.update(buckets.get(band_key, ())[:MAX_BUCKET_PAIRS])
+            for candidate in sorted(candidates):
+                if _similar(own, self._sets[candidate], self.threshold):
+                    self._exact[key] = candidate
+                    return candidate
+            for buckets, band_key in zip(self._buckets, keys):
+                buckets.setdefault(band_key, []).append(number)
+            self._sets[number] = own
+        self._exact[key] = number
+        return number
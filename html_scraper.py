@@ -0,0 +1,301 @@
+# html_scraper.py
+# -*- coding: utf-8 -*-
+
+import os
+import glob
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, unquote
+
+from lxml import html as lxml_html
+
+from scraper import (
+    MAX_REVIEW_PAGES,
+    REVIEW_PAGE_CONCURRENCY,
+    REVIEW_PAGE_RETRIES,
+    PaginationGuard,
+    extract_asin,
+    is_known,
+    parse_extracted,
+    parse_number,
+    parse_stars,
+    review_key,
+    review_page_url,
+)
+
+# Tarayıcı kullanmadan sayfa isterken gönderilecek başlıklar
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept-Language": "tr-TR,tr;q=0.9,en;q=0.8",
+}
+HTTP_TIMEOUT = 30  # saniye
+
+# scraper.EXTRACT_JS ile aynı seçicilerin XPath karşılıkları
+_CLASS_A_ICON_ALT = "contains(concat(' ', normalize-space(@class), ' '), ' a-icon-alt ')"
+XPATH_STARS = f"//span[{_CLASS_A_ICON_ALT}]"
+XPATH_COUNT = "//*[@id='acrCustomerReviewText']"
+XPATH_REVIEW_BODY = "//span[@data-hook='review-body']"
+XPATH_REVIEW_BLOCK = "ancestor::*[@data-hook='review'][1]"
+XPATH_REVIEW_RATING = (
+    ".//*[@data-hook='review-star-rating' or @data-hook='cmps-review-star-rating']"
+    f"//span[{_CLASS_A_ICON_ALT}]"
+)
+
+
+def _text(el) -> str:
+    """Tarayıcıdaki innerText'e yakın metin: <br> etiketleri satır sonuna çevrilir."""
+    if el is None:
+        return ""
+    for br in el.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+    return el.text_content().strip()
+
+
+def _first(tree, xpath: str):
+    found = tree.xpath(xpath)
+    return found[0] if found else None
+
+
+def extract_from_html(page_html: str) -> dict:
+    """
+    Ham HTML'den yıldız, yorum sayısı ve yorumları çıkarır. Çıktı biçimi
+    scraper.EXTRACT_JS ile aynıdır; böylece aynı temizleme kodu kullanılır.
+    """
+    if not page_html:
+        return {"stars": "", "count": "", "reviews": []}
+    tree = lxml_html.fromstring(page_html)
+
+    reviews = []
+    for body in tree.xpath(XPATH_REVIEW_BODY):
+        block = _first(body, XPATH_REVIEW_BLOCK)
+        rating = _first(block, XPATH_REVIEW_RATING) if block is not None else None
+        reviews.append({
+            "id": block.get("id", "") if block is not None else "",
+            "text": _text(body),
+            "rating": _text(rating),
+        })
+
+    return {
+        "stars": _text(_first(tree, XPATH_STARS)),
+        "count": _text(_first(tree, XPATH_COUNT)),
+        "reviews": reviews,
+    }
+
+
+# ---------------- SAYFA KAYNAKLARI ---------------- #
+
+class HttpFetcher:
+    """
+    Sayfaları düz HTTP ile indirir. Tek bir requests.Session kullanıldığı için
+    aynı sunucuya yapılan istekler açık bağlantıları (connection pool) paylaşır.
+    """
+
+    def __init__(self, pool_size: int = REVIEW_PAGE_CONCURRENCY, retries: int = 2):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        self.session.headers.update(HTTP_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url: str) -> str:
+        """Sayfayı indirir. Hata (zaman aşımı, 4xx/5xx) yutulmaz; boş sayfa ile karışmasın diye fırlatılır."""
+        try:
+            response = self.session.get(url, timeout=HTTP_TIMEOUT)
+            response.raise_for_status()
+            return response.text
+        except Exception as e:
+            print(f"HTTP hatası ({url}): {e}")
+            raise
+
+    def close(self):
+        self.session.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_http_fetcher() -> HttpFetcher:
+    """Süreç boyunca paylaşılan HTTP oturumu."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher()
+        return _fetcher
+
+
+def is_local_source(source: str) -> bool:
+    """Kaynak, kaydedilmiş bir HTML dosyası/klasörü mü (file:// veya yerel yol)?"""
+    return source.startswith("file://") or os.path.exists(source)
+
+
+def _local_path(source: str) -> str:
+    if source.startswith("file://"):
+        return unquote(urlsplit(source).path)
+    return source
+
+
+def _read_file(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+# ---------------- KAZIMA ---------------- #
+
+def _iter_snapshot_reviews(source: str, max_reviews, meta: dict, known=None):
+    """
+    Kaydedilmiş sayfalardan yorum üretir. Kaynak tek bir dosya ya da içindeki
+    .html dosyaları isim sırasıyla okunan bir klasör olabilir (örn. ürün sayfası
+    ve yorum listesi sayfaları). Yıldız ve yorum sayısı ilk bulunan sayfadan alınır.
+    """
+    path = _local_path(source)
+    files = sorted(glob.glob(os.path.join(path, "*.htm*"))) if os.path.isdir(path) else [path]
+
+    seen = set()
+    count = 0
+    for file_path in files:
+        raw = extract_from_html(_read_file(file_path))
+        if not meta["average_stars"]:
+            meta["average_stars"] = parse_stars(raw["stars"])
+        if not meta["total_reviews"]:
+            meta["total_reviews"] = parse_number(raw["count"])
+
+        for review in parse_extracted(raw):
+            key = review_key(review)
+            if key in seen:
+                continue
+            seen.add(key)
+            if is_known(review, known):
+                continue
+            yield review
+            count += 1
+            if max_reviews is not None and count >= max_reviews:
+                return
+
+
+def _iter_http_reviews(url: str, max_reviews, meta: dict, max_pages: int, concurrency: int, fetcher, known=None):
+    """
+    Ürün sayfasını ve sayfalı yorum listesini düz HTTP ile indirir.
+    Liste sayfaları thread havuzunda 'concurrency' kadar aynı anda indirilir,
+    yorumlar yine sayfa sırasıyla üretilir (scraper ile aynı durma ve 'known' kuralları).
+    """
+    if "amazon" not in url:
+        # Sadece Amazon destekleniyor, Hepsiburada kaldırıldı.
+        print("HATA: Desteklenmeyen site veya Hepsiburada kaldırıldı.")
+        return
+
+    try:
+        raw = extract_from_html(fetcher.fetch(url))
+    except Exception as e:
+        print(f"Bağlantı hatası: {e}")
+        return
+    meta["average_stars"] = parse_stars(raw["stars"]) or meta["average_stars"]
+    meta["total_reviews"] = parse_number(raw["count"]) or meta["total_reviews"]
+
+    seen = set()
+    count = 0
+    for review in parse_extracted(raw):
+        key = review_key(review)
+        if key in seen:
+            continue
+        seen.add(key)
+        if is_known(review, known):
+            continue
+        yield review
+        count += 1
+        if max_reviews is not None and count >= max_reviews:
+            return
+
+    asin = extract_asin(url)
+    if not asin or max_pages <= 0:
+        return
+
+    sort = "recent" if known else None
+
+    def fetch_page(number: int):
+        # Yüklenemeyen sayfa None döner (boş sayfa [] ile karışmasın; bkz. PaginationGuard)
+        page_url = review_page_url(url, asin, number, sort)
+        for attempt in range(REVIEW_PAGE_RETRIES + 1):
+            try:
+                return parse_extracted(extract_from_html(fetcher.fetch(page_url)))
+            except Exception as e:
+                print(f"Yorum sayfası hatası ({page_url}, deneme {attempt + 1}): {e}")
+        return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque()
+        next_page = 1
+
+        def schedule():
+            nonlocal next_page
+            while len(pending) < concurrency and next_page <= max_pages:
+                pending.append(executor.submit(fetch_page, next_page))
+                next_page += 1
+
+        schedule()
+        guard = PaginationGuard()
+        try:
+            while pending:
+                reviews = pending.popleft().result()
+                new = 0
+                for review in reviews or ():
+                    key = review_key(review)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if is_known(review, known):
+                        continue
+                    new += 1
+                    yield review
+                    count += 1
+                    if max_reviews is not None and count >= max_reviews:
+                        return
+                # Boş sayfa ya da art arda yeni yorum vermeyen sayfalar (bkz. PaginationGuard)
+                if guard.should_stop(reviews, new):
+                    break
+                schedule()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_reviews_html(
+    source: str,
+    max_reviews: int | None = None,
+    meta: dict | None = None,
+    max_pages: int = MAX_REVIEW_PAGES,
+    concurrency: int = REVIEW_PAGE_CONCURRENCY,
+    fetcher=None,
+    known: dict | None = None,
+):
+    """
+    Tarayıcısız kazıma: scraper.iter_reviews ile aynı yorumları aynı biçimde üretir.
+    source: Amazon ürün linki (HTTP ile indirilir) ya da kaydedilmiş HTML dosyası/klasörü.
+    known: Önceki analizde görülen yorumlar (bkz. scraper.iter_reviews).
+    """
+    if meta is None:
+        meta = {}
+    meta.setdefault("total_reviews", 0)
+    meta.setdefault("average_stars", 0.0)
+
+    print(f">> Scraper (HTML) okunuyor: {source}")
+    if is_local_source(source):
+        reviews = _iter_snapshot_reviews(source, max_reviews, meta, known)
+    else:
+        reviews = _iter_http_reviews(
+            source, max_reviews, meta, max_pages, max(1, concurrency), fetcher or get_http_fetcher(), known
+        )
+
+    count = 0
+    for review in reviews:
+        count += 1
+        yield review
+
+    print(f">> Scraper tamamlandı. {count} yorum çekildi.")
@@ -0,0 +1,511 @@
+# inference_service.py
+# -*- coding: utf-8 -*-
+
+# Yerel çıkarım servisi: sentiment ve çeviri modellerini tek bir süreçte tutar ve
+# HTTP (TCP veya Unix soketi) üzerinden puanlama/çeviri hizmeti verir. Aynı anda
+# gelen isteklerin yorumları tek batch'te birleştirilir (micro-batching); böylece
+# modeller makine başına bir kez yüklenir ve eş zamanlı yükte iş hacmi artar.
+# Kullanım örnekleri:
+#   python inference_service.py --port 8765
+#   python inference_service.py --unix /tmp/yorum.sock
+#   YORUM_INFERENCE_URL=http://127.0.0.1:8765 python cli.py -i linkler.txt
+#   YORUM_INFERENCE_URL=unix:///tmp/yorum.sock python app.py
+
+import os
+import sys
+import json
+import time
+import queue
+import socket
+import argparse
+import threading
+import http.client
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Bir batch'e girecek en fazla yorum sayısı ve ilk istekten sonra diğer
+# isteklerin batch'e katılması için beklenecek en uzun süre
+MAX_BATCH = 64
+MAX_WAIT_MS = 10
+# Kuyrukta bekleyebilecek en fazla yorum sayısı; aşılırsa istek 503 ile reddedilir
+MAX_QUEUE = 2048
+# Bir isteğin batch'inin işlenmesini servis içinde en fazla bekleyeceği süre (saniye);
+# aşılırsa istek 504 ile döner. İstemcinin bağlantı zaman aşımından kısa olmalı.
+REQUEST_TIMEOUT = 120
+
+# İstemci tarafı: servis meşgulse (503) kaç kez, ne kadar bekleyerek tekrar denenecek
+CLIENT_TIMEOUT = 300
+CLIENT_RETRIES = 5
+CLIENT_BACKOFF = 0.2  # saniye (her denemede iki katına çıkar)
+
+
+class ServiceBusy(Exception):
+    """Kuyruk dolu; istemci biraz bekleyip tekrar denemeli."""
+
+
+# ---------------- MICRO-BATCHING ---------------- #
+
+class MicroBatcher:
+    """
+    Farklı istemcilerden gelen istekleri sırayla toplayıp tek çağrıda işler.
+    İlk istek geldikten sonra en fazla 'max_wait_ms' kadar diğerleri beklenir ya da
+    toplam öğe sayısı 'max_batch'e ulaşınca batch hemen çalıştırılır. Bir istek
+    bölünmez; tek başına 'max_batch'ten büyük bir istek kendi batch'inde işlenir.
+    Kuyruktaki öğe sayısı 'max_queue'yu aşacaksa istek ServiceBusy ile reddedilir;
+    'timeout' saniye içinde işlenemeyen istek TimeoutError ile düşer.
+    fn(items) -> sonuçlar: her öğe için bir sonuç (aynı sırayla) döndürmelidir;
+    sonuç sayısı tutmazsa batch hatalı sayılır.
+    """
+
+    def __init__(self, fn, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS,
+                 max_queue: int = MAX_QUEUE, name: str = "batcher", timeout: float = REQUEST_TIMEOUT):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self.name = name
+        self.timeout = timeout
+
+        self._queue = queue.Queue()
+        self._pending = 0  # Kuyrukta bekleyen toplam öğe sayısı
+        self._lock = threading.Lock()
+        self._carry = None  # Önceki batch'e sığmayıp sıradakine kalan istek
+        self.stats = {
+            "requests": 0, "batches": 0, "items": 0, "rejected": 0, "max_batch": 0, "failed_batches": 0, "timeouts": 0,
+        }
+
+        self._thread = threading.Thread(target=self._run, name=f"{name}-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, items: list) -> list:
+        """Öğeleri sıraya koyar ve batch'leri işlenince sonuçlarını döndürür (bloklar)."""
+        if not items:
+            return []
+        with self._lock:
+            if self._pending and self._pending + len(items) > self.max_queue:
+                self.stats["rejected"] += 1
+                raise ServiceBusy(f"{self.name} kuyruğu dolu ({self._pending} öğe bekliyor)")
+            self._pending += len(items)
+            self.stats["requests"] += 1
+
+        request = {"items": items, "done": threading.Event(), "result": None, "error": None, "abandoned": False}
+        self._queue.put(request)
+        if not request["done"].wait(self.timeout):
+            with self._lock:
+                # Henüz işlenmediyse batch'ten çıkarılır (bkz. _process); bu arada bittiyse sonuç kullanılır
+                if not request["done"].is_set():
+                    request["abandoned"] = True
+                    self.stats["timeouts"] += 1
+                    raise TimeoutError(f"{self.name}: istek {self.timeout} sn içinde işlenemedi")
+        if request["error"] is not None:
+            raise request["error"]
+        return request["result"]
+
+    def _collect(self) -> list:
+        """Bir sonraki batch'e girecek istekleri toplar."""
+        first = self._carry or self._queue.get()
+        self._carry = None
+        batch = [first]
+        size = len(first["items"])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(request["items"]) > self.max_batch:
+                self._carry = request  # Bir sonraki batch'in ilk isteği olsun
+                break
+            batch.append(request)
+            size += len(request["items"])
+        return batch
+
+    def _call(self, items: list) -> list:
+        """fn'i çalıştırır; her öğe için bir sonuç dönmezse hata verir."""
+        results = list(self.fn(items))
+        if len(results) != len(items):
+            raise RuntimeError(f"{self.name}: {len(items)} öğe için {len(results)} sonuç döndü")
+        return results
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._process(batch)
+            except Exception as e:
+                # Beklenmeyen bir hatada da batch'teki hiçbir istemci cevapsız beklemesin
+                for request in batch:
+                    if not request["done"].is_set():
+                        request["error"] = e
+                        request["done"].set()
+
+    def _process(self, batch: list):
+        with self._lock:
+            # Zaman aşımı yüzünden vazgeçilen istekler işlenmez
+            for request in batch:
+                if request["abandoned"]:
+                    self._pending -= len(request["items"])
+            batch = [request for request in batch if not request["abandoned"]]
+        if not batch:
+            return
+
+        items = [item for request in batch for item in request["items"]]
+        try:
+            results = self._call(items)
+            error = None
+        except Exception as e:
+            results, error = None, e
+
+        with self._lock:
+            self._pending -= len(items)
+            self.stats["batches"] += 1
+            self.stats["items"] += len(items)
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(items))
+
+        if error is not None and len(batch) > 1:
+            # Hatalı bir istek (örn. desteklenmeyen dil) aynı batch'e düşen diğer
+            # istemcileri de düşürmesin: her istek tek başına yeniden çalıştırılır,
+            # hata sadece ona sebep olan isteğe döner.
+            with self._lock:
+                self.stats["failed_batches"] += 1
+            for request in batch:
+                try:
+                    request["result"] = self._call(request["items"])
+                except Exception as e:
+                    request["error"] = e
+                request["done"].set()
+            return
+
+        offset = 0
+        for request in batch:
+            n = len(request["items"])
+            if error is not None:
+                request["error"] = error
+            else:
+                request["result"] = results[offset:offset + n]
+            offset += n
+            request["done"].set()
+
+    def info(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats, pending=self._pending)
+        stats["mean_batch"] = round(stats["items"] / stats["batches"], 1) if stats["batches"] else 0
+        return stats
+
+
+# ---------------- SERVİS ---------------- #
+
+class InferenceService:
+    """Modelleri yükler ve her model için bir MicroBatcher çalıştırır."""
+
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS,
+                 max_queue: int = MAX_QUEUE, translation: bool = True, request_timeout: float = REQUEST_TIMEOUT):
+        import analyzer
+        import translator_hf
+        from model_registry import get_model_registry
+
+        # Servis modelleri kendisi çalıştırır; uzak arka uca (yani kendine) bağlanmasın
+        analyzer.INFERENCE_URL = ""
+        self.analyzer = analyzer
+        self.backend = analyzer.SENT_BACKEND
+        # Bellek bütçesi / boşta boşaltma (bkz. model_registry): boşaltılan model ilk istekte yeniden yüklenir
+        self.registry = get_model_registry()
+
+        analyzer.load_sentiment_model()
+        if analyzer.sent_model is None:
+            raise RuntimeError("Sentiment modeli yüklenemedi")
+        self.sentiment = MicroBatcher(self._score, max_batch, max_wait_ms, max_queue, "sentiment", request_timeout)
+
+        # Çok dilli model sadece istemciler de o modda çalışıyorsa yüklenir
+        self.multilingual = None
+        if analyzer.SENTIMENT_MODE == "multilingual":
+            analyzer.load_multilingual_model()
+            if analyzer.multi_model is None:
+                raise RuntimeError("Çok dilli sentiment modeli yüklenemedi")
+            self.multilingual = MicroBatcher(
+                self._score_multilingual, max_batch, max_wait_ms, max_queue, "multilingual", request_timeout
+            )
+
+        self.translation = None
+        if translation:
+            self._tokenizer, self._model = None, None
+            self._load_model = translator_hf.load_model
+            self._translate_batch = translator_hf.translate_batch
+            self.registry.register(
+                "service-translator", self._load_translator, self._unload_translator, size=self._translator_size_mb
+            )
+            self.registry.ensure("service-translator")
+            self.translation = MicroBatcher(self._translate, max_batch, max_wait_ms, max_queue, "translation", request_timeout)
+
+    def _load_translator(self):
+        if self._model is None:
+            self._tokenizer, self._model = self._load_model(self.analyzer.TRANSLATION_BACKEND)
+
+    def _unload_translator(self):
+        self._tokenizer, self._model = None, None
+
+    def _translator_size_mb(self) -> float:
+        from backends import model_size_mb
+
+        return model_size_mb(self._model)
+
+    def _score(self, texts: list) -> list:
+        with self.registry.use("sentiment"):
+            return self.analyzer.score_with_model(self.analyzer.sent_tokenizer, self.analyzer.sent_model, texts)
+
+    def _score_multilingual(self, texts: list) -> list:
+        # Kalibrasyon istemci tarafında yapılır (önbellekte ham puan durur)
+        with self.registry.use("multilingual"):
+            return self.analyzer.score_with_model(self.analyzer.multi_tokenizer, self.analyzer.multi_model, texts)
+
+    def _translate(self, items: list) -> list:
+        # Farklı isteklerden gelen farklı diller translate_batch içinde gruplanır
+        texts = [text for text, _ in items]
+        langs = [lang for _, lang in items]
+        with self.registry.use("service-translator"):
+            return self._translate_batch(self._tokenizer, self._model, texts, langs)
+
+    def health(self) -> dict:
+        return {
+            "ok": True,
+            "backend": self.backend,
+            "sentiment": self.sentiment.info(),
+            "multilingual": self.multilingual.info() if self.multilingual else None,
+            "translation": self.translation.info() if self.translation else None,
+            "models": self.registry.stats(),
+            # İstemciler önbellek anahtarında aynı model sürümünü kullansın (bkz. analyzer.model_revision)
+            "revisions": self._revisions(),
+        }
+
+    def _revisions(self) -> dict:
+        import translator_hf
+
+        a = self.analyzer
+        models = [(a.SENT_MODEL_NAME, a.SENT_MODEL_REVISION, "sentiment")]
+        if self.multilingual is not None:
+            models.append((a.MULTI_SENT_MODEL_NAME, a.MULTI_SENT_MODEL_REVISION, "multilingual"))
+        if self.translation is not None:
+            models.append((translator_hf.MODEL_NAME, translator_hf.MODEL_REVISION, "service-translator"))
+        return {name: a.model_revision(name, revision, registry_name) for name, revision, registry_name in models}
+
+
+def make_handler(service: InferenceService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Bağlantılar açık tutulur (keep-alive)
+
+        def _send(handler, status: int, payload: dict, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json; charset=utf-8")
+            handler.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                handler.send_header(key, value)
+            handler.end_headers()
+            handler.wfile.write(body)
+
+        def do_GET(handler):
+            if handler.path == "/health":
+                handler._send(200, service.health())
+            else:
+                handler._send(404, {"ok": False, "error": "Bulunamadı"})
+
+        def do_POST(handler):
+            try:
+                length = int(handler.headers.get("Content-Length", "0"))
+                request = json.loads(handler.rfile.read(length).decode("utf-8") or "{}")
+                texts = list(request.get("texts", []))
+            except Exception as e:
+                handler._send(400, {"ok": False, "error": f"Geçersiz istek: {e}"})
+                return
+
+            try:
+                if handler.path == "/score" and request.get("model", "turkish") == "turkish":
+                    handler._send(200, {"ok": True, "scores": service.sentiment.submit(texts)})
+                elif handler.path == "/score" and request.get("model") == "multilingual" and service.multilingual:
+                    handler._send(200, {"ok": True, "scores": service.multilingual.submit(texts)})
+                elif handler.path == "/translate" and service.translation is not None:
+                    langs = list(request.get("src_langs", []))
+                    if len(langs) != len(texts):
+                        handler._send(400, {"ok": False, "error": "texts ve src_langs aynı uzunlukta olmalı"})
+                        return
+                    translations = service.translation.submit(list(zip(texts, langs)))
+                    handler._send(200, {"ok": True, "translations": translations})
+                else:
+                    handler._send(404, {"ok": False, "error": "Bulunamadı"})
+            except ServiceBusy as e:
+                handler._send(503, {"ok": False, "error": str(e)}, {"Retry-After": "1"})
+            except TimeoutError as e:
+                handler._send(504, {"ok": False, "error": str(e)})
+            except Exception as e:
+                handler._send(500, {"ok": False, "error": str(e)})
+
+        def log_message(handler, *args):
+            pass  # Her istek için konsola yazma
+
+    return Handler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        # BaseHTTPRequestHandler istemci adresini (host, port) olarak bekler
+        conn, _ = super().get_request()
+        return conn, ("unix", 0)
+
+
+def serve(args):
+    print(">> inference_service: modeller yükleniyor...")
+    service = InferenceService(
+        args.max_batch, args.max_wait_ms, args.max_queue, translation=not args.no_translation,
+        request_timeout=args.request_timeout,
+    )
+    handler = make_handler(service)
+
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.unlink(args.unix)
+        server = ThreadingUnixHTTPServer(args.unix, handler)
+        where = f"unix://{args.unix}"
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+        server.daemon_threads = True
+        where = f"http://{args.host}:{args.port}"
+
+    print(f">> inference_service: hazır, {where} adresinde dinleniyor.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+        print(">> inference_service: kapatıldı.")
+
+
+# ---------------- İSTEMCİ ---------------- #
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Unix soketi üzerinden HTTP bağlantısı."""
+
+    def __init__(self, path: str, timeout: float = CLIENT_TIMEOUT):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class InferenceClient:
+    """
+    analyzer'ın uzak arka ucu. url: 'http://host:port' ya da 'unix:///yol/soket'.
+    Her thread kendi açık bağlantısını kullanır. Servis meşgulse (503) artan
+    aralıklarla tekrar denenir; 'timeout' saniyede cevap gelmezse tekrar denenmeden hata verilir.
+    """
+
+    def __init__(self, url: str, timeout: float = CLIENT_TIMEOUT, retries: int = CLIENT_RETRIES):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            parts = urlsplit(self.url)
+            if parts.scheme == "unix":
+                conn = UnixHTTPConnection(unquote(parts.path), self.timeout)
+            else:
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or DEFAULT_PORT, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _reset(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def _call(self, method: str, path: str, payload: dict | None = None) -> dict:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        delay = CLIENT_BACKOFF
+        for attempt in range(self.retries + 1):
+            try:
+                conn = self._connection()
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+            except TimeoutError:
+                # Cevap süresi sınırlı: aynı istek yeniden gönderilip bekleme uzatılmaz
+                self._reset()
+                raise
+            except (OSError, http.client.HTTPException):
+                # Bağlantı koptuysa bir kez yeni bağlantıyla dene
+                self._reset()
+                if attempt >= 1:
+                    raise
+                continue
+
+            try:
+                data = json.loads(raw.decode("utf-8"))
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                # Servis değil araya giren bir vekil (proxy) ya da çöken sunucu cevap vermiş olabilir
+                data = {"ok": False, "error": raw[:200].decode("utf-8", errors="replace").strip() or "boş cevap"}
+
+            if response.status == 503 and attempt < self.retries:
+                time.sleep(delay)
+                delay *= 2
+                continue
+            if response.status != 200 or not data.get("ok"):
+                raise RuntimeError(f"Çıkarım servisi hatası ({response.status}): {data.get('error')}")
+            return data
+        raise RuntimeError("Çıkarım servisi meşgul")
+
+    def health(self) -> dict:
+        return self._call("GET", "/health")
+
+    def score(self, texts, model: str = "turkish") -> list:
+        """model: "turkish" ya da "multilingual" (servis YORUM_SENTIMENT_MODE=multilingual ile başlatılmalı)."""
+        return self._call("POST", "/score", {"texts": list(texts), "model": model})["scores"]
+
+    def translate(self, texts, src_langs) -> list:
+        return self._call("POST", "/translate", {"texts": list(texts), "src_langs": list(src_langs)})["translations"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Sentiment ve çeviri modellerini paylaşan yerel çıkarım servisi.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="TCP yerine bu Unix soketinden dinle")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="Bir batch'teki en fazla yorum sayısı")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="Batch dolması için en uzun bekleme (ms)")
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE, help="Kuyrukta bekleyebilecek en fazla yorum")
+    parser.add_argument(
+        "--request-timeout", type=float, default=REQUEST_TIMEOUT, help="Bir isteğin işlenmesi için en uzun bekleme (sn)"
+    )
+    parser.add_argument("--no-translation", action="store_true", help="Çeviri modelini yükleme (sadece puanlama)")
+    return parser
+
+
+def main(argv=None):
+    serve(build_parser().parse_args(argv))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# lang_detect.py
+# -*- coding: utf-8 -*-
+
+import re
+import sys
+import threading
+
+from model_registry import get_model_registry
+
+# Sadece Türkçede bulunan harfler: bunlardan biri varsa metin neredeyse kesin Türkçedir.
+# (ç, ö, ü Almanca/Fransızcada da geçtiği için tek başına yeterli değil.)
+TURKISH_ONLY_CHARS = set("ğĞşŞıİ")
+
+# Latin dışı yazı sistemleri: harflerin çoğu bu aralıktaysa dil doğrudan belli olur
+SCRIPT_RANGES = (
+    (0x0400, 0x04FF, "ru"),  # Kiril
+    (0x0370, 0x03FF, "el"),  # Yunan
+    (0x0590, 0x05FF, "he"),  # İbrani
+    (0x0600, 0x06FF, "ar"),  # Arap
+    (0x3040, 0x30FF, "ja"),  # Hiragana / Katakana
+    (0xAC00, 0xD7AF, "ko"),  # Hangul
+    (0x4E00, 0x9FFF, "zh"),  # CJK (Kanji/Hanzi)
+)
+
+# Hızlı karar için sık geçen kelimeler. Karşılaştırmadan önce ç, ö, ü sadeleştirildiği
+# için Türkçe liste Türkçe karakter kullanmadan yazılmıştır ("cok", "guzel").
+ENGLISH_WORDS = {
+    "the", "and", "is", "it", "this", "was", "for", "with", "not", "but", "very",
+    "good", "great", "product", "quality", "would", "recommend", "works", "bought",
+    "after", "they", "have", "that", "are", "you", "my", "of", "to", "in",
+}
+TURKISH_WORDS = {
+    "ve", "bir", "bu", "cok", "ama", "icin", "ile", "gibi", "daha", "degil", "urun",
+    "guzel", "iyi", "kotu", "aldim", "geldi", "tavsiye", "ederim", "kargo", "hizli",
+    "fiyat", "kaliteli", "gayet", "bence", "oldu", "var", "yok", "da", "de", "mi",
+}
+
+# Bu güvenin altındaki sonuçlar "emin değilim" sayılır ve çeviriye gönderilmez
+MIN_CONFIDENCE = 0.70
+
+_WORD_RE = re.compile(r"[a-z]+")
+_FOLD = str.maketrans("çöüâîû", "couaiu")
+_ngram_lock = threading.Lock()
+_ngram_ready = False
+
+
+def detect_heuristic(text: str):
+    """
+    Ucuz karakter/kelime kuralları. Karar verebilirse (dil, güven) döndürür,
+    metin belirsizse None döner (o zaman n-gram algılayıcıya gidilir).
+    """
+    if any(ch in TURKISH_ONLY_CHARS for ch in text):
+        return "tr", 0.99
+
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return None
+
+    # Latin dışı bir yazı sistemi baskınsa
+    counts = {}
+    for ch in letters:
+        code = ord(ch)
+        for start, end, lang in SCRIPT_RANGES:
+            if start <= code <= end:
+                counts[lang] = counts.get(lang, 0) + 1
+                break
+    if counts:
+        lang, n = max(counts.items(), key=lambda item: item[1])
+        if n / len(letters) > 0.5:
+            # Japonca metinde Kanji de geçer; kana varsa Japonca say
+            if lang == "zh" and counts.get("ja"):
+                lang = "ja"
+            return lang, 0.95
+
+    # Latin harfli metinde sık kelimelere bak (ç, ö, ü sadeleştirilerek)
+    words = _WORD_RE.findall(text.lower().translate(_FOLD))
+    en_hits = sum(1 for w in words if w in ENGLISH_WORDS)
+    tr_hits = sum(1 for w in words if w in TURKISH_WORDS)
+    if en_hits >= 2 and en_hits >= 3 * tr_hits:
+        return "en", min(0.95, 0.6 + 0.1 * en_hits)
+    if tr_hits >= 2 and tr_hits >= 3 * en_hits:
+        return "tr", min(0.95, 0.6 + 0.1 * tr_hits)
+
+    return None
+
+
+def _load_ngram():
+    """langdetect'in dil profillerini belleğe yükler (bkz. model_registry)."""
+    global _ngram_ready
+    from langdetect import DetectorFactory
+    from langdetect import detector_factory
+
+    with _ngram_lock:
+        if not _ngram_ready:
+            DetectorFactory.seed = 0
+            _ngram_ready = True
+        detector_factory.init_factory()
+
+
+# langdetect profilleri özel (private) 'detector_factory._factory' değişkeninde tutar ve
+# boşaltmak için genel bir API sunmaz. Bu değişkene sadece aşağıdaki iki yardımcıdan dokunulur;
+# langdetect sürümü requirements.txt'te sabitlenmiştir (1.0.9). Sürüm değişip değişken
+# kalkarsa boşaltma uyarıyla atlanır, algılama çalışmaya devam eder.
+def _ngram_factory(detector_factory):
+    """Yüklü langdetect fabrikası; yüklü değilse ya da iç yapı beklenenden farklıysa None."""
+    return getattr(detector_factory, "_factory", None)
+
+
+def _reset_ngram_factory(detector_factory) -> bool:
+    """Fabrikayı bırakır; init_factory bir sonraki algılamada profilleri yeniden yükler."""
+    if not hasattr(detector_factory, "_factory"):
+        print(">> lang_detect: langdetect iç yapısı beklenenden farklı, dil profilleri boşaltılamadı.")
+        return False
+    detector_factory._factory = None
+    return True
+
+
+def _unload_ngram():
+    """Dil profillerini bellekten atar; bir sonraki algılamada yeniden yüklenir."""
+    from langdetect import detector_factory
+
+    with _ngram_lock:
+        _reset_ngram_factory(detector_factory)
+
+
+def _ngram_size_mb() -> float:
+    """Yüklü dil profillerinin yaklaşık boyutu: n-gram tablosunun anahtarları ve olasılık listeleri."""
+    from langdetect import detector_factory
+
+    table = getattr(_ngram_factory(detector_factory), "word_lang_prob_map", None) or {}
+    total = sys.getsizeof(table)
+    for word, probs in table.items():
+        total += sys.getsizeof(word) + sys.getsizeof(probs) + len(probs) * sys.getsizeof(0.0)
+    return total / (1024 * 1024)
+
+
+get_model_registry().register("langid", _load_ngram, _unload_ngram, size=_ngram_size_mb)
+
+
+def detect_ngram(text: str):
+    """
+    langdetect ile tam n-gram algılama. Sabit tohum (seed) kullanıldığı için
+    aynı metin her seferinde aynı sonucu verir. Hata olursa güveni 0 olan 'tr' döner.
+    """
+    from langdetect import detect_langs
+
+    with get_model_registry().use("langid"):
+        try:
+            best = detect_langs(text)[0]
+            # langdetect "zh-cn" gibi kodlar da döndürür, çevirmen sadece ana dil kodunu tanır
+            return best.lang.split("-")[0], float(best.prob)
+        except Exception:
+            return "tr", 0.0
+
+
+def detect(text: str):
+    """Tek bir metnin dilini (dil, güven) olarak döndürür."""
+    return detect_heuristic(text) or detect_ngram(text)
+
+
+def detect_batch(texts) -> list:
+    """
+    Birden fazla metnin dilini algılar. Önce hepsine ucuz kurallar uygulanır,
+    sadece belirsiz kalanlar n-gram algılayıcıya gönderilir.
+    """
+    results = [detect_heuristic(t) for t in texts]
+    for i, result in enumerate(results):
+        if result is None:
+            results[i] = detect_ngram(texts[i])
+    return results
+
+
+def should_translate(lang: str, confidence: float, min_confidence: float = MIN_CONFIDENCE) -> bool:
+    """Türkçe değilse ve algılamaya yeterince güveniliyorsa çevir."""
+    return lang != "tr" and confidence >= min_confidence
@@ -0,0 +1,249 @@
+# metrics.py
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# YORUM_PROFILE=1   : analiz cProfile ile profillenir, en pahalı fonksiyonlar stderr'e yazılır
+# YORUM_PROFILE=dir : profil dosyaları (.prof) bu klasöre kaydedilir (snakeviz vb. ile açılabilir)
+PROFILE = os.environ.get("YORUM_PROFILE", "")
+PROFILE_TOP = 30
+# YORUM_TRACE=1 ise her aşama bittiğinde süresi stderr'e yazılır
+TRACE = os.environ.get("YORUM_TRACE", "0") == "1"
+
+# O an ölçüm yapılan rapor. Thread'ler arasında kendiliğinden taşınmaz;
+# yeni thread'lerde use_report ile aynı rapor yeniden etkinleştirilmelidir.
+_current = contextvars.ContextVar("perf_report", default=None)
+
+
+def peak_rss_mb() -> float:
+    """Bu sürecin şimdiye kadarki en yüksek bellek kullanımı (MB). Ölçülemezse 0."""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux'ta kB, macOS'ta bayt cinsinden
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    except Exception:
+        return 0.0
+
+
+def current_rss_mb(pid: int | None = None) -> float:
+    """Verilen sürecin (varsayılan: bu süreç) şu anki bellek kullanımı (MB). Ölçülemezse 0."""
+    pid = pid or os.getpid()
+    try:
+        import psutil
+
+        return round(psutil.Process(pid).memory_info().rss / (1024 * 1024), 1)
+    except ImportError:
+        pass
+    except Exception:
+        return 0.0
+    # psutil yoksa Linux'ta /proc üzerinden (başka sistemlerde 0 döner)
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)  # kB
+    except OSError:
+        pass
+    return 0.0
+
+
+class PerfReport:
+    """
+    Bir analizin performans özeti: aşama süreleri, sayaçlar, model başına
+    batch/token istatistikleri ve süreç başına en yüksek bellek kullanımı.
+    Birden fazla thread aynı rapora yazabilir.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}    # ad -> {"calls", "seconds"}
+        self.counters = {}  # ad -> sayı
+        self.models = {}    # ad -> {"batches", "items", "tokens", "input_tokens", "seconds", "max_batch"}
+        self.peak_rss = {}  # süreç adı -> MB
+        self._lock = threading.Lock()
+
+    def add_time(self, name: str, seconds: float, calls: int = 1):
+        with self._lock:
+            stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+            stage["calls"] += calls
+            stage["seconds"] += seconds
+        if TRACE:
+            print(f">> metrics: {name} {seconds * 1000:.1f} ms", file=sys.stderr)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_model(self, name: str, items: int, tokens: int, seconds: float, input_tokens: int = 0):
+        """Bir modelin tek bir batch'ini kaydeder (tokens: işlenen/üretilen token sayısı)."""
+        self.merge_model(name, {
+            "batches": 1, "items": items, "tokens": tokens,
+            "input_tokens": input_tokens, "seconds": seconds, "max_batch": items,
+        })
+
+    def merge_model(self, name: str, stats: dict):
+        """Başka bir süreçte toplanan model istatistiklerini ekler ('max_' ile başlayanlar en büyüğü alır)."""
+        with self._lock:
+            model = self.models.setdefault(name, {})
+            for key, value in stats.items():
+                if key.startswith("max_"):
+                    model[key] = max(model.get(key, 0), value)
+                elif isinstance(value, (int, float)):
+                    model[key] = model.get(key, 0) + value
+
+    def merge(self, other: dict, process: str):
+        """Başka bir sürecin (örn. çeviri işçisi) as_dict() çıktısını bu rapora ekler."""
+        for name, stage in other.get("stages", {}).items():
+            self.add_time(f"{process}.{name}", stage["seconds"], stage["calls"])
+        for name, n in other.get("counters", {}).items():
+            self.count(f"{process}.{name}", n)
+        for name, stats in other.get("models", {}).items():
+            self.merge_model(name, {k: v for k, v in stats.items() if k in _MODEL_KEYS})
+        with self._lock:
+            for rss in other.get("peak_rss_mb", {}).values():
+                self.peak_rss[process] = max(self.peak_rss.get(process, 0.0), rss)
+
+    def as_dict(self) -> dict:
+        """JSON'a yazılabilir rapor; token/saniye ve ortalama batch boyu burada hesaplanır."""
+        with self._lock:
+            models = {}
+            for name, m in self.models.items():
+                seconds = m.get("seconds", 0.0)
+                models[name] = dict(
+                    m,
+                    seconds=round(seconds, 4),
+                    mean_batch=round(m.get("items", 0) / m["batches"], 1) if m.get("batches") else 0,
+                    tokens_per_s=round(m.get("tokens", 0) / seconds, 1) if seconds else 0.0,
+                    items_per_s=round(m.get("items", 0) / seconds, 1) if seconds else 0.0,
+                )
+            peak = dict(self.peak_rss, main=max(self.peak_rss.get("main", 0.0), peak_rss_mb()))
+            return {
+                "wall_s": round(time.perf_counter() - self.started, 4),
+                "stages": {k: {"calls": v["calls"], "seconds": round(v["seconds"], 4)} for k, v in self.stages.items()},
+                "counters": dict(self.counters),
+                "models": models,
+                "peak_rss_mb": peak,
+            }
+
+
+_MODEL_KEYS = ("batches", "items", "tokens", "input_tokens", "seconds", "max_batch")
+
+
+# ---------------- ETKİN RAPORA YAZAN YARDIMCILAR ---------------- #
+# Etkin rapor yoksa hiçbir şey yapmazlar; böylece ölçüm kodu her yerde güvenle çağrılabilir.
+
+def current_report():
+    """O an etkin olan rapor (yoksa None)."""
+    return _current.get()
+
+
+@contextmanager
+def use_report(report: PerfReport):
+    """Bu blok (ve bu thread) boyunca ölçümler 'report'a yazılır."""
+    token = _current.set(report)
+    try:
+        yield report
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Bloğun süresini etkin raporda 'name' aşamasına ekler."""
+    report = _current.get()
+    if report is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        report.add_time(name, time.perf_counter() - started)
+
+
+def add_time(name: str, seconds: float):
+    report = _current.get()
+    if report is not None:
+        report.add_time(name, seconds)
+
+
+def count(name: str, n: int = 1):
+    report = _current.get()
+    if report is not None and n:
+        report.count(name, n)
+
+
+def record_model(name: str, items: int, tokens: int, seconds: float, input_tokens: int = 0):
+    report = _current.get()
+    if report is not None:
+        report.record_model(name, items, tokens, seconds, input_tokens)
+
+
+def merge_model(name: str, stats: dict):
+    report = _current.get()
+    if report is not None and stats:
+        report.merge_model(name, stats)
+
+
+def merge(other: dict, process: str):
+    report = _current.get()
+    if report is not None and other:
+        report.merge(other, process)
+
+
+def summary_line(perf: dict) -> str:
+    """Raporun konsola yazılacak tek satırlık özeti."""
+    stages = ", ".join(f"{k} {v['seconds']:.2f}s" for k, v in perf.get("stages", {}).items())
+    models = ", ".join(f"{k} {v['tokens_per_s']:.0f} tok/s" for k, v in perf.get("models", {}).items())
+    rss = ", ".join(f"{k} {v:.0f} MB" for k, v in perf.get("peak_rss_mb", {}).items())
+    return f"toplam {perf.get('wall_s', 0):.2f}s | {stages} | {models} | bellek: {rss}"
+
+
+# ---------------- PROFİLLEME ---------------- #
+
+@contextmanager
+def profiled(name: str):
+    """
+    YORUM_PROFILE ayarlıysa bloğu cProfile ile profiller (sadece bu thread'i).
+    Ayarlı değilse hiçbir maliyeti yoktur.
+    """
+    if not PROFILE:
+        yield
+        return
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Başka bir profilleyici zaten etkin (iç içe çağrı)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        if PROFILE == "1":
+            print(f">> metrics: '{name}' profili", file=sys.stderr)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        else:
+            os.makedirs(PROFILE, exist_ok=True)
+            path = os.path.join(PROFILE, f"{name}-{os.getpid()}-{int(time.time() * 1000)}.prof")
+            profiler.dump_stats(path)
+            print(f">> metrics: profil kaydedildi: {path}", file=sys.stderr)
@@ -0,0 +1,289 @@
+# model_registry.py
+# -*- coding: utf-8 -*-
+
+import gc
+import os
+import sys
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import metrics
+from metrics import current_rss_mb
+
+# Yüklü modellerin toplam bellek bütçesi (MB). Aşılırsa en uzun süredir kullanılmayan
+# (LRU) modeller boşaltılır. 0 ise sınır yok.
+MODEL_MEMORY_BUDGET_MB = float(os.environ.get("YORUM_MODEL_BUDGET_MB", "0"))
+# Bu kadar saniye kullanılmayan model bellekten boşaltılır (bir sonraki kullanımda yeniden yüklenir).
+# 0 ise modeller süreç boyunca yüklü kalır.
+MODEL_IDLE_TIMEOUT = float(os.environ.get("YORUM_MODEL_IDLE_TIMEOUT", "0"))
+# İzleme için saklanan en fazla yükleme/boşaltma olayı
+MAX_EVENTS = 200
+
+
+def release_memory():
+    """Boşaltılan modellerin belleğini işletim sistemine geri vermeye çalışır."""
+    gc.collect()
+    if sys.platform.startswith("linux"):
+        # glibc serbest kalan büyük blokları kendiliğinden geri vermeyebilir
+        try:
+            import ctypes
+
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except Exception:
+            pass
+
+
+class _Entry:
+    def __init__(self, name: str, load, unload, size=None):
+        self.name = name
+        self.load = load        # Modeli yükler (zaten yüklüyse hiçbir şey yapmamalı)
+        self.unload = unload    # Modeli boşaltır
+        self.size = size        # Yüklü modelin bellek kullanımını (MB) ölçer; None ise RSS farkı (kaba tahmin)
+        self.lock = threading.RLock()
+        self.loaded = False
+        self.users = 0          # Modeli o an kullanan çağrı sayısı; kullanımdaki model boşaltılmaz
+        self.size_mb = 0.0      # Son yüklemede ölçülen bellek (boşaltılınca tahmin olarak kalır)
+        self.last_used = 0.0
+        self.loads = 0
+        self.unloads = 0
+
+
+class ModelRegistry:
+    """
+    Süreçteki modellerin (duygu analizi, çeviri işçisi, dil algılama) hangisinin
+    bellekte olduğunu takip eder. Modeller ilk kullanımda yüklenir; toplam bellek
+    bütçeyi aşarsa en uzun süredir kullanılmayanlar, boşta kalma süresi dolanlar
+    da arka plan thread'inde boşaltılır. Boşaltılan model bir sonraki use()
+    çağrısında kendiliğinden yeniden yüklenir.
+    Yükleme/boşaltma olayları ve bellek kullanımı stats() ile izlenebilir.
+    """
+
+    def __init__(self, budget_mb: float = MODEL_MEMORY_BUDGET_MB, idle_timeout: float = MODEL_IDLE_TIMEOUT):
+        self.budget_mb = budget_mb
+        self.idle_timeout = idle_timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=MAX_EVENTS)
+        self._listeners = []
+        self._reaper = None
+        self._stop = threading.Event()
+
+    def register(self, name: str, load, unload, size=None):
+        """
+        Bir modeli kaydeder. load/unload argümansız çağrılır; size() yüklü modelin MB cinsinden
+        boyutu (ağırlık baytları ya da modeli tutan sürecin belleği). size verilmezse yükleme
+        öncesi ve sonrası RSS farkı kullanılır; eş zamanlı yüklemelerde ve bellek işletim
+        sistemine geri verilmediğinde yanılır, bu yüzden sadece son çare olmalıdır.
+        """
+        with self._lock:
+            self._entries[name] = _Entry(name, load, unload, size)
+
+    def add_listener(self, callback):
+        """Her yükleme/boşaltma olayında callback(olay sözlüğü) çağrılır."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    # ---------- Kullanım ----------
+
+    def ensure(self, name: str):
+        """Model yüklü değilse yükler (gerekirse önce başka modelleri boşaltarak)."""
+        entry = self._entries[name]
+        with entry.lock:
+            if not entry.loaded:
+                self._load(entry)
+            entry.last_used = time.monotonic()
+
+    @contextmanager
+    def use(self, name: str):
+        """Blok süresince model yüklü tutulur ve boşaltılmaz; blok bitince son kullanım zamanı güncellenir."""
+        entry = self._entries[name]
+        with entry.lock:
+            if not entry.loaded:
+                self._load(entry)
+            entry.users += 1
+            entry.last_used = time.monotonic()
+        try:
+            yield
+        finally:
+            with entry.lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    def unload(self, name: str, reason: str = "manual") -> bool:
+        """Modeli boşaltır; kullanımdaysa ya da yüklü değilse False döner."""
+        entry = self._entries[name]
+        with entry.lock:
+            return self._unload(entry, reason)
+
+    def mark_unloaded(self, name: str, reason: str) -> bool:
+        """
+        Model kaydın dışında boşaldıysa (örn. çeviri işçisi iptal için sonlandırıldı)
+        kaydı günceller; unload çağrılmaz. Kayıt o an başka bir thread'de kilitliyse
+        beklenmez (yükleme/boşaltma zaten sürüyordur); kayıt güncellendiyse True döner.
+        """
+        entry = self._entries.get(name)
+        if entry is None or not entry.lock.acquire(blocking=False):
+            return False
+        try:
+            if not entry.loaded:
+                return False
+            entry.loaded = False
+            self._unloaded(entry, reason)
+            return True
+        finally:
+            entry.lock.release()
+
+    def unload_all(self, reason: str = "shutdown"):
+        for entry in list(self._entries.values()):
+            with entry.lock:
+                self._unload(entry, reason)
+
+    # ---------- Yükleme / boşaltma ----------
+
+    def _load(self, entry: _Entry):
+        # Önceki yüklemeden bilinen boyut kadar yer aç
+        self._make_room(entry, entry.size_mb)
+        before = current_rss_mb()
+        started = time.perf_counter()
+        entry.load()
+        seconds = time.perf_counter() - started
+        # Analiz sırasında (yeniden) yükleme olursa süresi performans raporunda görünsün
+        metrics.add_time(f"model_load:{entry.name}", seconds)
+        metrics.count("model_loads")
+        if entry.size is not None:
+            entry.size_mb = float(entry.size() or 0.0)
+        else:
+            entry.size_mb = max(0.0, current_rss_mb() - before)
+        entry.loaded = True
+        entry.loads += 1
+        entry.last_used = time.monotonic()
+        self._emit("load", entry, seconds=round(seconds, 2))
+        # Gerçek boyut tahminden büyükse bütçeye tekrar bak
+        self._make_room(entry, 0.0)
+        self._start_reaper()
+
+    def _unload(self, entry: _Entry, reason: str) -> bool:
+        if not entry.loaded or entry.users > 0:
+            return False
+        # Önce işaretlenir; unload içinden gelen mark_unloaded çağrısı boşaltmayı tekrar saymasın
+        entry.loaded = False
+        try:
+            entry.unload()
+        except Exception as e:
+            print(f">> model_registry: {entry.name} boşaltılamadı: {e}")
+        release_memory()
+        self._unloaded(entry, reason)
+        return True
+
+    def _unloaded(self, entry: _Entry, reason: str):
+        entry.unloads += 1
+        metrics.count("model_unloads")
+        self._emit("unload", entry, reason=reason)
+
+    def _make_room(self, keep: _Entry, needed_mb: float):
+        """Bütçe aşılıyorsa 'keep' dışındaki, kullanılmayan modelleri LRU sırasıyla boşaltır."""
+        if self.budget_mb <= 0:
+            return
+        others = sorted(
+            (e for e in self._entries.values() if e is not keep and e.loaded),
+            key=lambda e: e.last_used,
+        )
+        for other in others:
+            if self.resident_mb() + needed_mb <= self.budget_mb:
+                break
+            # Başka bir thread'in kullandığı/yüklediği modeli beklemeden atla
+            if not other.lock.acquire(blocking=False):
+                continue
+            try:
+                self._unload(other, "budget")
+            finally:
+                other.lock.release()
+        if self.resident_mb() + needed_mb > self.budget_mb:
+            print(f">> model_registry: bellek bütçesi ({self.budget_mb:.0f} MB) aşılıyor, boşaltılabilecek model yok.")
+
+    def _reap_idle(self):
+        now = time.monotonic()
+        for entry in list(self._entries.values()):
+            if not entry.loaded or now - entry.last_used < self.idle_timeout:
+                continue
+            if not entry.lock.acquire(blocking=False):
+                continue
+            try:
+                if entry.loaded and time.monotonic() - entry.last_used >= self.idle_timeout:
+                    self._unload(entry, "idle")
+            finally:
+                entry.lock.release()
+
+    def _start_reaper(self):
+        if self.idle_timeout <= 0:
+            return
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reaper_loop, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reaper_loop(self):
+        interval = min(30.0, max(1.0, self.idle_timeout / 2))
+        while not self._stop.wait(interval):
+            self._reap_idle()
+
+    def close(self):
+        self._stop.set()
+
+    # ---------- İzleme ----------
+
+    def resident_mb(self) -> float:
+        """Yüklü modellerin toplam (ölçülen) bellek kullanımı."""
+        return round(sum(e.size_mb for e in self._entries.values() if e.loaded), 1)
+
+    def _emit(self, kind: str, entry: _Entry, **extra):
+        event = dict(
+            time=time.time(), event=kind, model=entry.name, size_mb=round(entry.size_mb, 1),
+            resident_mb=self.resident_mb(), rss_mb=current_rss_mb(), **extra,
+        )
+        self._events.append(event)
+        detail = f"{extra['reason']}, " if "reason" in extra else ""
+        print(
+            f">> model_registry: {entry.name} {'yüklendi' if kind == 'load' else 'boşaltıldı'} "
+            f"({detail}{event['size_mb']:.0f} MB, modeller toplam {event['resident_mb']:.0f} MB)"
+        )
+        with self._lock:
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f">> model_registry: dinleyici hatası: {e}")
+
+    def stats(self) -> dict:
+        """Modellerin durumu, bellek kullanımı ve son olaylar (JSON'a yazılabilir)."""
+        now = time.monotonic()
+        return {
+            "budget_mb": self.budget_mb,
+            "idle_timeout_s": self.idle_timeout,
+            "resident_mb": self.resident_mb(),
+            "rss_mb": current_rss_mb(),
+            "models": {
+                e.name: {
+                    "loaded": e.loaded,
+                    "in_use": e.users,
+                    "size_mb": round(e.size_mb, 1),
+                    "idle_s": round(now - e.last_used, 1) if e.last_used else None,
+                    "loads": e.loads,
+                    "unloads": e.unloads,
+                }
+                for e in self._entries.values()
+            },
+            "events": list(self._events),
+        }
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Süreç boyunca paylaşılan model kaydı."""
+    return _registry
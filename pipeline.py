@@ -0,0 +1,327 @@
+# pipeline.py
+# -*- coding: utf-8 -*-
+
+import queue
+import threading
+
+import dedup
+import metrics
+import cancellation
+from scraper import iter_reviews, review_hash, review_key
+from analyzer import (
+    analyze_comments,
+    compute_final_score,
+    is_analyzable,
+    prepare_for_scoring,
+    score_prepared,
+)
+from snapshot_store import get_snapshot_store, product_key
+
+# Aşamalar arasındaki kuyrukların kapasitesi. Kuyruk dolarsa önceki aşama
+# bekler; böylece hızlı kazıyıcı yavaş çeviriyi bellekte ezmez (backpressure).
+QUEUE_SIZE = 64
+
+# Bir aşamanın tek seferde kuyruktan alacağı en fazla yorum sayısı.
+# Kuyrukta o an ne varsa alınır; yorum akışı yavaşsa küçük, hızlıysa büyük batch'ler oluşur.
+MICRO_BATCH = 16
+
+# Aşamanın bittiğini sonraki aşamaya bildiren işaret
+_DONE = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event):
+    """Kuyruk doluysa bekler; başka bir aşama hata verip durduysa vazgeçer."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _next_batch(q: queue.Queue, limit: int, stop: threading.Event):
+    """
+    İlk eleman gelene kadar bekler, sonra kuyrukta hazır bekleyenleri de
+    (en fazla 'limit' tane) alır. (batch, bitti_mi) döndürür.
+    """
+    batch = []
+    while not batch:
+        if stop.is_set():
+            return batch, True
+        try:
+            item = q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+
+    while len(batch) < limit:
+        try:
+            item = q.get_nowait()
+        except queue.Empty:
+            break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+def analyze_stream(
+    url: str,
+    on_review=None,
+    on_progress=None,
+    max_reviews: int | None = None,
+    batch_size: int = MICRO_BATCH,
+    cancel=None,
+    deduplicate: bool = True,
+    weight_by_cluster: bool = True,
+):
+    """
+    Kazıma → çeviri → puanlama aşamalarını eş zamanlı çalıştırır.
+    Kazıyıcı yorumları buldukça çeviri kuyruğuna, çeviri aşaması da çevirdiklerini
+    puanlama kuyruğuna koyar; puanlama çağıran thread'de yapılır. Çok dilli modda
+    (analyzer.SENTIMENT_MODE) çeviri aşaması sadece dili algılar.
+
+    on_review(detail, running_score): Her yorum puanlandığında çağrılır.
+    on_progress(done, total): Puanlanan yorum sayısı ve şu ana kadar kuyruğa
+        giren (analiz edilecek) yorum sayısı. Kazıma sürerken 'total' büyüyebilir.
+
+    Dönüş değeri analyze_comments ile aynı biçimdedir; ek olarak sitedeki
+    toplam yorum sayısı, yıldız puanı ve kazınan yorum sayısını içerir.
+    Aşama süreleri thread başına toplanır; aşamalar eş zamanlı çalıştığı için
+    toplamları duvar saati süresini (wall_s) aşabilir.
+
+    cancel: İptal belirteci (bkz. cancellation.CancelToken; verilmezse etkin olan kullanılır).
+        İptal edilirse ya da süre sınırı dolarsa kazıma ve çeviri durdurulur; sonuç o ana
+        kadar puanlanan yorumlarla hesaplanır, 'partial' True ve 'sample_size' puanlanan
+        yorum sayısı olur.
+    deduplicate, weight_by_cluster: analyze_comments'teki gibi. Kopyalar kazıma aşamasında
+        dedup.DedupIndex ile bulunur; sadece temsilciler çevrilip puanlanır, kopyalar
+        temsilcinin çevirisini ve puanını alır.
+    """
+    meta = {"total_reviews": 0, "average_stars": 0.0}
+    counters = {"scraped": 0, "queued": 0}
+    to_translate = queue.Queue(maxsize=QUEUE_SIZE)
+    to_score = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    errors = []
+    report = metrics.PerfReport()
+    token = cancel or cancellation.current_token()
+    index = dedup.DedupIndex() if deduplicate else None
+
+    def scrape_stage():
+        try:
+            with metrics.use_report(report), cancellation.use_token(token):
+                for review in iter_reviews(url, max_reviews=max_reviews, meta=meta):
+                    counters["scraped"] += 1
+                    if not is_analyzable(review["text"]):
+                        metrics.count("skipped_short")
+                        continue  # Çok kısa yorumlar analiz edilmez
+                    # number: yorumun sırası, cluster: kümesinin temsilcisinin sırası
+                    number = counters["queued"]
+                    counters["queued"] += 1
+                    if index is not None:
+                        with metrics.stage("dedup"):
+                            cluster = index.add(review["text"])
+                    else:
+                        cluster = number
+                    if cluster != number:
+                        metrics.count("duplicates")
+                    if not _put(to_translate, dict(review, number=number, cluster=cluster), stop):
+                        break
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(to_translate, _DONE, stop)
+
+    def translate_stage():
+        try:
+            with metrics.use_report(report), cancellation.use_token(token):
+                while True:
+                    batch, done = _next_batch(to_translate, batch_size, stop)
+                    if batch:
+                        # Kopyalar çevrilmez; çevirilerini puanlama aşamasında temsilciden alırlar
+                        representatives = [r for r in batch if r["cluster"] == r["number"]]
+                        with metrics.stage("translate"):
+                            translated, langs, multilingual = prepare_for_scoring(
+                                [r["text"] for r in representatives]
+                            )
+                        prepared = {
+                            review["number"]: {"translated": bg_text, "lang": lang, "multilingual": multi}
+                            for review, bg_text, lang, multi in zip(representatives, translated, langs, multilingual)
+                        }
+                        for review in batch:
+                            if not _put(to_score, dict(review, **prepared.get(review["number"], {})), stop):
+                                return
+                    if done:
+                        break
+        except cancellation.Cancelled:
+            pass
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(to_score, _DONE, stop)
+
+    threads = [
+        threading.Thread(target=scrape_stage, name="scrape-stage", daemon=True),
+        threading.Thread(target=translate_stage, name="translate-stage", daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    processed = []
+    score_sum = 0
+    count = 0
+    # Temsilcilerin sonuçları (sıra -> (çeviri, dil, puan)); kuyruklar sırayı koruduğu
+    # için bir kopya geldiğinde temsilcisi çoktan (ya da aynı batch'te) puanlanmıştır
+    scored = {}
+    try:
+        with metrics.use_report(report), cancellation.use_token(token), cancellation.on_cancel(stop.set), \
+                metrics.profiled("analyze_stream"):
+            while True:
+                batch, done = _next_batch(to_score, batch_size, stop)
+                if batch:
+                    representatives = [r for r in batch if r["cluster"] == r["number"]]
+                    with metrics.stage("sentiment"):
+                        scores = score_prepared(
+                            [r["translated"] for r in representatives], [r["multilingual"] for r in representatives]
+                        )
+                    for review, score in zip(representatives, scores):
+                        scored[review["number"]] = (review["translated"], review["lang"], score)
+                    for review in batch:
+                        bg_text, lang, score = scored[review["cluster"]]
+                        detail = {
+                            "original": review["text"],
+                            "translated": bg_text,
+                            "lang": lang,
+                            "score": score,
+                        }
+                        processed.append(detail)
+                        if weight_by_cluster or review["cluster"] == review["number"]:
+                            score_sum += score
+                            count += 1
+                        running = int(compute_final_score(score_sum, count, meta["average_stars"]))
+                        if on_review is not None:
+                            on_review(detail, running)
+                    if on_progress is not None:
+                        on_progress(len(processed), counters["queued"])
+                if done:
+                    break
+    except cancellation.Cancelled:
+        # Puanlanmakta olan batch bırakılır, kuyruklarda bekleyenler de işlenmez
+        stop.set()
+    except Exception:
+        stop.set()
+        raise
+    finally:
+        for t in threads:
+            t.join()
+
+    if errors:
+        raise errors[0]
+
+    final_score = compute_final_score(score_sum, count, meta["average_stars"]) if count else 50
+    perf = report.as_dict()
+    print(f">> pipeline: performans {metrics.summary_line(perf)}")
+
+    result = {
+        "final_score": int(final_score),
+        "details": processed,
+        "total_reviews": meta["total_reviews"],
+        "average_stars": meta["average_stars"],
+        "scraped": counters["scraped"],
+        "perf": perf,
+        "partial": token is not None and token.cancelled,
+    }
+    if result["partial"]:
+        print(f">> pipeline: analiz durduruldu ({token.reason}), {len(processed)} yorum puanlandı.")
+        result["sample_size"] = len(processed)
+        result["stopped"] = token.reason
+    return result
+
+
+def analyze_incremental(
+    url: str,
+    max_reviews: int | None = None,
+    backend: str = "browser",
+    store=None,
+    cancel=None,
+):
+    """
+    Ürünü önceki analizinin üzerine güncelleyerek analiz eder.
+    Ürünün anlık görüntüsü (bkz. snapshot_store) varsa sadece o zamandan beri
+    eklenen veya düzenlenen yorumlar kazınıp puanlanır; nihai puan saklanan
+    puan toplamı ve sayısına yeni puanlar eklenerek hesaplanır. Anlık görüntü
+    yoksa (ya da depo kapalıysa) ürün baştan analiz edilir ve sonuç saklanır.
+    Silinen yorumlar fark edilmez; puanları toplamlarda kalmaya devam eder.
+
+    Dönüş değeri analyze_stream ile aynı biçimdedir ('details' sadece bu
+    çalıştırmada puanlanan yorumları içerir); ek olarak 'new_reviews' ve
+    'known_reviews' sayılarını içerir.
+    İptal edilirse (bkz. analyze_stream) kısmi sonuç döner ve anlık görüntü
+    güncellenmez; bir sonraki çalıştırma aynı yorumları yeniden ele alır.
+    """
+    with cancellation.use_token(cancel or cancellation.current_token()) as token:
+        return _analyze_incremental(url, max_reviews, backend, store, token)
+
+
+def _analyze_incremental(url: str, max_reviews, backend: str, store, token) -> dict:
+    if store is None:
+        store = get_snapshot_store()
+    product = product_key(url)
+    snapshot = store.load(product) if store is not None else None
+    stored = snapshot["reviews"] if snapshot else {}
+
+    meta = {"total_reviews": 0, "average_stars": 0.0}
+    known = {key: r["hash"] for key, r in stored.items()}
+    reviews = list(iter_reviews(url, max_reviews=max_reviews, meta=meta, backend=backend, known=known or None))
+
+    # Düzenlenen yorumların eski puanları toplamlardan çıkarılır, yenileri eklenecek
+    prior = {"score_sum": 0, "count": 0}
+    if snapshot:
+        prior = {"score_sum": snapshot["score_sum"], "count": snapshot["count"]}
+        for review in reviews:
+            old = stored.get(review_key(review))
+            if old is not None and old["score"] is not None:
+                prior["score_sum"] -= old["score"]
+                prior["count"] -= 1
+
+    # Sayfadan okunamazsa önceki yıldız ortalaması ve yorum sayısı kullanılır
+    average_stars = meta["average_stars"] or (snapshot["average_stars"] if snapshot else 0.0)
+    total_reviews = meta["total_reviews"] or (snapshot["total_reviews"] if snapshot else 0)
+
+    metrics.count("reviews_known", len(stored))
+    result = analyze_comments(
+        [r["text"] for r in reviews],
+        total_reviews=total_reviews,
+        average_stars=average_stars,
+        prior=prior,
+    )
+
+    # Kazıma da yarıda kalmış olabilir; kısmi sonuç saklanmaz
+    partial = result["partial"] or (token is not None and token.cancelled)
+    if partial:
+        result = dict(result, partial=True, sample_size=len(result["details"]), stopped=token.reason)
+    elif store is not None:
+        # Kısa yorumlar da puansız olarak saklanır; böylece tekrar yeni sayılmazlar
+        updates = {review_key(r): (review_hash(r), None) for r in reviews}
+        kept = [r for r in reviews if is_analyzable(r["text"])]
+        for review, detail in zip(kept, result["details"]):
+            updates[review_key(review)] = (review_hash(review), detail["score"])
+        store.save(
+            product, url, updates, result["score_sum"], result["count"], average_stars, total_reviews
+        )
+
+    print(f">> pipeline: {len(reviews)} yeni/düzenlenmiş yorum, {len(stored)} yorum önceki analizden.")
+    return dict(
+        result,
+        total_reviews=total_reviews,
+        average_stars=average_stars,
+        scraped=len(reviews),
+        new_reviews=len(reviews),
+        known_reviews=len(stored),
+    )
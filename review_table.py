@@ -0,0 +1,201 @@
+# review_table.py
+# -*- coding: utf-8 -*-
+
+import heapq
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QColor
+
+# Tabloda metin sütunlarında gösterilen en fazla karakter (tamamı ipucunda görünür)
+PREVIEW_CHARS = 160
+# Sonuç sayfasında öne çıkarılan en iyi / en kötü yorum sayısı
+HIGHLIGHT_COUNT = 3
+
+# (alan adı, başlık)
+COLUMNS = (
+    ("score", "Puan"),
+    ("lang", "Dil"),
+    ("original", "Orijinal"),
+    ("translated", "Çeviri"),
+)
+SCORE_COLUMN = 0
+LANG_COLUMN = 1
+
+# Puan filtresi seçenekleri: (etiket, en düşük, en yüksek)
+SCORE_RANGES = (
+    ("Tüm puanlar", 0, 100),
+    ("Olumlu (60+)", 60, 100),
+    ("Nötr (40-59)", 40, 59),
+    ("Olumsuz (0-39)", 0, 39),
+)
+
+
+def score_color(score: int) -> str:
+    """Puana göre renk (Yeşil, Sarı, Kırmızı); sonuç sayfasındaki büyük puanla aynı eşikler."""
+    if score >= 75:
+        return "#a6e3a1"
+    if score >= 50:
+        return "#f9e2af"
+    return "#f38ba8"
+
+
+def _preview(text: str) -> str:
+    # Satır sonları tek satırlık hücrede yer kaplamasın
+    text = " ".join(text.split())
+    return text if len(text) <= PREVIEW_CHARS else text[:PREVIEW_CHARS - 1] + "…"
+
+
+class ReviewTableModel(QAbstractTableModel):
+    """
+    Puanlanan yorumların tablosu. Yorumlar geldikçe sona eklenir (append_rows);
+    QTableView sadece ekranda görünen satırlar için data() çağırdığından
+    on binlerce yorumda da akıcı kalır.
+    En yüksek ve en düşük puanlı HIGHLIGHT_COUNT yorum ekleme sırasında
+    küçük yığınlarda (heap) tutulur; tüm listeyi sıralamak gerekmez.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._previews = {}  # (satır, sütun) -> kısaltılmış metin, sadece çizilen hücreler için
+        self._top = []       # (puan, -satır): en yüksek puanlılar, en küçüğü başta
+        self._bottom = []    # (-puan, -satır): en düşük puanlılar, en büyüğü başta
+        self.languages = set()
+
+    # ---------- QAbstractTableModel ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][1]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        review = self._rows[index.row()]
+        field = COLUMNS[index.column()][0]
+        value = review.get(field)
+
+        if role == Qt.DisplayRole:
+            if field == "score":
+                return value
+            if field == "lang":
+                return value or "?"
+            key = (index.row(), index.column())
+            if key not in self._previews:
+                self._previews[key] = _preview(value or "")
+            return self._previews[key]
+        if role == Qt.UserRole:
+            # Sıralama ve filtreleme için ham değer
+            return value if value is not None else ""
+        if role == Qt.ToolTipRole and field in ("original", "translated"):
+            return value
+        if role == Qt.ForegroundRole and field == "score":
+            return QColor(score_color(value))
+        if role == Qt.TextAlignmentRole and field in ("score", "lang"):
+            return Qt.AlignCenter
+        return None
+
+    # ---------- VERİ ----------
+    def clear(self):
+        self.beginResetModel()
+        self._rows = []
+        self._previews = {}
+        self._top = []
+        self._bottom = []
+        self.languages = set()
+        self.endResetModel()
+
+    def set_rows(self, reviews):
+        """Tabloyu verilen yorumlarla baştan doldurur."""
+        self.clear()
+        self.append_rows(reviews)
+
+    def append_rows(self, reviews):
+        """Yorumları tablonun sonuna ekler (tek seferde, tek bir ekleme bildirimiyle)."""
+        reviews = list(reviews)
+        if not reviews:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(reviews) - 1)
+        self._rows.extend(reviews)
+        for row, review in enumerate(reviews, start=first):
+            self._track(row, review)
+        self.endInsertRows()
+
+    def _track(self, row: int, review: dict):
+        score = review["score"]
+        if review.get("lang"):
+            self.languages.add(review["lang"])
+        # Eşit puanlarda önce gelen yorum tercih edilir
+        if len(self._top) < HIGHLIGHT_COUNT:
+            heapq.heappush(self._top, (score, -row))
+        else:
+            heapq.heappushpop(self._top, (score, -row))
+        if len(self._bottom) < HIGHLIGHT_COUNT:
+            heapq.heappush(self._bottom, (-score, -row))
+        else:
+            heapq.heappushpop(self._bottom, (-score, -row))
+
+    def refresh(self):
+        """Yorumların metinleri yerinde değiştiyse (örn. sonradan çevrildiyse) tabloyu yeniden çizer."""
+        if not self._rows:
+            return
+        self._previews = {}
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, len(COLUMNS) - 1))
+
+    def review(self, row: int) -> dict:
+        return self._rows[row]
+
+    def best(self) -> list:
+        """En yüksek puanlı yorumlar (yüksekten düşüğe)."""
+        return [self._rows[-neg_row] for _, neg_row in sorted(self._top, reverse=True)]
+
+    def worst(self) -> list:
+        """En düşük puanlı yorumlar (düşükten yükseğe)."""
+        return [self._rows[-neg_row] for _, neg_row in sorted(self._bottom, reverse=True)]
+
+
+class ReviewFilterProxy(QSortFilterProxyModel):
+    """
+    Tabloyu sütunlara göre sıralar (ham değerlerle, Qt.UserRole) ve
+    metin, dil ve puan aralığına göre filtreler.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(Qt.UserRole)
+        self._text = ""
+        self._lang = None
+        self._min_score = 0
+        self._max_score = 100
+
+    def set_text(self, text: str):
+        self._text = text.strip().casefold()
+        self.invalidateFilter()
+
+    def set_language(self, lang: str | None):
+        self._lang = lang or None
+        self.invalidateFilter()
+
+    def set_score_range(self, low: int, high: int):
+        self._min_score, self._max_score = low, high
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        review = self.sourceModel().review(source_row)
+        if not self._min_score <= review["score"] <= self._max_score:
+            return False
+        if self._lang is not None and review.get("lang") != self._lang:
+            return False
+        if self._text:
+            return (
+                self._text in review["original"].casefold()
+                or self._text in review["translated"].casefold()
+            )
+        return True
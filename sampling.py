@@ -0,0 +1,105 @@
+# sampling.py
+# -*- coding: utf-8 -*-
+
+import math
+import random
+
+# %95 güven aralığı için normal dağılım katsayısı
+Z_95 = 1.96
+
+
+class RunningStats:
+    """Ortalama ve varyansı tek geçişte, değerleri saklamadan günceller (Welford)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Örneklem varyansı (n - 1 ile); iki değerden azsa 0."""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+
+def stratum_of(rating) -> str:
+    """Yorumun katmanı: yıldız puanı (1-5) ya da bilinmiyorsa '?'."""
+    if not rating:
+        return "?"
+    return str(min(5, max(1, int(round(float(rating))))))
+
+
+class StratifiedSampler:
+    """
+    Yorumları katmanlara (örn. yıldız puanına) ayırıp her katmanı karıştırır ve
+    katman büyüklüğüyle orantılı rastgele partiler halinde örnekler.
+    Eklenen puanlardan katmanlı ortalama ve standart hatası hesaplanır
+    (sonlu popülasyon düzeltmesiyle; tüm yorumlar puanlanınca hata sıfırdır).
+    """
+
+    def __init__(self, strata, seed: int = 0):
+        rng = random.Random(seed)
+        self.total = len(strata)
+        self._queues = {}
+        for index, key in enumerate(strata):
+            self._queues.setdefault(key, []).append(index)
+        self.sizes = {key: len(indices) for key, indices in self._queues.items()}
+        for indices in self._queues.values():
+            rng.shuffle(indices)
+            indices.reverse()  # pop() sondan aldığı için
+        self._strata = dict(enumerate(strata))
+        self.stats = {key: RunningStats() for key in self._queues}
+        self._all = RunningStats()
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    @property
+    def sampled(self) -> int:
+        return self._all.n
+
+    def draw(self, n: int) -> list:
+        """Katmanlardan orantılı olarak en fazla n yorum indeksi çeker."""
+        picked = []
+        for key, queue in self._queues.items():
+            share = n * self.sizes[key] // self.total
+            for _ in range(min(share, len(queue))):
+                picked.append(queue.pop())
+        # Yuvarlama yüzünden eksik kaldıysa en kalabalık katmanlardan birer birer tamamla
+        while len(picked) < n and self.remaining:
+            for queue in sorted(self._queues.values(), key=len, reverse=True):
+                if len(picked) >= n:
+                    break
+                if queue:
+                    picked.append(queue.pop())
+        return picked
+
+    def add(self, index: int, value: float):
+        self.stats[self._strata[index]].add(value)
+        self._all.add(value)
+
+    def estimate(self):
+        """(katmanlı ortalama, standart hata). Hiç örnek yoksa (0, inf)."""
+        if self._all.n == 0:
+            return 0.0, math.inf
+
+        # Henüz örneklenmemiş katmanların ağırlığı örneklenenlere dağıtılır
+        sampled = {key: s for key, s in self.stats.items() if s.n > 0}
+        covered = sum(self.sizes[key] for key in sampled)
+        mean = sum(self.sizes[key] / covered * s.mean for key, s in sampled.items())
+
+        variance = 0.0
+        for key, s in sampled.items():
+            weight = self.sizes[key] / covered
+            # Tek örnekli katmanda varyans bilinmez, tüm örneklerin varyansı kullanılır
+            var_h = s.variance if s.n > 1 else self._all.variance
+            fpc = 1 - s.n / self.sizes[key]
+            variance += weight * weight * var_h / s.n * fpc
+        return mean, math.sqrt(variance)
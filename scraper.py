@@ -1,106 +1,454 @@
-# scraper.py
-# -*- coding: utf-8 -*-
-
-from playwright.sync_api import sync_playwright
-import time
-import re
-
-
-def parse_number(text: str) -> int:
-    """
-    Siteden gelen '2.5k değerlendirme' veya '1,200 yorum' gibi karmaşık metinleri
-    temizleyip saf sayıya (integer) çevirir.
-    """
-    if not text:
-        return 0
-
-    t = text.lower().strip()
-
-    # "k" harfi varsa (Örn: 2.5k -> 2500)
-    if "k" in t:
-        try:
-            t = t.replace(",", ".")
-            num = float(re.findall(r"[\d\.]+", t)[0])
-            return int(num * 1000)
-        except Exception:
-            return 0
-
-    # Normal sayıları yakala (Nokta ve virgülleri temizle)
-    digits = re.findall(r"\d+", t.replace(".", "").replace(",", ""))
-    if digits:
-        try:
-            return int(digits[-1])
-        except Exception:
-            return 0
-
-    return 0
-
-
-def get_reviews(url: str, max_reviews: int | None = None):
-    """
-    Ana kazıma fonksiyonu.
-    url: Gidilecek web sitesi adresi.
-    max_reviews: En fazla kaç yorum çekileceği (None ise sınır yok).
-    """
-    print(f">> Scraper bağlanıyor: {url}")
-
-    data = {"comments": [], "total_reviews": 0, "average_stars": 0.0}
-
-    # Playwright tarayıcı motorunu başlat
-    with sync_playwright() as p:
-        # Headless=True: Tarayıcı penceresi açılmadan arka planda çalışır
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-
-        try:
-            # Sayfaya git ve yüklenmesini bekle (Timeout: 60 saniye)
-            page.goto(url, timeout=60000)
-            page.wait_for_load_state("domcontentloaded")
-            time.sleep(2) # Ekstra güvenlik beklemesi
-        except Exception as e:
-            print(f"Bağlantı hatası: {e}")
-            browser.close()
-            return data
-
-        # ---------------- AMAZON İÇİN KAZIMA MANTIĞI ----------------
-        if "amazon" in url:
-            try:
-                # 1. Ortalama Yıldız Puanını Çek (Örn: "4,8 üzerinden 5 yıldız")
-                star_el = page.query_selector("span.a-icon-alt")
-                if star_el:
-                    raw = star_el.inner_text().strip()
-                    # Metni parçala ve sadece puanı al (4.8)
-                    first = raw.split(" ")[0].replace(",", ".")
-                    try:
-                        data["average_stars"] = float(first)
-                    except Exception:
-                        pass
-
-                # 2. Toplam Yorum Sayısını Çek
-                count_el = page.query_selector("#acrCustomerReviewText")
-                if count_el:
-                    data["total_reviews"] = parse_number(count_el.inner_text())
-
-                # 3. Yorum Metinlerini Çek
-                # Amazon'da yorumlar genellikle 'review-body' data-hook'u içinde olur.
-                reviews = page.query_selector_all("span[data-hook='review-body']")
-                for r in reviews:
-                    t = r.inner_text().strip()
-                    # Çok kısa ve anlamsız yorumları ele (en az 5 karakter)
-                    if len(t) > 5:
-                        data["comments"].append(t)
-                        # Eğer limit varsa ve ulaşıldıysa döngüyü kır
-                        if max_reviews is not None and len(data["comments"]) >= max_reviews:
-                            break
-
-            except Exception as e:
-                print(f"Amazon scraper hatası: {e}")
-        
-        else:
-            # Sadece Amazon destekleniyor, Hepsiburada kaldırıldı.
-            print("HATA: Desteklenmeyen site veya Hepsiburada kaldırıldı.")
-
-        browser.close()
-
-    print(f">> Scraper tamamlandı. {len(data['comments'])} yorum çekildi.")
-    return data
\ No newline at end of file
+# scraper.py
+# -*- coding: utf-8 -*-
+
+from browser_pool import get_browser_pool
+from collections import deque
+from urllib.parse import urlsplit
+import asyncio
+import hashlib
+import os
+import re
+import time
+
+import metrics
+import cancellation
+from cache import normalize_text
+
+# Yorum listesi sayfalarından en fazla kaç tanesinin gezileceği ve
+# aynı anda kaç sayfanın yükleneceği
+MAX_REVIEW_PAGES = 50
+REVIEW_PAGE_CONCURRENCY = 4
+# Yorum listesi gezilirken: hiç yeni yorum vermeyen (tekrar eden ya da önceki analizde
+# görülen) bu kadar ardışık sayfada durulur; boş sayfada hemen durulur.
+MAX_STALE_PAGES = 2
+# Yüklenemeyen bir liste sayfası bu kadar kez yeniden denenir, yine olmazsa atlanır;
+# bu kadar ardışık sayfa yüklenemezse (örn. engellendik) gezinme bırakılır.
+REVIEW_PAGE_RETRIES = 1
+MAX_FAILED_PAGES = 3
+
+# Yalın yükleme modunda indirilmeyecek kaynak türleri (kazıma için gereksiz)
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+# Bu alan adlarına ait olmayan istekler üçüncü taraf sayılır (reklam, izleme vb.)
+FIRST_PARTY_HOSTS = ("amazon.", "media-amazon.com", "ssl-images-amazon.com", "images-amazon.com")
+# Gerekli seçiciler için en fazla bekleme süresi (ms)
+SELECTOR_TIMEOUT = 15000
+
+# Sayfadaki tüm bilgileri tek bir tarayıcı çağrısıyla (page.evaluate) toplayan betik.
+# Her elemente ayrı ayrı inner_text() göndermek yerine tek gidiş-dönüşte her şey alınır.
+EXTRACT_JS = """
+() => {
+    const text = el => el ? (el.innerText || el.textContent || "").trim() : "";
+    const reviews = [];
+    for (const body of document.querySelectorAll("span[data-hook='review-body']")) {
+        const block = body.closest("[data-hook='review']");
+        const rating = block && block.querySelector(
+            "[data-hook='review-star-rating'] span.a-icon-alt, " +
+            "[data-hook='cmps-review-star-rating'] span.a-icon-alt"
+        );
+        reviews.push({id: block ? block.id : "", text: text(body), rating: text(rating)});
+    }
+    return {
+        stars: text(document.querySelector("span.a-icon-alt")),
+        count: text(document.querySelector("#acrCustomerReviewText")),
+        reviews: reviews,
+    };
+}
+"""
+
+
+def parse_number(text: str) -> int:
+    """
+    Siteden gelen '2.5k değerlendirme' veya '1,200 yorum' gibi karmaşık metinleri
+    temizleyip saf sayıya (integer) çevirir.
+    """
+    if not text:
+        return 0
+
+    t = text.lower().strip()
+
+    # "k" harfi varsa (Örn: 2.5k -> 2500)
+    if "k" in t:
+        try:
+            t = t.replace(",", ".")
+            num = float(re.findall(r"[\d\.]+", t)[0])
+            return int(num * 1000)
+        except Exception:
+            return 0
+
+    # Normal sayıları yakala (Nokta ve virgülleri temizle)
+    digits = re.findall(r"\d+", t.replace(".", "").replace(",", ""))
+    if digits:
+        try:
+            return int(digits[-1])
+        except Exception:
+            return 0
+
+    return 0
+
+
+def parse_stars(text: str) -> float:
+    """'4,8 üzerinden 5 yıldız' gibi bir metinden yıldız puanını (4.8) çıkarır."""
+    if not text:
+        return 0.0
+    # Metni parçala ve sadece puanı al (4.8)
+    first = text.strip().split(" ")[0].replace(",", ".")
+    try:
+        return float(first)
+    except Exception:
+        return 0.0
+
+
+def extract_asin(url: str) -> str | None:
+    """Amazon ürün linkinden 10 karakterlik ürün kimliğini (ASIN) bulur."""
+    m = re.search(r"/(?:dp|gp/product|product-reviews)/([A-Z0-9]{10})", url)
+    return m.group(1) if m else None
+
+
+def review_page_url(url: str, asin: str, page_number: int, sort: str | None = None) -> str:
+    """
+    Ürünün sayfalı yorum listesinin 'page_number'ıncı sayfasının adresi.
+    sort="recent" ise liste en yeni yorumdan eskiye sıralanır.
+    """
+    parts = urlsplit(url)
+    return (
+        f"{parts.scheme or 'https'}://{parts.netloc}/product-reviews/{asin}/"
+        f"?reviewerType=all_reviews&pageNumber={page_number}"
+        + (f"&sortBy={sort}" if sort else "")
+    )
+
+
+def review_key(review: dict) -> str:
+    """Tekrarları ayıklamak için yorum kimliği; kimlik yoksa metnin özeti kullanılır."""
+    return review.get("id") or hashlib.sha1(review["text"].encode("utf-8")).hexdigest()
+
+
+def review_hash(review: dict) -> str:
+    """Yorum metninin özeti; aynı kimlikli yorum düzenlendiyse değişir."""
+    return hashlib.sha1(normalize_text(review["text"]).encode("utf-8")).hexdigest()
+
+
+def is_known(review: dict, known: dict | None) -> bool:
+    """Yorum daha önce aynı metinle görüldüyse True (known: yorum anahtarı -> metin özeti)."""
+    return bool(known) and known.get(review_key(review)) == review_hash(review)
+
+
+class PaginationGuard:
+    """
+    Sayfalı yorum listesinde ne zaman durulacağına karar verir (scraper ve html_scraper ortak).
+    Yüklenemeyen sayfa (None) boş sayfayla karıştırılmaz: atlanır ve sadece
+    MAX_FAILED_PAGES ardışık hatada durulur. Boş sayfa listenin sonudur; yeni yorum
+    vermeyen sayfalarda ise MAX_STALE_PAGES ardışık sayfadan sonra durulur.
+    """
+
+    def __init__(self, max_stale: int = MAX_STALE_PAGES, max_failed: int = MAX_FAILED_PAGES):
+        self.max_stale = max(1, max_stale)
+        self.max_failed = max(1, max_failed)
+        self.stale = 0
+        self.failed = 0
+
+    def should_stop(self, reviews, new: int) -> bool:
+        """reviews: sayfadaki yorumlar (yüklenemediyse None), new: üretilen yeni yorum sayısı."""
+        if reviews is None:
+            self.failed += 1
+            return self.failed >= self.max_failed
+        self.failed = 0
+        if not reviews:
+            return True
+        if new:
+            self.stale = 0
+            return False
+        self.stale += 1
+        return self.stale >= self.max_stale
+
+
+def parse_extracted(raw: dict) -> list:
+    """EXTRACT_JS (veya html_scraper) çıktısındaki yorumları temizleyip {"id", "text", "rating"} listesine çevirir."""
+    reviews = []
+    for r in raw.get("reviews", []):
+        t = (r.get("text") or "").strip()
+        # Çok kısa ve anlamsız yorumları ele (en az 5 karakter)
+        if len(t) > 5:
+            reviews.append({"id": r.get("id") or None, "text": t, "rating": parse_stars(r.get("rating")) or None})
+    return reviews
+
+
+async def _block_heavy_resources(route):
+    """Yalın mod: resim, video, font ve üçüncü taraf isteklerini iptal eder."""
+    request = route.request
+    host = urlsplit(request.url).netloc
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or not any(h in host for h in FIRST_PARTY_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _open_page(context, url: str, wait_selector: str, lean: bool):
+    """
+    Yeni bir sekmede sayfayı açar. Yalın modda ağır kaynaklar engellenir ve sabit
+    bir süre uyumak yerine gereken seçici görünene kadar (en fazla SELECTOR_TIMEOUT) beklenir.
+    Seçici hiç gelmezse de sayfa döndürülür; çıkarılacak bir şey yoksa sonuç boş olur.
+    """
+    page = await context.new_page()
+    try:
+        if lean:
+            await page.route("**/*", _block_heavy_resources)
+
+        # Sayfaya git ve yüklenmesini bekle (Timeout: 60 saniye)
+        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        if lean:
+            try:
+                await page.wait_for_selector(wait_selector, timeout=SELECTOR_TIMEOUT)
+            except Exception:
+                pass
+        else:
+            await asyncio.sleep(2) # Ekstra güvenlik beklemesi
+    except Exception:
+        await page.close()
+        raise
+    return page
+
+
+async def _fetch_review_page(context, page_url: str, lean: bool, retries: int = REVIEW_PAGE_RETRIES):
+    """
+    Yorum listesinin tek bir sayfasını açar ve oradaki yorumları döndürür.
+    Sayfa 'retries' denemeden sonra da yüklenemezse None döner (boş sayfa [] ile karışmasın).
+    """
+    for attempt in range(retries + 1):
+        try:
+            page = await _open_page(context, page_url, "span[data-hook='review-body']", lean)
+        except Exception as e:
+            print(f"Yorum sayfası hatası ({page_url}, deneme {attempt + 1}): {e}")
+            continue
+
+        try:
+            return parse_extracted(await page.evaluate(EXTRACT_JS))
+        except Exception as e:
+            print(f"Yorum sayfası hatası ({page_url}, deneme {attempt + 1}): {e}")
+        finally:
+            await page.close()
+    return None
+
+
+async def _iter_reviews_async(
+    pool, url: str, max_reviews, meta: dict, max_pages: int, concurrency: int, lean: bool, known=None
+):
+    """
+    Önce ürün sayfasını okur (yıldız, yorum sayısı ve oradaki yorumlar),
+    ardından ürünün sayfalı yorum listesini gezer. Liste sayfaları 'concurrency'
+    kadar aynı anda yüklenir ama yorumlar sayfa sırasıyla üretilir.
+    Tekrarlanan yorumlar kimliklerine göre ayıklanır.
+    known verilirse daha önce aynı metinle görülen yorumlar atlanır ve liste en
+    yeniden eskiye gezilir. Ne zaman durulacağı PaginationGuard ile belirlenir.
+    """
+    # Havuzdaki sıcak Chromium'dan izole bir bağlam ödünç al
+    async with pool.context() as context:
+        # ---------------- AMAZON İÇİN KAZIMA MANTIĞI ----------------
+        if "amazon" not in url:
+            # Sadece Amazon destekleniyor, Hepsiburada kaldırıldı.
+            print("HATA: Desteklenmeyen site veya Hepsiburada kaldırıldı.")
+            return
+
+        try:
+            page = await _open_page(
+                context, url, "#acrCustomerReviewText, span[data-hook='review-body']", lean
+            )
+        except Exception as e:
+            print(f"Bağlantı hatası: {e}")
+            return
+
+        first_page = []
+        try:
+            # Yıldız puanı, toplam yorum sayısı ve ürün sayfasındaki yorumlar tek seferde
+            raw = await page.evaluate(EXTRACT_JS)
+            # 1. Ortalama Yıldız Puanı (Örn: "4,8 üzerinden 5 yıldız")
+            meta["average_stars"] = parse_stars(raw.get("stars")) or meta["average_stars"]
+            # 2. Toplam Yorum Sayısı
+            meta["total_reviews"] = parse_number(raw.get("count")) or meta["total_reviews"]
+            # 3. Ürün sayfasındaki yorumlar
+            first_page = parse_extracted(raw)
+        except Exception as e:
+            print(f"Amazon scraper hatası: {e}")
+        finally:
+            await page.close()
+
+        seen = set()
+        count = 0
+        for review in first_page:
+            key = review_key(review)
+            if key in seen:
+                continue
+            seen.add(key)
+            if is_known(review, known):
+                continue
+            yield review
+            count += 1
+            # Eğer limit varsa ve ulaşıldıysa dur
+            if max_reviews is not None and count >= max_reviews:
+                return
+
+        # 4. Sayfalı yorum listesini gez
+        asin = extract_asin(url)
+        if not asin or max_pages <= 0:
+            return
+
+        pending = deque()
+        next_page = 1
+        sort = "recent" if known else None
+
+        def schedule():
+            # Aynı anda en fazla 'concurrency' sayfa yükleniyor olsun
+            nonlocal next_page
+            while len(pending) < concurrency and next_page <= max_pages:
+                pending.append(asyncio.create_task(
+                    _fetch_review_page(context, review_page_url(url, asin, next_page, sort), lean)
+                ))
+                next_page += 1
+
+        schedule()
+        guard = PaginationGuard()
+        try:
+            while pending:
+                reviews = await pending.popleft()
+                new = 0
+                for review in reviews or ():
+                    key = review_key(review)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if is_known(review, known):
+                        continue
+                    new += 1
+                    yield review
+                    count += 1
+                    if max_reviews is not None and count >= max_reviews:
+                        return
+                # Boş sayfa ya da art arda yeni yorum vermeyen sayfalar: listenin sonuna
+                # (ya da önceki analizde görülen kısma) gelindi. Yüklenemeyen sayfa atlanır.
+                if guard.should_stop(reviews, new):
+                    break
+                schedule()
+        finally:
+            # Erken durduysak hâlâ yüklenen sayfaları iptal et
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def iter_reviews(
+    url: str,
+    max_reviews: int | None = None,
+    meta: dict | None = None,
+    max_pages: int = MAX_REVIEW_PAGES,
+    concurrency: int = REVIEW_PAGE_CONCURRENCY,
+    pool=None,
+    lean: bool = True,
+    backend: str = "browser",
+    known: dict | None = None,
+):
+    """
+    Yorumları sayfalardan çıkarıldıkça tek tek üreten (generator) kazıma fonksiyonu.
+    Böylece analiz, kazıma bitmeden ilk yorumlarla başlayabilir.
+    url: Gidilecek web sitesi adresi.
+    max_reviews: En fazla kaç yorum çekileceği (None ise sınır yok). Ulaşılınca kazıma durur.
+    meta: Verilirse 'total_reviews' ve 'average_stars' bulundukları anda bu sözlüğe yazılır.
+    max_pages: Gezilecek en fazla yorum listesi sayfası (0 ise sadece ürün sayfası okunur).
+    concurrency: Aynı anda yüklenecek yorum listesi sayfası sayısı.
+    pool: Kullanılacak tarayıcı havuzu (None ise süreç geneli paylaşılan havuz).
+    lean: True ise resim/medya/font ve üçüncü taraf istekleri engellenir, sabit
+        bekleme yerine gerekli seçiciler beklenir.
+    backend: "browser" (Chromium) ya da "http" (tarayıcısız, düz HTTP + HTML ayrıştırıcı).
+        url kaydedilmiş bir HTML dosyası/klasörü ise (file:// veya yerel yol) her zaman
+        tarayıcısız yol kullanılır.
+    known: Önceki analizden {yorum anahtarı: metin özeti} (bkz. review_key, review_hash).
+        Verilirse sadece yeni veya düzenlenmiş yorumlar üretilir ve yorum listesi
+        bilinen yorumlara ulaşılınca gezilmeyi bırakır (artımlı analiz).
+    Her yorum {"id": <yorum kimliği veya None>, "text": <metin>, "rating": <yıldız veya None>} olarak döner.
+    """
+    if meta is None:
+        meta = {}
+    meta.setdefault("total_reviews", 0)
+    meta.setdefault("average_stars", 0.0)
+
+    if backend == "http" or url.startswith("file://") or os.path.exists(url):
+        from html_scraper import iter_reviews_html
+
+        yield from _measured(iter_reviews_html(url, max_reviews, meta, max_pages, concurrency, known=known))
+        return
+
+    yield from _measured(_iter_reviews_browser(url, max_reviews, meta, max_pages, concurrency, pool, lean, known))
+
+
+def _measured(reviews):
+    """
+    Kazıma süresini ve yorum sayısını etkin performans raporuna yazar. Sadece
+    bir sonraki yorumun beklendiği süre sayılır; tüketicinin (çeviri/puanlama)
+    harcadığı zaman kazımaya eklenmez.
+    """
+    elapsed = 0.0
+    count = 0
+    try:
+        # Analiz iptal edildiyse (bkz. cancellation) o ana kadar bulunan yorumlarla yetinilir
+        while not cancellation.cancelled():
+            started = time.perf_counter()
+            try:
+                review = next(reviews)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - started
+            count += 1
+            yield review
+    finally:
+        reviews.close()
+        metrics.add_time("scrape", elapsed)
+        metrics.count("reviews_scraped", count)
+
+
+def _iter_reviews_browser(url, max_reviews, meta, max_pages, concurrency, pool, lean, known):
+    """Chromium (tarayıcı havuzu) ile kazıma; bkz. iter_reviews."""
+    print(f">> Scraper bağlanıyor: {url}")
+
+    # Asenkron kazıyıcı, tarayıcı havuzunun olay döngüsünde adım adım çalıştırılır
+    if pool is None:
+        pool = get_browser_pool()
+    agen = _iter_reviews_async(pool, url, max_reviews, meta, max_pages, max(1, concurrency), lean, known)
+    count = 0
+    for review in pool.iterate(agen):
+        count += 1
+        yield review
+
+    print(f">> Scraper tamamlandı. {count} yorum çekildi.")
+
+
+def get_reviews(
+    url: str,
+    max_reviews: int | None = None,
+    max_pages: int = MAX_REVIEW_PAGES,
+    concurrency: int = REVIEW_PAGE_CONCURRENCY,
+    lean: bool = True,
+    backend: str = "browser",
+    cancel=None,
+):
+    """
+    Ana kazıma fonksiyonu. Tüm yorumları toplayıp tek seferde döndürür.
+    url: Gidilecek web sitesi adresi.
+    max_reviews: En fazla kaç yorum çekileceği (None ise sınır yok).
+    max_pages / concurrency: Sayfalı yorum listesinin kaç sayfasının, kaçar kaçar gezileceği.
+    lean: Yalın yükleme modu (bkz. iter_reviews).
+    backend: "browser" ya da "http"; url kaydedilmiş bir HTML dosyası da olabilir (bkz. iter_reviews).
+    cancel: İptal belirteci (bkz. cancellation.CancelToken; verilmezse etkin olan kullanılır).
+        İptal edilirse o ana kadar çekilen yorumlar döner ve 'cancelled' True olur.
+    'comments' sadece metinleri, 'reviews' ise kimlik ve yıldız bilgisiyle birlikte yorumları içerir.
+    """
+    data = {"comments": [], "reviews": [], "total_reviews": 0, "average_stars": 0.0}
+
+    with cancellation.use_token(cancel or cancellation.current_token()) as token:
+        for review in iter_reviews(
+            url, max_reviews=max_reviews, meta=data, max_pages=max_pages, concurrency=concurrency,
+            lean=lean, backend=backend,
+        ):
+            data["comments"].append(review["text"])
+            data["reviews"].append(review)
+
+    data["cancelled"] = token is not None and token.cancelled
+    return data
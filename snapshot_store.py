@@ -0,0 +1,158 @@
+# snapshot_store.py
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+from cache import normalize_text
+from scraper import extract_asin
+
+# Ürün anlık görüntülerinin (snapshot) saklandığı dosya
+SNAPSHOT_PATH = os.environ.get(
+    "YORUM_SNAPSHOT_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "ai-yorum-analiz", "snapshots.sqlite3"),
+)
+
+# YORUM_SNAPSHOTS=0 ise artımlı analiz kapalıdır (her ürün baştan analiz edilir)
+SNAPSHOTS_ENABLED = os.environ.get("YORUM_SNAPSHOTS", "1") != "0"
+
+
+def product_key(url: str) -> str:
+    """Ürünün kalıcı anahtarı: ASIN bulunursa o, yoksa normalize edilmiş linkin özeti."""
+    asin = extract_asin(url)
+    if asin:
+        return f"asin:{asin}"
+    return "url:" + hashlib.sha1(normalize_text(url).encode("utf-8")).hexdigest()
+
+
+class SnapshotStore:
+    """
+    Daha önce analiz edilen ürünlerin yorumlarını ve puan istatistiklerini
+    (puan toplamı, puanlanan yorum sayısı, yıldız ortalaması) diskte (SQLite) saklar.
+    Ürün tekrar analiz edilirken sadece yeni veya düzenlenmiş yorumlar puanlanır;
+    nihai puan bu toplamlar üzerinden güncellenir.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " product TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " score_sum REAL NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " average_stars REAL NOT NULL,"
+            " total_reviews INTEGER NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        # score NULL: yorum görüldü ama analiz edilmedi (çok kısa)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reviews ("
+            " product TEXT NOT NULL,"
+            " review TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " score INTEGER,"
+            " PRIMARY KEY (product, review))"
+        )
+
+    def load(self, product: str) -> dict | None:
+        """
+        Ürünün son anlık görüntüsü; hiç analiz edilmediyse None.
+        {"url", "score_sum", "count", "average_stars", "total_reviews", "updated",
+         "reviews": {yorum anahtarı: {"hash", "score"}}}
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, score_sum, count, average_stars, total_reviews, updated FROM products WHERE product = ?",
+                (product,),
+            ).fetchone()
+            if row is None:
+                return None
+            reviews = self._conn.execute(
+                "SELECT review, hash, score FROM reviews WHERE product = ?", (product,)
+            ).fetchall()
+
+        url, score_sum, count, average_stars, total_reviews, updated = row
+        return {
+            "url": url,
+            "score_sum": score_sum,
+            "count": count,
+            "average_stars": average_stars,
+            "total_reviews": total_reviews,
+            "updated": updated,
+            "reviews": {key: {"hash": h, "score": score} for key, h, score in reviews},
+        }
+
+    def save(
+        self,
+        product: str,
+        url: str,
+        reviews: dict,
+        score_sum: float,
+        count: int,
+        average_stars: float,
+        total_reviews: int,
+    ):
+        """
+        Yeni/düzenlenmiş yorumları ({yorum anahtarı: (metin özeti, puan veya None)})
+        ve ürünün güncel toplamlarını tek işlemde yazar.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO products"
+                    " (product, url, score_sum, count, average_stars, total_reviews, updated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (product, url, score_sum, count, average_stars, total_reviews, time.time()),
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO reviews (product, review, hash, score) VALUES (?, ?, ?, ?)",
+                    [(product, key, h, score) for key, (h, score) in reviews.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def forget(self, product: str):
+        """Ürünün anlık görüntüsünü siler (bir sonraki analiz baştan yapılır)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM reviews WHERE product = ?", (product,))
+            self._conn.execute("DELETE FROM products WHERE product = ?", (product,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_failed = False
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """
+    Süreç boyunca paylaşılan anlık görüntü deposu.
+    Kapalıysa veya açılamadıysa None döner (ürünler baştan analiz edilir).
+    """
+    global _store, _store_failed
+    if not SNAPSHOTS_ENABLED or _store_failed:
+        return None
+    with _store_lock:
+        if _store is None and not _store_failed:
+            try:
+                _store = SnapshotStore()
+            except Exception as e:
+                print(f"Anlık görüntü deposu açılamadı, artımlı analiz kapalı: {e}")
+                _store_failed = True
+        return _store
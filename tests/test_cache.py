@@ -0,0 +1,35 @@
+# tests/test_cache.py
+# -*- coding: utf-8 -*-
+
+from cache import ResultCache
+
+
+def _count(cache) -> int:
+    return cache._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+def test_eviction_keeps_recent_entries_and_rarely_counts(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), max_entries=1000)
+    statements = []
+    for batch in range(150):
+        cache._conn.set_trace_callback(statements.append)
+        cache.put_many("sentiment", {f"k{batch}-{i}": i for i in range(10)})
+        cache._conn.set_trace_callback(None)
+        assert _count(cache) <= 1000
+
+    # Sayım her yazmada değil, sadece tahmini kayıt sayısı sınırı aşınca yapılır
+    counts = [s for s in statements if s.startswith("SELECT COUNT(*)")]
+    assert len(counts) <= 15
+
+    # En son yazılanlar duruyor, en eskiler silinmiş
+    assert cache.get_many("sentiment", ["k149-9", "k0-0"]) == [9, None]
+    cache.close()
+
+
+def test_replacing_keys_does_not_evict(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), max_entries=20)
+    items = {f"k{i}": i for i in range(20)}
+    for _ in range(5):
+        cache.put_many("sentiment", items)
+    assert _count(cache) == 20
+    cache.close()
@@ -0,0 +1,35 @@
+# tests/test_calibration.py
+# -*- coding: utf-8 -*-
+
+import analyzer
+
+
+def test_parse_calibration():
+    assert analyzer.parse_calibration("1.25, -12.5") == (1.25, -12.5)
+    assert analyzer.parse_calibration([0.9, 4]) == (0.9, 4.0)
+    for bad in ("1", "1,2,3", "a,b", "1,nan", "", None, 5):
+        assert analyzer.parse_calibration(bad) is None
+
+
+def test_load_prefers_env_then_saved_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(analyzer, "MULTI_CALIBRATION_PATH", str(tmp_path / "sub" / "calibration.json"))
+    monkeypatch.delenv("YORUM_MULTI_CALIBRATION", raising=False)
+    assert analyzer.load_calibration() == analyzer.IDENTITY_CALIBRATION
+
+    analyzer.save_calibration(1.25, -12.5, samples=100)
+    assert analyzer.load_calibration() == (1.25, -12.5)
+
+    monkeypatch.setenv("YORUM_MULTI_CALIBRATION", "0.8,3")
+    assert analyzer.load_calibration() == (0.8, 3.0)
+
+    # Geçersiz ortam değişkeni import'u bozmaz, kaydedilen katsayılara düşülür
+    monkeypatch.setenv("YORUM_MULTI_CALIBRATION", "0.8")
+    assert analyzer.load_calibration() == (1.25, -12.5)
+
+
+def test_corrupt_file_falls_back_to_identity(tmp_path, monkeypatch):
+    path = tmp_path / "calibration.json"
+    path.write_text("{bozuk", encoding="utf-8")
+    monkeypatch.setattr(analyzer, "MULTI_CALIBRATION_PATH", str(path))
+    monkeypatch.delenv("YORUM_MULTI_CALIBRATION", raising=False)
+    assert analyzer.load_calibration() == analyzer.IDENTITY_CALIBRATION
@@ -0,0 +1,55 @@
+# tests/test_dedup.py
+# -*- coding: utf-8 -*-
+
+import random
+
+import dedup
+
+WORDS = (
+    "ürün kargo hızlı geldi paketleme güzel kalite fiyat performans beden uydu "
+    "renk farklı iade satıcı memnun kaldım tavsiye ederim kumaş ince kalın rahat"
+).split()
+
+
+def _jaccard(x: str, y: str) -> float:
+    a, b = dedup.shingles(x), dedup.shingles(y)
+    return len(a & b) / len(a | b)
+
+
+def _pairs_near(low: float, high: float, count: int, seed: int = 0):
+    """Gerçek 5-gram Jaccard benzerliği [low, high] aralığında olan rastgele yorum çiftleri."""
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        text = " ".join(rng.choice(WORDS) for _ in range(40))
+        chars = list(text)
+        # Benzerlik aralığa düşene kadar rastgele harfleri değiştir
+        while _jaccard(text, "".join(chars)) > high:
+            chars[rng.randrange(len(chars))] = rng.choice("xqwzj")
+        if _jaccard(text, "".join(chars)) >= low:
+            pairs.append((text, "".join(chars)))
+    return pairs
+
+
+def test_lsh_params_favour_recall_at_threshold():
+    bands, rows = dedup.lsh_params(0.85, 64)
+    assert bands * rows == 64
+    assert 1 - (1 - 0.85 ** rows) ** bands >= dedup.LSH_MIN_RECALL
+
+
+def test_pairs_at_threshold_are_merged():
+    pairs = _pairs_near(0.85, 0.90, 200)
+    merged = sum(dedup.cluster_texts([a, b], threshold=0.85)[1] == 0 for a, b in pairs)
+    assert merged / len(pairs) >= 0.85
+
+
+def test_dissimilar_pairs_are_not_merged():
+    pairs = _pairs_near(0.5, 0.8, 100, seed=1)
+    assert all(dedup.cluster_texts([a, b], threshold=0.85) == [0, 1] for a, b in pairs)
+
+
+def test_index_matches_batch_clustering():
+    pairs = _pairs_near(0.9, 0.97, 30, seed=2)
+    texts = [a for a, _ in pairs] + [b for _, b in pairs] + [a.upper() for a, _ in pairs[:5]]
+    index = dedup.DedupIndex(threshold=0.85)
+    assert [index.add(t) for t in texts] == dedup.cluster_texts(texts, threshold=0.85)
@@ -0,0 +1,164 @@
+# tests/test_html_scraper.py
+# -*- coding: utf-8 -*-
+
+import re
+
+import pytest
+
+pytest.importorskip("lxml")
+
+import bench
+import html_scraper
+
+
+def _pages(count: int, seed: int = 0):
+    return bench.make_product_pages(bench.make_corpus(count, seed), seed)
+
+
+def _ids(reviews) -> list:
+    return [r["id"] for r in reviews]
+
+
+def _ordered_ids(page: str) -> list:
+    # Çok kısa yorumlar parse_extracted'da elendiği için beklenen kimlikler de ondan geçer
+    return [r["id"] for r in html_scraper.parse_extracted(html_scraper.extract_from_html(page))]
+
+
+def _page_ids(page: str) -> set:
+    return set(_ordered_ids(page))
+
+
+class FlakyFetcher:
+    """bench sayfalarını döndüren sahte fetcher; 'failing' sayfalar her istekte hata verir."""
+
+    def __init__(self, pages, failing=()):
+        self.pages = pages
+        self.failing = set(failing)
+        self.calls = {}
+
+    def fetch(self, url: str) -> str:
+        match = re.search(r"pageNumber=(\d+)", url)
+        number = int(match.group(1)) if match else 0
+        self.calls[number] = self.calls.get(number, 0) + 1
+        if number in self.failing:
+            raise TimeoutError(f"sayfa {number} zaman aşımı")
+        return self.pages[number] if number < len(self.pages) else "<html><body></body></html>"
+
+
+def test_failed_page_is_retried_and_skipped():
+    pages = _pages(60)
+    fetcher = FlakyFetcher(pages, failing={2})
+    url = f"https://www.amazon.com.tr/dp/{bench.BENCH_ASIN}/"
+    reviews = list(html_scraper.iter_reviews_html(url, fetcher=fetcher, concurrency=2))
+
+    ids = _ids(reviews)
+    assert fetcher.calls[2] == html_scraper.REVIEW_PAGE_RETRIES + 1
+    # Hatalı sayfadan sonraki sayfaların yorumları yine toplanır
+    for number in (3, 4, 5):
+        assert _page_ids(pages[number]) <= set(ids)
+    assert not _page_ids(pages[2]) & set(ids)
+
+
+def test_http_error_page_is_retried_and_skipped():
+    pytest.importorskip("requests")
+    pages = _pages(60)
+    with bench.FixtureServer(pages, failing={2}) as server:
+        fetcher = html_scraper.HttpFetcher()
+        try:
+            reviews = list(html_scraper.iter_reviews_html(server.product_url, fetcher=fetcher, concurrency=2))
+        finally:
+            fetcher.close()
+
+    ids = set(_ids(reviews))
+    assert server.requests[2] == html_scraper.REVIEW_PAGE_RETRIES + 1
+    for number in (3, 4, 5):
+        assert _page_ids(pages[number]) <= ids
+    assert not _page_ids(pages[2]) & ids
+
+
+PRODUCT_PAGE = """
+<html><body><div id="dp">
+  <i class="a-icon a-icon-star"><span class="a-icon-alt">4,6 üzerinden 5 yıldız</span></i>
+  <a><span id="acrCustomerReviewText">1.234 değerlendirme</span></a>
+  <div data-hook="review" id="R1AAA">
+    <i data-hook="review-star-rating"><span class="a-icon-alt">5,0 üzerinden 5 yıldız</span></i>
+    <span data-hook="review-body"><span>Kargo hızlı geldi.<br>Ürün tam anlatıldığı gibi.</span></span>
+  </div>
+  <div data-hook="review" id="R2BBB">
+    <i data-hook="cmps-review-star-rating"><span class="a-icon-alt">2,0 üzerinden 5 yıldız</span></i>
+    <span data-hook="review-body"><span>Beden küçük geldi, iade ettim.</span></span>
+  </div>
+  <div data-hook="review" id="R3CCC">
+    <span data-hook="review-body"><span>ok</span></span>
+  </div>
+</div></body></html>
+"""
+
+
+def test_extract_stars_count_and_reviews():
+    raw = html_scraper.extract_from_html(PRODUCT_PAGE)
+    assert html_scraper.parse_stars(raw["stars"]) == 4.6
+    assert html_scraper.parse_number(raw["count"]) == 1234
+    assert len(raw["reviews"]) == 3
+
+    # Çok kısa yorum elenir; <br> satır sonuna çevrilir
+    assert html_scraper.parse_extracted(raw) == [
+        {"id": "R1AAA", "text": "Kargo hızlı geldi.\nÜrün tam anlatıldığı gibi.", "rating": 5.0},
+        {"id": "R2BBB", "text": "Beden küçük geldi, iade ettim.", "rating": 2.0},
+    ]
+
+
+def test_extract_empty_page():
+    assert html_scraper.extract_from_html("") == {"stars": "", "count": "", "reviews": []}
+
+
+def test_snapshot_directory(tmp_path):
+    pages = _pages(35)
+    bench.write_snapshot_dir(pages, str(tmp_path))
+    meta = {}
+    reviews = list(html_scraper.iter_reviews_html(str(tmp_path), meta=meta))
+
+    expected = [i for page in pages for i in _ordered_ids(page)]
+    assert _ids(reviews) == expected
+    assert meta == {"average_stars": 4.3, "total_reviews": 35}
+
+    limited = list(html_scraper.iter_reviews_html(str(tmp_path), max_reviews=12))
+    assert _ids(limited) == expected[:12]
+
+
+def test_http_pagination_stops_at_first_empty_page():
+    pytest.importorskip("requests")
+    pages = _pages(45)
+    concurrency = 2
+    meta = {}
+    with bench.FixtureServer(pages) as server:
+        fetcher = html_scraper.HttpFetcher()
+        try:
+            reviews = list(html_scraper.iter_reviews_html(
+                server.product_url, meta=meta, concurrency=concurrency, fetcher=fetcher
+            ))
+        finally:
+            fetcher.close()
+
+    assert _ids(reviews) == [i for page in pages for i in _ordered_ids(page)]
+    assert meta == {"average_stars": 4.3, "total_reviews": 45}
+    # Son dolu sayfadan sonraki ilk boş sayfada durulur; en fazla eş zamanlı indirilenler kadar ileri gidilir
+    assert server.requests[len(pages)] == 1
+    assert max(server.requests) < len(pages) + concurrency
+    assert all(n == 1 for n in server.requests.values())
+
+
+def test_http_pagination_respects_max_pages():
+    pytest.importorskip("requests")
+    pages = _pages(60)
+    with bench.FixtureServer(pages) as server:
+        fetcher = html_scraper.HttpFetcher()
+        try:
+            reviews = list(html_scraper.iter_reviews_html(
+                server.product_url, max_pages=2, concurrency=3, fetcher=fetcher
+            ))
+        finally:
+            fetcher.close()
+
+    assert sorted(server.requests) == [1, 2]
+    assert _ids(reviews) == [i for page in pages[:3] for i in _ordered_ids(page)]
@@ -0,0 +1,114 @@
+# tests/test_inference_service.py
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from inference_service import InferenceClient, MicroBatcher
+
+
+def _submit_all(batcher, requests) -> list:
+    """İstekleri aynı anda gönderir; her biri için (sonuç, hata) döndürür."""
+    outcomes = [None] * len(requests)
+
+    def run(i, items):
+        try:
+            outcomes[i] = (batcher.submit(items), None)
+        except Exception as e:
+            outcomes[i] = (None, e)
+
+    threads = [threading.Thread(target=run, args=(i, items)) for i, items in enumerate(requests)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert not any(t.is_alive() for t in threads), "istemci cevapsız kaldı"
+    return outcomes
+
+
+def test_bad_request_fails_alone():
+    def fn(items):
+        if "bozuk" in items:
+            raise ValueError("desteklenmeyen girdi")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(fn, max_wait_ms=50, name="test")
+    outcomes = _submit_all(batcher, [["a", "b"], ["bozuk"], ["c"]])
+    assert outcomes[0] == (["A", "B"], None)
+    assert isinstance(outcomes[1][1], ValueError)
+    assert outcomes[2] == (["C"], None)
+    assert batcher.info()["pending"] == 0
+
+
+def test_wrong_result_count_is_an_error():
+    batcher = MicroBatcher(lambda items: items[:-1], max_wait_ms=50, name="test")
+    outcomes = _submit_all(batcher, [["a", "b"], ["c"]])
+    assert all(isinstance(error, RuntimeError) for _, error in outcomes)
+    assert batcher.info()["pending"] == 0
+
+
+def test_submit_times_out_and_batcher_recovers():
+    release = threading.Event()
+
+    def fn(items):
+        if "yavaş" in items:
+            release.wait(5)
+        return items
+
+    batcher = MicroBatcher(fn, max_wait_ms=1, name="test", timeout=0.2)
+    with pytest.raises(TimeoutError):
+        batcher.submit(["yavaş"])
+    release.set()
+    assert batcher.submit(["hızlı"]) == ["hızlı"]
+    assert batcher.info()["timeouts"] == 1
+
+
+def test_client_reports_non_json_error_body():
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(handler):
+            handler.rfile.read(int(handler.headers.get("Content-Length", "0")))
+            body = b"<html>502 Bad Gateway</html>"
+            handler.send_response(502)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+
+        def log_message(handler, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        client = InferenceClient(f"http://{host}:{port}", timeout=5)
+        with pytest.raises(RuntimeError, match="502 Bad Gateway"):
+            client.score(["güzel ürün"])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_wait_is_bounded():
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(handler):
+            time.sleep(1)
+
+        def log_message(handler, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        host, port = server.server_address
+        client = InferenceClient(f"http://{host}:{port}", timeout=0.2)
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            client.score(["güzel ürün"])
+        assert time.monotonic() - started < 0.9
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,39 @@
+# tests/test_model_registry.py
+# -*- coding: utf-8 -*-
+
+from model_registry import ModelRegistry
+
+
+def _registry(size_mb: float = 10.0):
+    registry = ModelRegistry(budget_mb=0, idle_timeout=0)
+    calls = []
+    registry.register("model", lambda: calls.append("load"), lambda: calls.append("unload"), size=lambda: size_mb)
+    return registry, calls
+
+
+def test_size_callback_sets_resident_memory():
+    registry, _ = _registry(42.0)
+    registry.ensure("model")
+    assert registry.resident_mb() == 42.0
+
+
+def test_mark_unloaded_skips_unload_callback():
+    registry, calls = _registry()
+    registry.ensure("model")
+    # Model kaydın dışında durduruldu (örn. çeviri işçisi iptal edildi)
+    assert registry.mark_unloaded("model", "abort")
+    assert not registry.mark_unloaded("model", "abort")
+    assert calls == ["load"]
+    assert registry.resident_mb() == 0
+    assert registry.stats()["models"]["model"]["unloads"] == 1
+
+    registry.ensure("model")
+    assert calls == ["load", "load"]
+
+
+def test_unload_callback_reporting_back_is_not_counted_twice():
+    registry = ModelRegistry(budget_mb=0, idle_timeout=0)
+    registry.register("model", lambda: None, lambda: registry.mark_unloaded("model", "closed"), size=lambda: 1.0)
+    registry.ensure("model")
+    assert registry.unload("model")
+    assert registry.stats()["models"]["model"]["unloads"] == 1
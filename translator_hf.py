@@ -1,61 +1,309 @@
-# translator_hf.py
-# -*- coding: utf-8 -*-
-
-import sys
-from transformers import M2M100ForConditionalGeneration, M2M100Tokenizer
-import torch
-
-# Facebook'un çok dilli çeviri modeli (Hugging Face'den)
-MODEL_NAME = "facebook/m2m100_418M"
-
-
-def main():
-    # Komut satırı argümanlarını kontrol et
-    # Kullanım: python translator_hf.py <girdi.txt> <cikti.txt> <kaynak_dil>
-    if len(sys.argv) < 4:
-        print("Kullanım: python translator_hf.py <input_txt> <output_txt> <src_lang>", file=sys.stderr)
-        sys.exit(1)
-
-    in_path = sys.argv[1]   # Okunacak dosya yolu
-    out_path = sys.argv[2]  # Yazılacak dosya yolu
-    src_lang = sys.argv[3]  # Kaynak dil kodu (örn: 'en')
-
-    print(">> translator_hf: model yükleniyor...")
-    tokenizer = M2M100Tokenizer.from_pretrained(MODEL_NAME)
-    model = M2M100ForConditionalGeneration.from_pretrained(MODEL_NAME)
-    model.eval()
-    print(">> translator_hf: model yüklendi.")
-
-    # Girdi dosyasını oku
-    with open(in_path, "r", encoding="utf-8") as f:
-        text = f.read().strip()
-
-    # Dosya boşsa işlem yapma
-    if not text:
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write("")
-        sys.exit(0)
-
-    # Metni modele uygun formata getir (Tokenization)
-    tokenizer.src_lang = src_lang
-    encoded = tokenizer(text, return_tensors="pt")
-    
-    # Çeviri işlemini yap (Hedef dil zorla 'tr' yani Türkçe olarak ayarlandı)
-    with torch.no_grad():
-        generated = model.generate(
-            **encoded,
-            forced_bos_token_id=tokenizer.get_lang_id("tr"),
-        )
-    
-    # Sayısal çıktıları tekrar metne çevir (Decode)
-    translated = tokenizer.batch_decode(generated, skip_special_tokens=True)[0]
-
-    # Sonucu çıktı dosyasına yaz
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(translated)
-
-    print(">> translator_hf: çeviri tamamlandı.")
-
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+# translator_hf.py
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import struct
+
+import metrics
+import chunking
+
+# Facebook'un çok dilli çeviri modeli (Hugging Face'den)
+MODEL_NAME = "facebook/m2m100_418M"
+# Dal, etiket ya da commit SHA'sı; önbellek anahtarında çözülen commit kullanılır (bkz. backends.resolve_revision)
+MODEL_REVISION = os.environ.get("YORUM_TRANSLATION_REVISION", "main")
+
+# Kalıcı işçi protokolü: her mesaj 4 baytlık (big-endian) uzunluk başlığı
+# ve ardından gelen UTF-8 kodlu bir JSON gövdesinden oluşur.
+FRAME_HEADER = struct.Struct(">I")
+
+# Toplu çeviride bir batch'in en fazla kaç token (en uzun metin x metin sayısı) içerebileceği
+MAX_BATCH_TOKENS = 2048
+# Modele tek seferde verilen en fazla kaynak token. Daha uzun metinler cümle sınırlarından
+# parçalara bölünüp diğer metinlerle aynı batch'lerde çevrilir, çeviriler sırayla birleştirilir.
+MAX_INPUT_TOKENS = 200
+# Üretilecek token sınırı: batch'teki en uzun girdinin bu katı (+ NEW_TOKENS_SLACK),
+# en fazla MAX_NEW_TOKENS. Modelin durmadan üretmeye devam ettiği durumları keser.
+NEW_TOKENS_RATIO = 2.0
+NEW_TOKENS_SLACK = 10
+MAX_NEW_TOKENS = 2 * MAX_INPUT_TOKENS
+
+
+# ---------------- ÇERÇEVELİ PROTOKOL ---------------- #
+
+def write_frame(stream, payload: dict):
+    """Bir sözlüğü JSON'a çevirip uzunluk başlığıyla birlikte akışa yazar."""
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    stream.write(FRAME_HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def _read_exact(stream, size: int):
+    """Akıştan tam olarak 'size' bayt okur. Akış kapanırsa None döndürür."""
+    buf = b""
+    while len(buf) < size:
+        chunk = stream.read(size - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def read_frame(stream):
+    """Akıştan bir çerçeve okur. Karşı taraf kapandıysa None döndürür."""
+    header = _read_exact(stream, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    body = _read_exact(stream, length)
+    if body is None:
+        return None
+    return json.loads(body.decode("utf-8"))
+
+
+# ---------------- MODEL ---------------- #
+
+def load_model(backend: str | None = None):
+    """M2M100 modelini ve tokenizer'ını seçilen çıkarım arka ucuyla (torch/int8/onnx) yükler."""
+    from backends import INFERENCE_BACKEND, load_seq2seq
+
+    backend = backend or INFERENCE_BACKEND
+    print(f">> translator_hf: model yükleniyor ({backend})...")
+    tokenizer, model = load_seq2seq(MODEL_NAME, MODEL_REVISION, backend)
+    print(">> translator_hf: model yüklendi.")
+    return tokenizer, model
+
+
+def translate_text(tokenizer, model, text: str, src_lang: str) -> str:
+    """Tek bir metni kaynak dilden Türkçeye çevirir (uzun metinler translate_batch gibi parçalanır)."""
+    return translate_batch(tokenizer, model, [text], [src_lang])[0]
+
+
+def max_new_tokens_for(longest_input: int) -> int:
+    """Girdi uzunluğuna göre üretilecek en fazla token sayısı."""
+    return min(MAX_NEW_TOKENS, int(longest_input * NEW_TOKENS_RATIO) + NEW_TOKENS_SLACK)
+
+
+def translate_batch(tokenizer, model, texts, src_langs, max_batch_tokens: int = MAX_BATCH_TOKENS):
+    """
+    Birden fazla metni toplu (batch) olarak Türkçeye çevirir.
+    - Metinler kaynak dillerine göre gruplanır (tokenizer.src_lang grup başına ayarlanır).
+    - Her grup token uzunluğuna göre sıralanır; böylece bir batch içindeki
+      metinler benzer uzunlukta olur ve padding israfı azalır.
+    - Batch'ler 'en uzun metin x metin sayısı <= max_batch_tokens' olacak şekilde doldurulur.
+    - MAX_INPUT_TOKENS'ı aşan metinler cümle sınırlarından parçalara bölünür; parçalar
+      diğer metinlerle aynı batch'lerde çevrilip sırayla birleştirilir. Üretilen token
+      sayısı da girdi uzunluğuyla sınırlıdır (bkz. max_new_tokens_for); böylece tek bir
+      çok uzun yorum çeviriyi dakikalarca bekletmez.
+    Sonuçlar girdi sırasıyla aynı sırada döndürülür.
+    """
+    import torch
+
+    results = [""] * len(texts)
+
+    # Boş metinleri atla, geri kalanları dillerine göre grupla
+    groups = {}
+    for i, (text, lang) in enumerate(zip(texts, src_langs)):
+        text = (text or "").strip()
+        if text:
+            groups.setdefault(lang, []).append((i, text))
+
+    forced_bos = tokenizer.get_lang_id("tr")
+
+    def count_tokens(parts):
+        return [len(ids) for ids in tokenizer(list(parts), add_special_tokens=False)["input_ids"]]
+
+    for lang, group in groups.items():
+        tokenizer.src_lang = lang
+
+        # Uzun metinleri parçala; parçalar gruptaki diğer metinlerle birlikte sıralanıp batch'lenir
+        texts_in_group = [t for _, t in group]
+        chunks, owners, sizes = chunking.expand(
+            texts_in_group, count_tokens(texts_in_group), MAX_INPUT_TOKENS, count_tokens
+        )
+        if len(chunks) > len(group):
+            metrics.count("translation_chunks", len(chunks) - len(group))
+        chunk_results = [""] * len(chunks)
+
+        # Parçaları token uzunluğuna (özel tokenlar dahil) göre kısadan uzuna sırala
+        specials = tokenizer.num_special_tokens_to_add()
+        lengths = [n + specials for n in sizes]
+        order = sorted(range(len(chunks)), key=lambda k: lengths[k])
+
+        # Token bütçesine göre batch'lere böl
+        batches = []
+        current = []
+        current_max = 0
+        for k in order:
+            longest = max(current_max, lengths[k])
+            if current and longest * (len(current) + 1) > max_batch_tokens:
+                batches.append(current)
+                current = []
+                longest = lengths[k]
+            current.append(k)
+            current_max = longest
+        if current:
+            batches.append(current)
+
+        for batch in batches:
+            encoded = tokenizer(
+                [chunks[k] for k in batch], return_tensors="pt", padding=True,
+                truncation=True, max_length=MAX_INPUT_TOKENS + specials,
+            )
+            started = time.perf_counter()
+            with torch.no_grad():
+                generated = model.generate(
+                    **encoded,
+                    forced_bos_token_id=forced_bos,
+                    max_new_tokens=max_new_tokens_for(encoded["input_ids"].shape[1]),
+                )
+            # Üretilen (padding olmayan) token sayısı, token/saniye hesabı için
+            metrics.record_model(
+                "translation",
+                items=len(batch),
+                tokens=int((generated != tokenizer.pad_token_id).sum()),
+                seconds=time.perf_counter() - started,
+                input_tokens=int(encoded["attention_mask"].sum()),
+            )
+            decoded = tokenizer.batch_decode(generated, skip_special_tokens=True)
+            for k, translated in zip(batch, decoded):
+                chunk_results[k] = translated
+
+        for (i, _), translated in zip(group, chunking.combine_joined(chunk_results, owners, len(group))):
+            results[i] = translated
+
+    return results
+
+
+# ---------------- KALICI İŞÇİ MODU ---------------- #
+
+def serve(backend: str | None = None):
+    """
+    Kalıcı işçi modu: model bir kez yüklenir, ardından stdin'den gelen
+    çerçeveli istekler sırayla işlenip cevaplar stdout'a yazılır.
+    stdout protokol kanalı olduğu için diğer tüm çıktılar stderr'e yönlendirilir.
+    """
+    requests_in = sys.stdin.buffer
+    responses_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    try:
+        tokenizer, model = load_model(backend)
+    except Exception as e:
+        write_frame(responses_out, {"ok": False, "error": f"Model yüklenemedi: {e}"})
+        sys.exit(1)
+
+    # Ana sürece hazır olduğumuzu bildir
+    write_frame(responses_out, {"ok": True, "ready": True})
+
+    while True:
+        request = read_frame(requests_in)
+        if request is None:
+            break  # Ana süreç bağlantıyı kapattı
+
+        op = request.get("op")
+        if op == "shutdown":
+            write_frame(responses_out, {"id": request.get("id"), "ok": True})
+            break
+
+        # Her istek kendi performans raporunu toplar ve cevapla birlikte 'stats' olarak döndürür
+        report = metrics.PerfReport()
+        try:
+            with metrics.use_report(report), metrics.profiled(f"translator-{op}"):
+                if op == "ping":
+                    response = {"ok": True}
+                elif op == "translate":
+                    text = (request.get("text") or "").strip()
+                    with metrics.stage("translate"):
+                        translated = translate_text(tokenizer, model, text, request["src_lang"]) if text else ""
+                    response = {"ok": True, "translation": translated}
+                elif op == "translate_batch":
+                    with metrics.stage("translate_batch"):
+                        translations = translate_batch(
+                            tokenizer,
+                            model,
+                            request.get("texts", []),
+                            request.get("src_langs", []),
+                            request.get("max_batch_tokens", MAX_BATCH_TOKENS),
+                        )
+                    response = {"ok": True, "translations": translations}
+                else:
+                    response = {"ok": False, "error": f"Bilinmeyen işlem: {op}"}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        response["stats"] = report.as_dict()
+
+        response["id"] = request.get("id")
+        write_frame(responses_out, response)
+
+    print(">> translator_hf: işçi kapatılıyor.")
+
+
+def main():
+    # Çıkarım arka ucu her modda "--backend <torch|int8|onnx>" ile seçilebilir
+    backend = None
+    if "--backend" in sys.argv:
+        i = sys.argv.index("--backend")
+        backend = sys.argv[i + 1] if i + 1 < len(sys.argv) else None
+        del sys.argv[i:i + 2]
+
+    # Kalıcı işçi modu: python translator_hf.py --serve
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        serve(backend)
+        return
+
+    # Toplu mod: python translator_hf.py --batch <girdi.json> <cikti.json>
+    # Girdi: [{"text": "...", "src_lang": "en"}, ...]  Çıktı: ["çeviri", ...] (aynı sırayla)
+    if len(sys.argv) >= 4 and sys.argv[1] == "--batch":
+        with open(sys.argv[2], "r", encoding="utf-8") as f:
+            items = json.load(f)
+        tokenizer, model = load_model(backend)
+        translations = translate_batch(
+            tokenizer,
+            model,
+            [item.get("text", "") for item in items],
+            [item.get("src_lang", "en") for item in items],
+        )
+        with open(sys.argv[3], "w", encoding="utf-8") as f:
+            json.dump(translations, f, ensure_ascii=False)
+        print(f">> translator_hf: {len(translations)} metin çevrildi.")
+        return
+
+    # Komut satırı argümanlarını kontrol et
+    # Kullanım: python translator_hf.py <girdi.txt> <cikti.txt> <kaynak_dil>
+    if len(sys.argv) < 4:
+        print("Kullanım: python translator_hf.py <input_txt> <output_txt> <src_lang>", file=sys.stderr)
+        print("          python translator_hf.py --batch <input_json> <output_json>", file=sys.stderr)
+        print("          python translator_hf.py --serve", file=sys.stderr)
+        print("          (tüm modlarda isteğe bağlı: --backend <torch|int8|onnx>)", file=sys.stderr)
+        sys.exit(1)
+
+    in_path = sys.argv[1]   # Okunacak dosya yolu
+    out_path = sys.argv[2]  # Yazılacak dosya yolu
+    src_lang = sys.argv[3]  # Kaynak dil kodu (örn: 'en')
+
+    tokenizer, model = load_model(backend)
+
+    # Girdi dosyasını oku
+    with open(in_path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+
+    # Dosya boşsa işlem yapma
+    if not text:
+        with open(out_path, "w", encoding="utf-8") as f:
+            f.write("")
+        sys.exit(0)
+
+    translated = translate_text(tokenizer, model, text, src_lang)
+
+    # Sonucu çıktı dosyasına yaz
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(translated)
+
+    print(">> translator_hf: çeviri tamamlandı.")
+
+
+if __name__ == "__main__":
+    main()